@@ -350,6 +350,8 @@ export async function getAbatesCompletos(params?: {
   tipo_ave?: string;
   data_inicio?: string;
   data_fim?: string;
+  // Campos e/ou visões (summary, financeiro, operacional); sem isso, o abate completo
+  fields?: string;
 }) {
   const searchParams = new URLSearchParams();
   if (params?.skip) searchParams.append('skip', params.skip.toString());
@@ -358,6 +360,7 @@ export async function getAbatesCompletos(params?: {
   if (params?.tipo_ave) searchParams.append('tipo_ave', params.tipo_ave);
   if (params?.data_inicio) searchParams.append('data_inicio', params.data_inicio);
   if (params?.data_fim) searchParams.append('data_fim', params.data_fim);
+  if (params?.fields) searchParams.append('fields', params.fields);
   
   const response = await fetch(`${API_BASE}/abates-completos/?${searchParams}`);
   
@@ -369,6 +372,39 @@ export async function getAbatesCompletos(params?: {
   return response.json();
 }
 
+// Página de abates por cursor: custo constante em qualquer profundidade do histórico
+export async function getAbatesCompletosPagina(params?: {
+  limit?: number;
+  cursor?: string | null;
+  unidade?: string;
+  tipo_ave?: string;
+  data_inicio?: string;
+  data_fim?: string;
+}): Promise<{ items: any[]; total: number; proximoCursor: string | null }> {
+  const searchParams = new URLSearchParams();
+  if (params?.limit) searchParams.append('limit', params.limit.toString());
+  if (params?.cursor) searchParams.append('cursor', params.cursor);
+  if (params?.unidade) searchParams.append('unidade', params.unidade);
+  if (params?.tipo_ave) searchParams.append('tipo_ave', params.tipo_ave);
+  if (params?.data_inicio) searchParams.append('data_inicio', params.data_inicio);
+  if (params?.data_fim) searchParams.append('data_fim', params.data_fim);
+  
+  // Itens e total do filtro numa só requisição (dispensa o /count)
+  const response = await fetch(`${API_BASE}/abates-completos/pagina?${searchParams}`);
+  
+  if (!response.ok) {
+    const errorData = await response.json().catch(() => ({ detail: 'Erro desconhecido' }));
+    throw new Error(`Erro ao buscar abates: ${response.status} - ${errorData.detail || response.statusText}`);
+  }
+  
+  const pagina = await response.json();
+  return {
+    items: pagina.items,
+    total: pagina.total,
+    proximoCursor: pagina.paging.tem_mais ? pagina.paging.proximo_cursor : null
+  };
+}
+
 export async function createAbateCompleto(abateData: AbateCompletoCreate) {
   const response = await fetch(`${API_BASE}/abates-completos/`, {
     method: 'POST',
@@ -450,6 +486,263 @@ export async function countAbatesCompletos(params?: {
   return response.json();
 }
 
+export async function getResumoAbatesCompletos(params?: {
+  unidade?: string;
+  tipo_ave?: string;
+  data_inicio?: string;
+  data_fim?: string;
+}) {
+  const searchParams = new URLSearchParams();
+  if (params?.unidade) searchParams.append('unidade', params.unidade);
+  if (params?.tipo_ave) searchParams.append('tipo_ave', params.tipo_ave);
+  if (params?.data_inicio) searchParams.append('data_inicio', params.data_inicio);
+  if (params?.data_fim) searchParams.append('data_fim', params.data_fim);
+
+  const response = await fetch(`${API_BASE}/abates-completos/resumo?${searchParams}`);
+
+  if (!response.ok) {
+    const errorData = await response.json().catch(() => ({ detail: 'Erro desconhecido' }));
+    throw new Error(`Erro ao buscar resumo dos abates: ${response.status} - ${errorData.detail || response.statusText}`);
+  }
+
+  return response.json();
+}
+
+export async function getTendenciasAbatesCompletos(params?: {
+  unidade?: string;
+  tipo_ave?: string;
+  data_inicio?: string;
+  data_fim?: string;
+  granularidade?: 'dia' | 'semana' | 'mes';
+  janela?: number;
+  fracao_recente?: number;
+}) {
+  const searchParams = new URLSearchParams();
+  if (params?.unidade) searchParams.append('unidade', params.unidade);
+  if (params?.tipo_ave) searchParams.append('tipo_ave', params.tipo_ave);
+  if (params?.data_inicio) searchParams.append('data_inicio', params.data_inicio);
+  if (params?.data_fim) searchParams.append('data_fim', params.data_fim);
+  if (params?.granularidade) searchParams.append('granularidade', params.granularidade);
+  if (params?.janela) searchParams.append('janela', params.janela.toString());
+  if (params?.fracao_recente) searchParams.append('fracao_recente', params.fracao_recente.toString());
+
+  const response = await fetch(`${API_BASE}/abates-completos/tendencias?${searchParams}`);
+
+  if (!response.ok) {
+    const errorData = await response.json().catch(() => ({ detail: 'Erro desconhecido' }));
+    throw new Error(`Erro ao buscar tendências dos abates: ${response.status} - ${errorData.detail || response.statusText}`);
+  }
+
+  return response.json();
+}
+
+export async function getMixProdutos(params?: {
+  agrupamento?: 'nome' | 'tipo';
+  unidade?: string;
+  tipo_ave?: string;
+  data_inicio?: string;
+  data_fim?: string;
+  ordenar_por?: 'valor_total' | 'peso_kg' | 'quantidade' | 'nome' | 'tipo';
+  ordem?: 'asc' | 'desc';
+  skip?: number;
+  limit?: number;
+}) {
+  const searchParams = new URLSearchParams();
+  if (params?.agrupamento) searchParams.append('agrupamento', params.agrupamento);
+  if (params?.unidade) searchParams.append('unidade', params.unidade);
+  if (params?.tipo_ave) searchParams.append('tipo_ave', params.tipo_ave);
+  if (params?.data_inicio) searchParams.append('data_inicio', params.data_inicio);
+  if (params?.data_fim) searchParams.append('data_fim', params.data_fim);
+  if (params?.ordenar_por) searchParams.append('ordenar_por', params.ordenar_por);
+  if (params?.ordem) searchParams.append('ordem', params.ordem);
+  if (params?.skip) searchParams.append('skip', params.skip.toString());
+  if (params?.limit) searchParams.append('limit', params.limit.toString());
+
+  const response = await fetch(`${API_BASE}/abates-completos/mix-produtos?${searchParams}`);
+
+  if (!response.ok) {
+    const errorData = await response.json().catch(() => ({ detail: 'Erro desconhecido' }));
+    throw new Error(`Erro ao buscar mix de produtos: ${response.status} - ${errorData.detail || response.statusText}`);
+  }
+
+  return response.json();
+}
+
+export async function getRelatorioAbatesCompletos(params?: {
+  unidade?: string;
+  tipo_ave?: string;
+  data_inicio?: string;
+  data_fim?: string;
+}) {
+  const searchParams = new URLSearchParams();
+  if (params?.unidade) searchParams.append('unidade', params.unidade);
+  if (params?.tipo_ave) searchParams.append('tipo_ave', params.tipo_ave);
+  if (params?.data_inicio) searchParams.append('data_inicio', params.data_inicio);
+  if (params?.data_fim) searchParams.append('data_fim', params.data_fim);
+
+  const response = await fetch(`${API_BASE}/abates-completos/relatorio?${searchParams}`);
+
+  if (!response.ok) {
+    const errorData = await response.json().catch(() => ({ detail: 'Erro desconhecido' }));
+    throw new Error(`Erro ao gerar relatório dos abates: ${response.status} - ${errorData.detail || response.statusText}`);
+  }
+
+  return response.json();
+}
+
+export async function getComparacaoPeriodos(params: {
+  periodos: Array<{ data_inicio: string; data_fim: string }>;
+  unidade?: string;
+  tipo_ave?: string;
+  medidas?: string[];
+}) {
+  const searchParams = new URLSearchParams();
+  params.periodos.forEach((periodo) => searchParams.append('periodo', `${periodo.data_inicio}:${periodo.data_fim}`));
+  if (params.unidade) searchParams.append('unidade', params.unidade);
+  if (params.tipo_ave) searchParams.append('tipo_ave', params.tipo_ave);
+  if (params.medidas?.length) searchParams.append('medidas', params.medidas.join(','));
+
+  const response = await fetch(`${API_BASE}/abates-completos/comparacao?${searchParams}`);
+
+  if (!response.ok) {
+    const errorData = await response.json().catch(() => ({ detail: 'Erro desconhecido' }));
+    throw new Error(`Erro ao comparar períodos: ${response.status} - ${errorData.detail || response.statusText}`);
+  }
+
+  return response.json();
+}
+
+export async function getPercentisAbates(params?: {
+  percentis?: number[];
+  metricas?: string[];
+  unidade?: string;
+  tipo_ave?: string;
+  data_inicio?: string;
+  data_fim?: string;
+}) {
+  const searchParams = new URLSearchParams();
+  if (params?.percentis?.length) searchParams.append('p', params.percentis.join(','));
+  if (params?.metricas?.length) searchParams.append('metricas', params.metricas.join(','));
+  if (params?.unidade) searchParams.append('unidade', params.unidade);
+  if (params?.tipo_ave) searchParams.append('tipo_ave', params.tipo_ave);
+  if (params?.data_inicio) searchParams.append('data_inicio', params.data_inicio);
+  if (params?.data_fim) searchParams.append('data_fim', params.data_fim);
+
+  const response = await fetch(`${API_BASE}/abates-completos/percentis?${searchParams}`);
+
+  if (!response.ok) {
+    const errorData = await response.json().catch(() => ({ detail: 'Erro desconhecido' }));
+    throw new Error(`Erro ao calcular percentis: ${response.status} - ${errorData.detail || response.statusText}`);
+  }
+
+  return response.json();
+}
+
+export async function getPercentisAbate(id: string, meses?: number) {
+  const searchParams = new URLSearchParams();
+  if (meses) searchParams.append('meses', meses.toString());
+
+  const response = await fetch(`${API_BASE}/abates-completos/${id}/percentis?${searchParams}`);
+
+  if (!response.ok) {
+    const errorData = await response.json().catch(() => ({ detail: 'Erro desconhecido' }));
+    throw new Error(`Erro ao calcular percentis do abate: ${response.status} - ${errorData.detail || response.statusText}`);
+  }
+
+  return response.json();
+}
+
+export async function getPrecosAbatesCompletos(params?: {
+  unidade?: string;
+  tipo_ave?: string;
+  data_inicio?: string;
+  data_fim?: string;
+}) {
+  const searchParams = new URLSearchParams();
+  if (params?.unidade) searchParams.append('unidade', params.unidade);
+  if (params?.tipo_ave) searchParams.append('tipo_ave', params.tipo_ave);
+  if (params?.data_inicio) searchParams.append('data_inicio', params.data_inicio);
+  if (params?.data_fim) searchParams.append('data_fim', params.data_fim);
+
+  const response = await fetch(`${API_BASE}/abates-completos/precos?${searchParams}`);
+
+  if (!response.ok) {
+    const errorData = await response.json().catch(() => ({ detail: 'Erro desconhecido' }));
+    throw new Error(`Erro ao calcular estatísticas de preços: ${response.status} - ${errorData.detail || response.statusText}`);
+  }
+
+  return response.json();
+}
+
+export async function getCuboAbates(params?: {
+  granularidade?: 'dia' | 'semana' | 'mes' | 'ano';
+  dimensoes?: Array<'unidade' | 'tipo_ave' | 'periodo'>;
+  medidas?: string[];
+  unidades?: string[];
+  tipos_ave?: string[];
+  data_inicio?: string;
+  data_fim?: string;
+}) {
+  const searchParams = new URLSearchParams();
+  if (params?.granularidade) searchParams.append('granularidade', params.granularidade);
+  if (params?.dimensoes) searchParams.append('dimensoes', params.dimensoes.join(','));
+  if (params?.medidas?.length) searchParams.append('medidas', params.medidas.join(','));
+  params?.unidades?.forEach((unidade) => searchParams.append('unidade', unidade));
+  params?.tipos_ave?.forEach((tipo) => searchParams.append('tipo_ave', tipo));
+  if (params?.data_inicio) searchParams.append('data_inicio', params.data_inicio);
+  if (params?.data_fim) searchParams.append('data_fim', params.data_fim);
+
+  const response = await fetch(`${API_BASE}/abates-completos/cubo?${searchParams}`);
+
+  if (!response.ok) {
+    const errorData = await response.json().catch(() => ({ detail: 'Erro desconhecido' }));
+    throw new Error(`Erro ao consultar cubo dos abates: ${response.status} - ${errorData.detail || response.statusText}`);
+  }
+
+  return response.json();
+}
+
+export async function getAlertas(params?: {
+  status?: 'aberto' | 'resolvido';
+  unidade?: string;
+  severidade?: 'alta' | 'media' | 'baixa';
+  regra?: string;
+  data_inicio?: string;
+  data_fim?: string;
+  skip?: number;
+  limit?: number;
+}) {
+  const searchParams = new URLSearchParams();
+  if (params?.status) searchParams.append('status', params.status);
+  if (params?.unidade) searchParams.append('unidade', params.unidade);
+  if (params?.severidade) searchParams.append('severidade', params.severidade);
+  if (params?.regra) searchParams.append('regra', params.regra);
+  if (params?.data_inicio) searchParams.append('data_inicio', params.data_inicio);
+  if (params?.data_fim) searchParams.append('data_fim', params.data_fim);
+  if (params?.skip) searchParams.append('skip', params.skip.toString());
+  if (params?.limit) searchParams.append('limit', params.limit.toString());
+
+  const response = await fetch(`${API_BASE}/alertas/?${searchParams}`);
+
+  if (!response.ok) {
+    const errorData = await response.json().catch(() => ({ detail: 'Erro desconhecido' }));
+    throw new Error(`Erro ao buscar alertas: ${response.status} - ${errorData.detail || response.statusText}`);
+  }
+
+  return response.json();
+}
+
+export async function getResumoAlertas() {
+  const response = await fetch(`${API_BASE}/alertas/resumo`);
+
+  if (!response.ok) {
+    const errorData = await response.json().catch(() => ({ detail: 'Erro desconhecido' }));
+    throw new Error(`Erro ao resumir alertas: ${response.status} - ${errorData.detail || response.statusText}`);
+  }
+
+  return response.json();
+}
+
 export async function getAbatesPorPeriodo(params: {
   data_inicio: string;
   data_fim: string;
@@ -1,6 +1,6 @@
 from fastapi import APIRouter
 
-from app.api.v1.endpoints import health, lotes_abate, produtos, produto_log, despesas_padrao, abates_completos, configuracao_limites, auth
+from app.api.v1.endpoints import health, lotes_abate, produtos, produto_log, despesas_padrao, abates_completos, configuracao_limites, alertas, auth
 
 api_router = APIRouter()
 
@@ -11,4 +11,5 @@ api_router.include_router(produtos.router, prefix="/produtos", tags=["produtos"]
 api_router.include_router(produto_log.router, prefix="/produto-logs", tags=["produto-logs"])
 api_router.include_router(despesas_padrao.router, prefix="/despesas-padrao", tags=["despesas-padrao"])
 api_router.include_router(configuracao_limites.router, prefix="/configuracao-limites", tags=["configuracao-limites"])
+api_router.include_router(alertas.router, prefix="/alertas", tags=["alertas"])
 api_router.include_router(auth.router)
\ No newline at end of file
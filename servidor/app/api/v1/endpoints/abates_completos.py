@@ -1,8 +1,9 @@
 from typing import List, Optional
 from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException, Query, Body
+from fastapi import APIRouter, Depends, HTTPException, Query, Body, Header
 from motor.motor_asyncio import AsyncIOMotorDatabase
 
+from ....core.condicional import condicional
 from ....core.db import get_db
 from ....models.abate_completo import (
     AbateCompleto,
@@ -10,10 +11,37 @@ from ....models.abate_completo import (
     AbateCompletoUpdate
 )
 from ....crud.abate_completo import get_abate_completo_crud
+from ....services import leitura_rapida, paginacao, visoes_abate
 
 router = APIRouter()
 
 
+def _converter_periodo(data_inicio: Optional[str], data_fim: Optional[str]):
+    """Converter os filtros de data (YYYY-MM-DD) incluindo o dia final inteiro"""
+    dt_inicio = None
+    dt_fim = None
+    
+    if data_inicio:
+        try:
+            dt_inicio = datetime.fromisoformat(data_inicio)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Formato de data_inicio inválido. Use YYYY-MM-DD")
+    
+    if data_fim:
+        try:
+            dt_fim = datetime.fromisoformat(data_fim)
+            dt_fim = dt_fim.replace(hour=23, minute=59, second=59, microsecond=999999)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Formato de data_fim inválido. Use YYYY-MM-DD")
+    
+    return dt_inicio, dt_fim
+
+
+def _separar_lista(valor: Optional[str]) -> List[str]:
+    """Converter um parâmetro separado por vírgulas em lista"""
+    return [item.strip() for item in (valor or "").split(",") if item.strip()]
+
+
 @router.post("/", response_model=dict, status_code=201)
 async def create_abate_completo(
     abate_data: AbateCompletoCreate,
@@ -112,7 +140,9 @@ async def create_abate_completo(
             "percentual_lucro_total": abate.percentual_lucro_total,
             "percentual_rendimento": abate.percentual_rendimento,
             "created_at": abate.created_at,
-            "updated_at": abate.updated_at
+            "updated_at": abate.updated_at,
+            # Métricas fora do padrão da unidade (z-score contra os outros abates)
+            "anomalias": await crud.anomalias(abate)
         }
     except ValueError as ve:
         print(f"ERROR: Erro de validação: {str(ve)}")
@@ -122,7 +152,7 @@ async def create_abate_completo(
         raise HTTPException(status_code=500, detail=f"Erro interno do servidor: {str(e)}")
 
 
-@router.get("/", response_model=List[dict])
+@router.get("/", response_model=List[dict], dependencies=[condicional("abates_completos")])
 async def get_abates_completos(
     skip: int = Query(0, ge=0, description="Número de registros para pular"),
     limit: int = Query(100, ge=1, le=1000, description="Número máximo de registros"),
@@ -130,9 +160,22 @@ async def get_abates_completos(
     tipo_ave: Optional[str] = Query(None, description="Filtrar por tipo de ave"),
     data_inicio: Optional[str] = Query(None, description="Data de início (YYYY-MM-DD)"),
     data_fim: Optional[str] = Query(None, description="Data de fim (YYYY-MM-DD)"),
+    modo_busca: str = Query("exata", pattern="^(exata|prefixo)$", description="Comparar unidade e tipo de ave por igualdade ou por prefixo (sem acentos e maiúsculas)"),
+    cursor: Optional[str] = Query(None, description="Cursor da próxima página (cabeçalho X-Proximo-Cursor da resposta anterior); substitui skip"),
+    fields: Optional[str] = Query(None, description="Campos e/ou visões (summary, financeiro, operacional) separados por vírgula; só esses campos são lidos do banco"),
     db: AsyncIOMotorDatabase = Depends(get_db)
 ):
-    """Listar abates completos com filtros"""
+    """Listar abates completos com filtros, mais recentes primeiro.
+
+    Quando a página vem cheia, o cabeçalho ``X-Proximo-Cursor`` traz o cursor
+    da página seguinte, que custa o mesmo em qualquer profundidade.
+
+    Com ``fields`` cada item traz só os campos pedidos (mais ``id`` e
+    ``data_abate``), por exemplo ``fields=summary,despesas_fixas.agua``.
+
+    Os documentos vão direto para JSON (``leitura_rapida``), sem montar os
+    modelos.
+    """
     if db is None:
         raise HTTPException(status_code=500, detail="Erro de conexão com o banco de dados")
     
@@ -156,100 +199,39 @@ async def get_abates_completos(
             except ValueError:
                 raise HTTPException(status_code=400, detail="Formato de data_fim inválido. Use YYYY-MM-DD")
         
-        abates = await crud.get_many(
+        filtros = dict(
             skip=skip,
             limit=limit,
             unidade=unidade,
             tipo_ave=tipo_ave,
             data_inicio=dt_inicio,
-            data_fim=dt_fim
+            data_fim=dt_fim,
+            modo_busca=modo_busca,
+            cursor=cursor
         )
-        
-        return [
-            {
-                "id": str(abate.id),
-                "data_abate": abate.data_abate,
-                "quantidade_aves": abate.quantidade_aves,
-                "valor_kg_vivo": abate.valor_kg_vivo,
-                "peso_total_kg": abate.peso_total_kg,
-                "peso_medio_ave": abate.peso_medio_ave,
-                "valor_total": abate.valor_total,
-                "unidade": abate.unidade,
-                "tipo_ave": abate.tipo_ave,
-                "observacoes": abate.observacoes,
-                "horarios": abate.horarios.model_dump(),
-                "produtos": [produto.model_dump() for produto in abate.produtos],
-                "despesas_fixas": abate.despesas_fixas.model_dump(),
-                "peso_inteiro_abatido": abate.peso_inteiro_abatido,
-                "preco_venda_kg": abate.preco_venda_kg,
-                # Métricas Cortes vs Inteiro
-                "cortes_peso_total": abate.cortes_peso_total,
-                "cortes_valor_total": abate.cortes_valor_total,
-                "cortes_percentual_peso": abate.cortes_percentual_peso,
-                "cortes_percentual_valor": abate.cortes_percentual_valor,
-                "inteiro_peso_total": abate.inteiro_peso_total,
-                "inteiro_valor_total": abate.inteiro_valor_total,
-                "inteiro_percentual_peso": abate.inteiro_percentual_peso,
-                "inteiro_percentual_valor": abate.inteiro_percentual_valor,
-                # Indicadores de Performance
-                "receita_bruta": abate.receita_bruta,
-                "custos_totais": abate.custos_totais,
-                "lucro_liquido": abate.lucro_liquido,
-                "rendimento_final": abate.rendimento_final,
-                "media_valor_kg": abate.media_valor_kg,
-                "custo_kg": abate.custo_kg,
-                "custo_ave": abate.custo_ave,
-                "custo_abate_kg": abate.custo_abate_kg,
-                "custo_frango": abate.custo_frango,
-                "lucro_kg": abate.lucro_kg,
-                "lucro_frango": abate.lucro_frango,
-                "lucro_total": abate.lucro_total,
-                # Indicadores de Eficiência Operacional
-                "aves_hora": abate.aves_hora,
-                "kg_hora": abate.kg_hora,
-                "tempo_medio_ave": abate.tempo_medio_ave,
-                "eficiencia_operacional": abate.eficiencia_operacional,
-                # Análise de Perdas
-                "peso_total_perdas": abate.peso_total_perdas,
-                "percentual_perda_total": abate.percentual_perda_total,
-                "valor_perdas": abate.valor_perdas,
-                "eficiencia_aproveitamento": abate.eficiencia_aproveitamento,
-                # Indicadores de Qualidade
-                "diversificacao_produtos": abate.diversificacao_produtos,
-                "peso_medio_geral": abate.peso_medio_geral,
-                # Performance Score
-                "score_performance": abate.score_performance,
-                "classificacao_performance": abate.classificacao_performance,
-                # Percentuais
-                "percentual_receita_bruta": abate.percentual_receita_bruta,
-                "percentual_custos_totais": abate.percentual_custos_totais,
-                "percentual_lucro_liquido": abate.percentual_lucro_liquido,
-                "percentual_rendimento": abate.percentual_rendimento,
-                "percentual_media_valor_kg": abate.percentual_media_valor_kg,
-                "percentual_custo_kg": abate.percentual_custo_kg,
-                "percentual_custo_ave": abate.percentual_custo_ave,
-                "percentual_custo_abate_kg": abate.percentual_custo_abate_kg,
-                "percentual_custo_frango": abate.percentual_custo_frango,
-                "percentual_lucro_kg": abate.percentual_lucro_kg,
-                "percentual_lucro_frango": abate.percentual_lucro_frango,
-                "percentual_lucro_total": abate.percentual_lucro_total,
-                "created_at": abate.created_at,
-                "updated_at": abate.updated_at
-            }
-            for abate in abates
-        ]
+        campos = visoes_abate.resolver(fields)
+        if campos:
+            abates = await crud.get_many_campos(campos, **filtros)
+        else:
+            abates = await crud.get_many_documentos(**filtros)
+        proximo_cursor = paginacao.proximo(abates, limit)
+        headers = {paginacao.CABECALHO: proximo_cursor} if proximo_cursor else None
+        return leitura_rapida.resposta(abates, headers)
     except HTTPException:
         raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erro ao buscar abates: {str(e)}")
 
 
-@router.get("/count", response_model=dict)
+@router.get("/count", response_model=dict, dependencies=[condicional("abates_completos")])
 async def count_abates_completos(
     unidade: Optional[str] = Query(None, description="Filtrar por unidade"),
     tipo_ave: Optional[str] = Query(None, description="Filtrar por tipo de ave"),
     data_inicio: Optional[str] = Query(None, description="Data de início (YYYY-MM-DD)"),
     data_fim: Optional[str] = Query(None, description="Data de fim (YYYY-MM-DD)"),
+    modo_busca: str = Query("exata", pattern="^(exata|prefixo)$", description="Comparar unidade e tipo de ave por igualdade ou por prefixo (sem acentos e maiúsculas)"),
     db: AsyncIOMotorDatabase = Depends(get_db)
 ):
     """Contar total de abates completos"""
@@ -279,7 +261,8 @@ async def count_abates_completos(
             unidade=unidade,
             tipo_ave=tipo_ave,
             data_inicio=dt_inicio,
-            data_fim=dt_fim
+            data_fim=dt_fim,
+            modo_busca=modo_busca
         )
         return {"total": total}
     except HTTPException:
@@ -288,14 +271,65 @@ async def count_abates_completos(
         raise HTTPException(status_code=500, detail=f"Erro ao contar abates: {str(e)}")
 
 
-@router.get("/periodo", response_model=List[dict])
+@router.get("/pagina", response_model=dict, dependencies=[condicional("abates_completos")])
+async def get_pagina_abates_completos(
+    skip: int = Query(0, ge=0, description="Número de registros para pular"),
+    limit: int = Query(100, ge=1, le=1000, description="Número máximo de registros"),
+    unidade: Optional[str] = Query(None, description="Filtrar por unidade"),
+    tipo_ave: Optional[str] = Query(None, description="Filtrar por tipo de ave"),
+    data_inicio: Optional[str] = Query(None, description="Data de início (YYYY-MM-DD)"),
+    data_fim: Optional[str] = Query(None, description="Data de fim (YYYY-MM-DD)"),
+    modo_busca: str = Query("exata", pattern="^(exata|prefixo)$", description="Comparar unidade e tipo de ave por igualdade ou por prefixo (sem acentos e maiúsculas)"),
+    cursor: Optional[str] = Query(None, description="Cursor da próxima página (paging.proximo_cursor da resposta anterior); substitui skip"),
+    fields: Optional[str] = Query(None, description="Campos e/ou visões (summary, financeiro, operacional) separados por vírgula; só esses campos são lidos do banco"),
+    db: AsyncIOMotorDatabase = Depends(get_db)
+):
+    """Página de abates com ``items``, ``total`` e ``paging`` numa só requisição.
+
+    Substitui a listagem seguida de ``/count``: os itens e o total do filtro
+    vêm de duas consultas simultâneas (``envelope.buscar``).
+    """
+    if db is None:
+        raise HTTPException(status_code=500, detail="Erro de conexão com o banco de dados")
+    
+    crud = get_abate_completo_crud(db)
+    try:
+        dt_inicio, dt_fim = _converter_periodo(data_inicio, data_fim)
+        pagina = await crud.pagina(
+            skip=skip,
+            limit=limit,
+            unidade=unidade,
+            tipo_ave=tipo_ave,
+            data_inicio=dt_inicio,
+            data_fim=dt_fim,
+            modo_busca=modo_busca,
+            cursor=cursor,
+            campos=visoes_abate.resolver(fields)
+        )
+        return leitura_rapida.resposta(pagina)
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erro ao buscar página de abates: {str(e)}")
+
+
+@router.get("/periodo", response_model=List[dict], dependencies=[condicional("abates_completos")])
 async def get_abates_por_periodo(
     data_inicio: str = Query(..., description="Data de início (YYYY-MM-DD)"),
     data_fim: str = Query(..., description="Data de fim (YYYY-MM-DD)"),
     unidade: Optional[str] = Query(None, description="Filtrar por unidade"),
+    modo_busca: str = Query("exata", pattern="^(exata|prefixo)$", description="Comparar unidade e tipo de ave por igualdade ou por prefixo (sem acentos e maiúsculas)"),
+    fields: Optional[str] = Query(None, description="Campos e/ou visões (summary, financeiro, operacional) separados por vírgula; só esses campos são lidos do banco"),
+    accept: Optional[str] = Header(None),
     db: AsyncIOMotorDatabase = Depends(get_db)
 ):
-    """Buscar abates completos por período"""
+    """Buscar abates completos por período (``fields`` como na listagem).
+
+    Com ``Accept: application/x-ndjson`` a resposta sai em NDJSON, um abate
+    por linha, lida do banco em lotes: a memória não cresce com o período.
+    """
     if db is None:
         raise HTTPException(status_code=500, detail="Erro de conexão com o banco de dados")
     
@@ -309,47 +343,360 @@ async def get_abates_por_periodo(
         except ValueError:
             raise HTTPException(status_code=400, detail="Formato de data inválido. Use YYYY-MM-DD")
         
-        abates = await crud.get_by_periodo(
+        campos = visoes_abate.resolver(fields)
+        if leitura_rapida.aceita_ndjson(accept):
+            return leitura_rapida.resposta_ndjson(crud.iterar_periodo(
+                data_inicio=dt_inicio,
+                data_fim=dt_fim,
+                unidade=unidade,
+                modo_busca=modo_busca,
+                campos=campos
+            ))
+        if campos:
+            abates = await crud.get_by_periodo_campos(
+                campos,
+                data_inicio=dt_inicio,
+                data_fim=dt_fim,
+                unidade=unidade,
+                modo_busca=modo_busca
+            )
+        else:
+            abates = await crud.get_by_periodo_documentos(
+                data_inicio=dt_inicio,
+                data_fim=dt_fim,
+                unidade=unidade,
+                modo_busca=modo_busca
+            )
+        return leitura_rapida.resposta(abates)
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erro ao buscar abates por período: {str(e)}")
+
+
+@router.get("/resumo", response_model=dict, dependencies=[condicional("abates_completos")])
+async def get_resumo_abates_completos(
+    unidade: Optional[str] = Query(None, description="Filtrar por unidade"),
+    tipo_ave: Optional[str] = Query(None, description="Filtrar por tipo de ave"),
+    data_inicio: Optional[str] = Query(None, description="Data de início (YYYY-MM-DD)"),
+    data_fim: Optional[str] = Query(None, description="Data de fim (YYYY-MM-DD)"),
+    db: AsyncIOMotorDatabase = Depends(get_db)
+):
+    """Indicadores do dashboard (métricas, custos operacionais e tendências)"""
+    if db is None:
+        raise HTTPException(status_code=500, detail="Erro de conexão com o banco de dados")
+    
+    crud = get_abate_completo_crud(db)
+    try:
+        dt_inicio, dt_fim = _converter_periodo(data_inicio, data_fim)
+        return await crud.resumo(
+            unidade=unidade,
+            tipo_ave=tipo_ave,
+            data_inicio=dt_inicio,
+            data_fim=dt_fim
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erro ao calcular resumo dos abates: {str(e)}")
+
+
+@router.get("/tendencias", response_model=dict, dependencies=[condicional("abates_completos")])
+async def get_tendencias_abates_completos(
+    unidade: Optional[str] = Query(None, description="Filtrar por unidade"),
+    tipo_ave: Optional[str] = Query(None, description="Filtrar por tipo de ave"),
+    data_inicio: Optional[str] = Query(None, description="Data de início (YYYY-MM-DD)"),
+    data_fim: Optional[str] = Query(None, description="Data de fim (YYYY-MM-DD)"),
+    granularidade: str = Query("dia", pattern="^(dia|semana|mes)$", description="Período de cada ponto da série"),
+    janela: int = Query(7, ge=1, le=365, description="Períodos da média móvel"),
+    fracao_recente: float = Query(0.3, gt=0, le=0.5, description="Fração de abates comparada com a anterior"),
+    db: AsyncIOMotorDatabase = Depends(get_db)
+):
+    """Tendências de rendimento, lucro e eficiência (médias móveis e variações)"""
+    if db is None:
+        raise HTTPException(status_code=500, detail="Erro de conexão com o banco de dados")
+    
+    crud = get_abate_completo_crud(db)
+    try:
+        dt_inicio, dt_fim = _converter_periodo(data_inicio, data_fim)
+        return await crud.tendencias(
+            unidade=unidade,
+            tipo_ave=tipo_ave,
+            data_inicio=dt_inicio,
+            data_fim=dt_fim,
+            granularidade=granularidade,
+            janela=janela,
+            fracao_recente=fracao_recente
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erro ao calcular tendências dos abates: {str(e)}")
+
+
+@router.get("/mix-produtos", response_model=dict, dependencies=[condicional("abates_completos")])
+async def get_mix_produtos(
+    agrupamento: str = Query("nome", pattern="^(nome|tipo)$", description="Agrupar por nome ou tipo do produto"),
+    unidade: Optional[str] = Query(None, description="Filtrar por unidade"),
+    tipo_ave: Optional[str] = Query(None, description="Filtrar por tipo de ave"),
+    data_inicio: Optional[str] = Query(None, description="Data de início (YYYY-MM-DD)"),
+    data_fim: Optional[str] = Query(None, description="Data de fim (YYYY-MM-DD)"),
+    ordenar_por: str = Query("valor_total", pattern="^(valor_total|peso_kg|quantidade|nome|tipo)$", description="Campo de ordenação"),
+    ordem: str = Query("desc", pattern="^(asc|desc)$", description="Ordem da ordenação"),
+    skip: int = Query(0, ge=0, description="Número de itens para pular"),
+    limit: int = Query(10, ge=1, le=1000, description="Número máximo de itens (top-K)"),
+    db: AsyncIOMotorDatabase = Depends(get_db)
+):
+    """Mix de produtos dos abates: peso, valor, ocorrências e participação"""
+    if db is None:
+        raise HTTPException(status_code=500, detail="Erro de conexão com o banco de dados")
+    
+    if ordenar_por in ("nome", "tipo") and ordenar_por != agrupamento:
+        raise HTTPException(status_code=400, detail=f"Não é possível ordenar por {ordenar_por} agrupando por {agrupamento}")
+    
+    crud = get_abate_completo_crud(db)
+    try:
+        dt_inicio, dt_fim = _converter_periodo(data_inicio, data_fim)
+        return await crud.mix_produtos(
+            agrupamento=agrupamento,
+            unidade=unidade,
+            tipo_ave=tipo_ave,
+            data_inicio=dt_inicio,
+            data_fim=dt_fim,
+            ordenar_por=ordenar_por,
+            ordem=-1 if ordem == "desc" else 1,
+            skip=skip,
+            limit=limit
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erro ao calcular mix de produtos: {str(e)}")
+
+
+@router.get("/relatorio", response_model=Optional[dict], dependencies=[condicional("abates_completos")])
+async def get_relatorio_abates_completos(
+    unidade: Optional[str] = Query(None, description="Filtrar por unidade"),
+    tipo_ave: Optional[str] = Query(None, description="Filtrar por tipo de ave"),
+    data_inicio: Optional[str] = Query(None, description="Data de início (YYYY-MM-DD)"),
+    data_fim: Optional[str] = Query(None, description="Data de fim (YYYY-MM-DD)"),
+    usar_consolidados: bool = Query(True, description="Usar os consolidados diários/mensais quando disponíveis"),
+    db: AsyncIOMotorDatabase = Depends(get_db)
+):
+    """Relatório consolidado do período (nulo quando não há abates)"""
+    if db is None:
+        raise HTTPException(status_code=500, detail="Erro de conexão com o banco de dados")
+    
+    crud = get_abate_completo_crud(db)
+    try:
+        dt_inicio, dt_fim = _converter_periodo(data_inicio, data_fim)
+        return await crud.relatorio(
+            unidade=unidade,
+            tipo_ave=tipo_ave,
             data_inicio=dt_inicio,
             data_fim=dt_fim,
-            unidade=unidade
+            usar_consolidados=usar_consolidados
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erro ao gerar relatório dos abates: {str(e)}")
+
+
+@router.get("/comparacao", response_model=dict, dependencies=[condicional("abates_completos")])
+async def get_comparacao_periodos(
+    periodo: List[str] = Query(..., description="Período no formato YYYY-MM-DD:YYYY-MM-DD (repetir; o primeiro é a base)"),
+    unidade: Optional[str] = Query(None, description="Filtrar por unidade"),
+    tipo_ave: Optional[str] = Query(None, description="Filtrar por tipo de ave"),
+    medidas: Optional[str] = Query(None, description="Medidas separadas por vírgula"),
+    usar_consolidados: bool = Query(True, description="Usar os consolidados diários quando disponíveis"),
+    db: AsyncIOMotorDatabase = Depends(get_db)
+):
+    """Comparar indicadores de dois ou mais períodos com diferenças absolutas e percentuais"""
+    if db is None:
+        raise HTTPException(status_code=500, detail="Erro de conexão com o banco de dados")
+    
+    if not 2 <= len(periodo) <= 12:
+        raise HTTPException(status_code=400, detail="Informe de 2 a 12 períodos")
+    
+    crud = get_abate_completo_crud(db)
+    try:
+        periodos = []
+        for valor in periodo:
+            inicio, separador, fim = valor.partition(":")
+            if not separador:
+                raise HTTPException(status_code=400, detail=f"Período inválido: {valor}. Use YYYY-MM-DD:YYYY-MM-DD")
+            dt_inicio, dt_fim = _converter_periodo(inicio, fim)
+            if dt_inicio is None or dt_fim is None or dt_inicio > dt_fim:
+                raise HTTPException(status_code=400, detail=f"Período inválido: {valor}")
+            periodos.append((dt_inicio, dt_fim))
+        
+        return await crud.comparar_periodos(
+            periodos,
+            unidade=unidade,
+            tipo_ave=tipo_ave,
+            medidas=_separar_lista(medidas),
+            usar_consolidados=usar_consolidados
         )
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erro ao comparar períodos: {str(e)}")
+
+
+@router.get("/percentis", response_model=dict, dependencies=[condicional("abates_completos")])
+async def get_percentis_abates(
+    p: str = Query("10,25,50,75,90", description="Percentis (0-100) separados por vírgula"),
+    metricas: Optional[str] = Query(None, description="Métricas separadas por vírgula (padrão: todas com esboço)"),
+    unidade: Optional[str] = Query(None, description="Filtrar por unidade"),
+    tipo_ave: Optional[str] = Query(None, description="Filtrar por tipo de ave"),
+    data_inicio: Optional[str] = Query(None, description="Data de início (YYYY-MM-DD)"),
+    data_fim: Optional[str] = Query(None, description="Data de fim (YYYY-MM-DD)"),
+    db: AsyncIOMotorDatabase = Depends(get_db)
+):
+    """Faixas de percentis das métricas, pelos esboços mensais de quantis"""
+    if db is None:
+        raise HTTPException(status_code=500, detail="Erro de conexão com o banco de dados")
+    
+    crud = get_abate_completo_crud(db)
+    try:
+        try:
+            fracoes = [float(valor) / 100 for valor in _separar_lista(p)]
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Percentis devem ser números entre 0 e 100")
+        if not fracoes or any(not 0 <= fracao <= 1 for fracao in fracoes):
+            raise HTTPException(status_code=400, detail="Percentis devem ser números entre 0 e 100")
         
-        return [
-            {
-                "id": str(abate.id),
-                "data_abate": abate.data_abate,
-                "quantidade_aves": abate.quantidade_aves,
-                "valor_kg_vivo": abate.valor_kg_vivo,
-                "peso_total_kg": abate.peso_total_kg,
-                "peso_medio_ave": abate.peso_medio_ave,
-                "valor_total": abate.valor_total,
-                "unidade": abate.unidade,
-                "tipo_ave": abate.tipo_ave,
-                "observacoes": abate.observacoes,
-                "horarios": abate.horarios.model_dump(),
-                "produtos": [produto.model_dump() for produto in abate.produtos],
-                "despesas_fixas": abate.despesas_fixas.model_dump(),
-                "peso_inteiro_abatido": abate.peso_inteiro_abatido,
-                "preco_venda_kg": abate.preco_venda_kg,
-                # Métricas Cortes vs Inteiro
-                "cortes_peso_total": abate.cortes_peso_total,
-                "cortes_valor_total": abate.cortes_valor_total,
-                "cortes_percentual_peso": abate.cortes_percentual_peso,
-                "cortes_percentual_valor": abate.cortes_percentual_valor,
-                "inteiro_peso_total": abate.inteiro_peso_total,
-                "inteiro_valor_total": abate.inteiro_valor_total,
-                "inteiro_percentual_peso": abate.inteiro_percentual_peso,
-                "inteiro_percentual_valor": abate.inteiro_percentual_valor,
-                "created_at": abate.created_at,
-                "updated_at": abate.updated_at
-            }
-            for abate in abates
-        ]
+        dt_inicio, dt_fim = _converter_periodo(data_inicio, data_fim)
+        resultado = await crud.percentis(
+            fracoes,
+            metricas=_separar_lista(metricas),
+            unidade=unidade,
+            tipo_ave=tipo_ave,
+            data_inicio=dt_inicio,
+            data_fim=dt_fim
+        )
+        if resultado is None:
+            raise HTTPException(
+                status_code=503,
+                detail="Consolidados ainda não reconstruídos. Execute 'python consolidados_abates.py reconstruir'"
+            )
+        return resultado
     except HTTPException:
         raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Erro ao buscar abates por período: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Erro ao calcular percentis: {str(e)}")
+
+
+@router.get("/precos", response_model=dict, dependencies=[condicional("abates_completos")])
+async def get_precos_abates_completos(
+    unidade: Optional[str] = Query(None, description="Filtrar por unidade"),
+    tipo_ave: Optional[str] = Query(None, description="Filtrar por tipo de ave"),
+    data_inicio: Optional[str] = Query(None, description="Data de início (YYYY-MM-DD)"),
+    data_fim: Optional[str] = Query(None, description="Data de fim (YYYY-MM-DD)"),
+    db: AsyncIOMotorDatabase = Depends(get_db)
+):
+    """Estatísticas mensais do preço por kg do frango vivo, de venda e do spread"""
+    if db is None:
+        raise HTTPException(status_code=500, detail="Erro de conexão com o banco de dados")
+    
+    crud = get_abate_completo_crud(db)
+    try:
+        dt_inicio, dt_fim = _converter_periodo(data_inicio, data_fim)
+        return await crud.precos(
+            unidade=unidade,
+            tipo_ave=tipo_ave,
+            data_inicio=dt_inicio,
+            data_fim=dt_fim
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erro ao calcular estatísticas de preços: {str(e)}")
+
+
+@router.get("/cubo", response_model=dict, dependencies=[condicional("abates_completos")])
+async def get_cubo_abates(
+    granularidade: str = Query("mes", pattern="^(dia|semana|mes|ano)$", description="Granularidade do período"),
+    dimensoes: str = Query("periodo", description="Dimensões mantidas, separadas por vírgula (unidade, tipo_ave, periodo); vazio soma tudo"),
+    medidas: Optional[str] = Query(None, description="Medidas separadas por vírgula"),
+    unidade: Optional[List[str]] = Query(None, description="Unidades da fatia (valor exato, pode repetir)"),
+    tipo_ave: Optional[List[str]] = Query(None, description="Tipos de ave da fatia (valor exato, pode repetir)"),
+    data_inicio: Optional[str] = Query(None, description="Data de início (YYYY-MM-DD)"),
+    data_fim: Optional[str] = Query(None, description="Data de fim (YYYY-MM-DD)"),
+    db: AsyncIOMotorDatabase = Depends(get_db)
+):
+    """Fatia do cubo unidade × tipo_ave × período, respondida pelos consolidados"""
+    if db is None:
+        raise HTTPException(status_code=500, detail="Erro de conexão com o banco de dados")
+    
+    crud = get_abate_completo_crud(db)
+    try:
+        dt_inicio, dt_fim = _converter_periodo(data_inicio, data_fim)
+        resultado = await crud.cubo(
+            granularidade=granularidade,
+            dimensoes=_separar_lista(dimensoes),
+            medidas=_separar_lista(medidas),
+            unidades=unidade,
+            tipos_ave=tipo_ave,
+            data_inicio=dt_inicio,
+            data_fim=dt_fim
+        )
+        if resultado is None:
+            raise HTTPException(
+                status_code=503,
+                detail="Consolidados ainda não reconstruídos. Execute 'python consolidados_abates.py reconstruir'"
+            )
+        return resultado
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erro ao consultar cubo dos abates: {str(e)}")
+
+
+@router.get("/cubo/membros", response_model=dict, dependencies=[condicional("abates_completos")])
+async def get_membros_cubo_abates(
+    db: AsyncIOMotorDatabase = Depends(get_db)
+):
+    """Valores de unidade e tipo_ave disponíveis para as fatias do cubo"""
+    if db is None:
+        raise HTTPException(status_code=500, detail="Erro de conexão com o banco de dados")
+    
+    crud = get_abate_completo_crud(db)
+    try:
+        return await crud.membros_cubo()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erro ao buscar membros do cubo: {str(e)}")
+
+
+@router.get("/{abate_id}/percentis", response_model=dict)
+async def get_percentis_abate(
+    abate_id: str,
+    meses: int = Query(1, ge=1, le=24, description="Meses de referência, terminando no mês do abate"),
+    db: AsyncIOMotorDatabase = Depends(get_db)
+):
+    """Percentil das métricas do abate entre os abates da mesma unidade"""
+    if db is None:
+        raise HTTPException(status_code=500, detail="Erro de conexão com o banco de dados")
+    
+    crud = get_abate_completo_crud(db)
+    try:
+        resultado = await crud.percentis_abate(abate_id, meses=meses)
+        if not resultado:
+            raise HTTPException(status_code=404, detail="Abate não encontrado")
+        return resultado
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erro ao calcular percentis do abate: {str(e)}")
 
 
 @router.get("/{abate_id}", response_model=dict)
@@ -514,7 +861,9 @@ async def update_abate_completo(
             "inteiro_percentual_peso": abate.inteiro_percentual_peso,
             "inteiro_percentual_valor": abate.inteiro_percentual_valor,
             "created_at": abate.created_at,
-            "updated_at": abate.updated_at
+            "updated_at": abate.updated_at,
+            # Métricas fora do padrão da unidade (z-score contra os outros abates)
+            "anomalias": await crud.anomalias(abate)
         }
     except ValueError as ve:
         print(f"ERROR: Erro de validação no PUT: {str(ve)}")
@@ -0,0 +1,79 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from ....core.db import get_db
+from ....crud.alertas import get_alerta_crud
+from .abates_completos import _converter_periodo
+
+router = APIRouter()
+
+
+@router.get("/", response_model=dict)
+async def get_alertas(
+    status: Optional[str] = Query("aberto", pattern="^(aberto|resolvido)$", description="Status dos alertas"),
+    unidade: Optional[str] = Query(None, description="Unidade (valor exato)"),
+    severidade: Optional[str] = Query(None, pattern="^(alta|media|baixa)$", description="Severidade"),
+    regra: Optional[str] = Query(None, description="Regra do alerta"),
+    data_inicio: Optional[str] = Query(None, description="Data de início (YYYY-MM-DD)"),
+    data_fim: Optional[str] = Query(None, description="Data de fim (YYYY-MM-DD)"),
+    skip: int = Query(0, ge=0, description="Número de registros para pular"),
+    limit: int = Query(100, ge=1, le=1000, description="Número máximo de registros"),
+    db: AsyncIOMotorDatabase = Depends(get_db)
+):
+    """Listar alertas dos abates (por padrão, os abertos)"""
+    if db is None:
+        raise HTTPException(status_code=500, detail="Erro de conexão com o banco de dados")
+    
+    crud = get_alerta_crud(db)
+    try:
+        dt_inicio, dt_fim = _converter_periodo(data_inicio, data_fim)
+        filtros = {
+            "status": status,
+            "unidade": unidade,
+            "severidade": severidade,
+            "regra": regra,
+            "data_inicio": dt_inicio,
+            "data_fim": dt_fim
+        }
+        return {
+            "total": await crud.count(**filtros),
+            "skip": skip,
+            "limit": limit,
+            "alertas": await crud.get_many(skip=skip, limit=limit, **filtros)
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erro ao buscar alertas: {str(e)}")
+
+
+@router.get("/resumo", response_model=dict)
+async def get_resumo_alertas(
+    status: Optional[str] = Query("aberto", pattern="^(aberto|resolvido)$", description="Status dos alertas"),
+    db: AsyncIOMotorDatabase = Depends(get_db)
+):
+    """Quantidade de alertas por severidade e por regra"""
+    if db is None:
+        raise HTTPException(status_code=500, detail="Erro de conexão com o banco de dados")
+    
+    crud = get_alerta_crud(db)
+    try:
+        return await crud.resumo(status=status)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erro ao resumir alertas: {str(e)}")
+
+
+@router.post("/reavaliar", response_model=dict)
+async def reavaliar_alertas(
+    db: AsyncIOMotorDatabase = Depends(get_db)
+):
+    """Reavaliar os alertas de todos os abates com os limites atuais"""
+    if db is None:
+        raise HTTPException(status_code=500, detail="Erro de conexão com o banco de dados")
+    
+    crud = get_alerta_crud(db)
+    try:
+        return await crud.reavaliar()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erro ao reavaliar alertas: {str(e)}")
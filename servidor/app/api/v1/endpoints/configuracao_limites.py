@@ -1,14 +1,26 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
 from typing import Optional
 
+from app.core.condicional import condicional
 from app.core.db import get_db
+from app.crud.alertas import get_alerta_crud
 from app.crud.configuracao_limites import get_configuracao_limites_crud
 from app.models.configuracao_limites import ConfiguracaoLimites, ConfiguracaoLimitesCreate, ConfiguracaoLimitesUpdate
 from motor.motor_asyncio import AsyncIOMotorDatabase
 
 router = APIRouter()
 
-@router.get("/", response_model=Optional[ConfiguracaoLimites])
+
+async def _reavaliar_alertas(db: AsyncIOMotorDatabase):
+    """Reavaliar os alertas históricos depois de uma mudança nos limites"""
+    try:
+        totais = await get_alerta_crud(db).reavaliar()
+        print(f"INFO: Alertas reavaliados: {totais}")
+    except Exception as e:
+        print(f"ERROR: Falha ao reavaliar alertas: {e}")
+
+
+@router.get("/", response_model=Optional[ConfiguracaoLimites], dependencies=[condicional("configuracao_limites")])
 async def get_configuracao_limites(
     db: AsyncIOMotorDatabase = Depends(get_db)
 ):
@@ -26,12 +38,14 @@ async def get_configuracao_limites(
 @router.post("/", response_model=ConfiguracaoLimites)
 async def create_or_update_configuracao_limites(
     config_data: ConfiguracaoLimitesCreate,
+    background_tasks: BackgroundTasks,
     db: AsyncIOMotorDatabase = Depends(get_db)
 ):
     """Criar ou atualizar configuração de limites e alertas"""
     try:
         crud = get_configuracao_limites_crud(db)
         config = await crud.create_or_update(config_data)
+        background_tasks.add_task(_reavaliar_alertas, db)
         return config
     except Exception as e:
         raise HTTPException(
@@ -42,6 +56,7 @@ async def create_or_update_configuracao_limites(
 @router.put("/", response_model=Optional[ConfiguracaoLimites])
 async def update_configuracao_limites(
     config_update: ConfiguracaoLimitesUpdate,
+    background_tasks: BackgroundTasks,
     db: AsyncIOMotorDatabase = Depends(get_db)
 ):
     """Atualizar configuração de limites e alertas"""
@@ -53,6 +68,7 @@ async def update_configuracao_limites(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Configuração de limites não encontrada"
             )
+        background_tasks.add_task(_reavaliar_alertas, db)
         return config
     except HTTPException:
         raise
@@ -64,6 +80,7 @@ async def update_configuracao_limites(
 
 @router.delete("/")
 async def delete_configuracao_limites(
+    background_tasks: BackgroundTasks,
     db: AsyncIOMotorDatabase = Depends(get_db)
 ):
     """Deletar configuração de limites e alertas"""
@@ -75,6 +92,7 @@ async def delete_configuracao_limites(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Configuração de limites não encontrada"
             )
+        background_tasks.add_task(_reavaliar_alertas, db)
         return {"message": "Configuração de limites deletada com sucesso"}
     except HTTPException:
         raise
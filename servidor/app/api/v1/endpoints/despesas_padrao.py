@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from typing import Optional
 
+from app.core.condicional import condicional
 from app.core.db import get_db
 from app.crud.despesas_padrao import get_despesas_padrao_crud
 from app.models.despesas_padrao import DespesasPadrao, DespesasPadraoCreate, DespesasPadraoUpdate
@@ -8,7 +9,7 @@ from motor.motor_asyncio import AsyncIOMotorDatabase
 
 router = APIRouter()
 
-@router.get("/", response_model=Optional[DespesasPadrao])
+@router.get("/", response_model=Optional[DespesasPadrao], dependencies=[condicional("despesas_padrao")])
 async def get_despesas_padrao(
     db: AsyncIOMotorDatabase = Depends(get_db)
 ):
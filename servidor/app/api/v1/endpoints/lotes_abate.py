@@ -1,9 +1,11 @@
 from datetime import datetime
 from typing import List, Optional
-from fastapi import APIRouter, HTTPException, Query, Depends
+from fastapi import APIRouter, HTTPException, Query, Depends, Response
 from app.models.lote_abate import LoteAbate, LoteAbateCreate, LoteAbateUpdate
 from app.crud.lote_abate import get_lote_abate_crud, CRUDLoteAbate
+from app.core.condicional import condicional
 from app.core.db import get_db
+from app.services import envelope, paginacao
 from motor.motor_asyncio import AsyncIOMotorDatabase
 
 router = APIRouter()
@@ -36,29 +38,31 @@ async def create_lote_abate(
         raise HTTPException(status_code=500, detail=f"Erro ao criar lote: {str(e)}")
 
 
-@router.get("/", response_model=List[dict])
+@router.get("/", response_model=List[dict], dependencies=[condicional("lotes_abate")])
 async def list_lotes_abate(
+    response: Response,
     skip: int = Query(0, ge=0, description="Número de registros para pular"),
     limit: int = Query(100, ge=1, le=1000, description="Limite de registros por página"),
     unidade: Optional[str] = Query(None, description="Filtrar por unidade"),
     tipo_ave: Optional[str] = Query(None, description="Filtrar por tipo de ave"),
+    modo_busca: str = Query("exata", pattern="^(exata|prefixo)$", description="Comparar unidade e tipo de ave por igualdade ou por prefixo (sem acentos e maiúsculas)"),
+    cursor: Optional[str] = Query(None, description="Cursor da próxima página (cabeçalho X-Proximo-Cursor da resposta anterior); substitui skip"),
     db: AsyncIOMotorDatabase = Depends(get_db)
 ):
-    """Listar lotes de abate com filtros opcionais"""
+    """Listar lotes de abate com filtros opcionais, mais recentes primeiro"""
     if db is None:
         raise HTTPException(status_code=500, detail="Erro de conexão com o banco de dados")
     
     crud = get_lote_abate_crud(db)
     try:
         # Construir filtros
-        filters = {}
-        if unidade:
-            filters["unidade"] = {"$regex": unidade, "$options": "i"}
-        if tipo_ave:
-            filters["tipo_ave"] = tipo_ave
+        filters = crud.montar_filtro(unidade, tipo_ave, modo_busca)
         
         # Buscar lotes com filtros e paginação
-        lotes = await crud.get_multi(skip=skip, limit=limit, filters=filters)
+        lotes = await crud.get_multi(skip=skip, limit=limit, filters=filters, cursor=cursor)
+        proximo_cursor = paginacao.proximo(lotes, limit)
+        if proximo_cursor:
+            response.headers[paginacao.CABECALHO] = proximo_cursor
         
         # Converter para formato de resposta
         result = []
@@ -76,14 +80,17 @@ async def list_lotes_abate(
             })
         
         return result
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erro ao buscar lotes: {str(e)}")
 
 
-@router.get("/count", response_model=dict)
+@router.get("/count", response_model=dict, dependencies=[condicional("lotes_abate")])
 async def count_lotes_abate(
     unidade: Optional[str] = Query(None, description="Filtrar por unidade"),
     tipo_ave: Optional[str] = Query(None, description="Filtrar por tipo de ave"),
+    modo_busca: str = Query("exata", pattern="^(exata|prefixo)$", description="Comparar unidade e tipo de ave por igualdade ou por prefixo (sem acentos e maiúsculas)"),
     db: AsyncIOMotorDatabase = Depends(get_db)
 ):
     """Contar total de lotes de abate"""
@@ -92,13 +99,56 @@ async def count_lotes_abate(
     
     crud = get_lote_abate_crud(db)
     try:
-        total = await crud.count(unidade=unidade, tipo_ave=tipo_ave)
+        total = await crud.count(unidade=unidade, tipo_ave=tipo_ave, modo_busca=modo_busca)
         return {"total": total}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erro ao contar lotes: {str(e)}")
 
 
-@router.get("/periodo", response_model=List[dict])
+@router.get("/pagina", response_model=dict, dependencies=[condicional("lotes_abate")])
+async def pagina_lotes_abate(
+    skip: int = Query(0, ge=0, description="Número de registros para pular"),
+    limit: int = Query(100, ge=1, le=1000, description="Limite de registros por página"),
+    unidade: Optional[str] = Query(None, description="Filtrar por unidade"),
+    tipo_ave: Optional[str] = Query(None, description="Filtrar por tipo de ave"),
+    modo_busca: str = Query("exata", pattern="^(exata|prefixo)$", description="Comparar unidade e tipo de ave por igualdade ou por prefixo (sem acentos e maiúsculas)"),
+    cursor: Optional[str] = Query(None, description="Cursor da próxima página (paging.proximo_cursor da resposta anterior); substitui skip"),
+    db: AsyncIOMotorDatabase = Depends(get_db)
+):
+    """Página de lotes com ``items``, ``total`` e ``paging`` numa só requisição (página e total em duas consultas simultâneas)"""
+    if db is None:
+        raise HTTPException(status_code=500, detail="Erro de conexão com o banco de dados")
+    
+    crud = get_lote_abate_crud(db)
+    try:
+        filters = crud.montar_filtro(unidade, tipo_ave, modo_busca)
+        lotes, total = await crud.get_multi_com_total(skip=skip, limit=limit, filters=filters, cursor=cursor)
+        itens = [
+            {
+                "id": str(lote.id),
+                "data_abate": lote.data_abate,
+                "quantidade_aves": lote.quantidade_aves,
+                "peso_total_kg": lote.peso_total_kg,
+                "unidade": lote.unidade,
+                "tipo_ave": lote.tipo_ave,
+                "observacoes": lote.observacoes,
+                "created_at": lote.created_at,
+                "updated_at": lote.updated_at
+            }
+            for lote in lotes
+        ]
+        return envelope.montar(
+            itens, total, 0 if cursor else skip, limit,
+            proximo_cursor=paginacao.proximo(lotes, limit),
+            por_cursor=bool(cursor)
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erro ao buscar página de lotes: {str(e)}")
+
+
+@router.get("/periodo", response_model=List[dict], dependencies=[condicional("lotes_abate")])
 async def get_lotes_by_period(
     start_date: datetime = Query(..., description="Data inicial (ISO format)"),
     end_date: datetime = Query(..., description="Data final (ISO format)"),
@@ -3,8 +3,10 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from datetime import datetime
 
+from app.core.condicional import condicional
 from app.core.db import get_db
 from app.crud.produto import get_produto_crud
+from app.services import envelope
 from app.models.produto import Produto, ProdutoCreate, ProdutoUpdate
 from app.api.v1.endpoints.produto_log import criar_log_alteracao_produto
 
@@ -21,13 +23,14 @@ async def create_produto(
     return await crud.create(produto_data)
 
 
-@router.get("/", response_model=List[Produto])
+@router.get("/", response_model=List[Produto], dependencies=[condicional("produtos")])
 async def list_produtos(
     skip: int = Query(0, ge=0, description="Número de registros para pular"),
     limit: int = Query(100, ge=1, le=1000, description="Limite de registros por página"),
     search: Optional[str] = Query(None, description="Buscar por nome, tipo ou categoria"),
     tipo: Optional[str] = Query(None, description="Filtrar por tipo de produto"),
     unidade_origem: Optional[str] = Query(None, description="Filtrar por unidade de origem"),
+    modo_busca: str = Query("exata", pattern="^(exata|prefixo)$", description="Comparar tipo e unidade de origem por igualdade ou por prefixo (sem acentos e maiúsculas)"),
     db: AsyncIOMotorDatabase = Depends(get_db)
 ):
     """Listar produtos/cortes com filtros opcionais"""
@@ -37,23 +40,49 @@ async def list_produtos(
         limit=limit,
         search=search,
         tipo=tipo, 
-        unidade_origem=unidade_origem
+        unidade_origem=unidade_origem,
+        modo_busca=modo_busca
     )
 
 
-@router.get("/count", response_model=dict)
+@router.get("/count", response_model=dict, dependencies=[condicional("produtos")])
 async def count_produtos(
     tipo: Optional[str] = Query(None, description="Filtrar por tipo de produto"),
     unidade_origem: Optional[str] = Query(None, description="Filtrar por unidade de origem"),
+    modo_busca: str = Query("exata", pattern="^(exata|prefixo)$", description="Comparar tipo e unidade de origem por igualdade ou por prefixo (sem acentos e maiúsculas)"),
     db: AsyncIOMotorDatabase = Depends(get_db)
 ):
     """Contar total de produtos/cortes"""
     crud = get_produto_crud(db)
-    total = await crud.count(tipo=tipo, unidade_origem=unidade_origem)
+    total = await crud.count(tipo=tipo, unidade_origem=unidade_origem, modo_busca=modo_busca)
     return {"total": total}
 
 
-@router.get("/tipo/{tipo}", response_model=List[Produto])
+@router.get("/pagina", response_model=dict, dependencies=[condicional("produtos")])
+async def pagina_produtos(
+    skip: int = Query(0, ge=0, description="Número de registros para pular"),
+    limit: int = Query(100, ge=1, le=1000, description="Limite de registros por página"),
+    search: Optional[str] = Query(None, description="Buscar por nome, tipo ou categoria"),
+    tipo: Optional[str] = Query(None, description="Filtrar por tipo de produto"),
+    unidade_origem: Optional[str] = Query(None, description="Filtrar por unidade de origem"),
+    modo_busca: str = Query("exata", pattern="^(exata|prefixo)$", description="Comparar tipo e unidade de origem por igualdade ou por prefixo (sem acentos e maiúsculas)"),
+    db: AsyncIOMotorDatabase = Depends(get_db)
+):
+    """Página de produtos/cortes com ``items``, ``total`` e ``paging`` numa só requisição (página e total tirados do catálogo em memória)"""
+    crud = get_produto_crud(db)
+    produtos, total = await crud.get_multi_com_total(
+        skip=skip,
+        limit=limit,
+        search=search,
+        tipo=tipo,
+        unidade_origem=unidade_origem,
+        modo_busca=modo_busca
+    )
+    itens = [produto.model_dump(by_alias=True) for produto in produtos]
+    return envelope.montar(itens, total, skip, limit)
+
+
+@router.get("/tipo/{tipo}", response_model=List[Produto], dependencies=[condicional("produtos")])
 async def get_produtos_by_tipo(
     tipo: str,
     db: AsyncIOMotorDatabase = Depends(get_db)
@@ -63,7 +92,7 @@ async def get_produtos_by_tipo(
     return await crud.get_by_tipo(tipo)
 
 
-@router.get("/preco", response_model=List[Produto])
+@router.get("/preco", response_model=List[Produto], dependencies=[condicional("produtos")])
 async def get_produtos_by_price_range(
     min_price: float = Query(..., ge=0, description="Preço mínimo por kg"),
     max_price: float = Query(..., ge=0, description="Preço máximo por kg"),
@@ -0,0 +1,91 @@
+"""
+GET condicional (ETag / If-None-Match) das listagens, contagens e agregações.
+
+As rotas declaram as coleções de que a resposta depende:
+
+    @router.get("/resumo", response_model=dict, dependencies=[condicional("abates_completos")])
+
+Antes do endpoint, a dependência lê os contadores dessas coleções
+(``versoes_colecoes``, uma consulta) e monta um ETag forte a partir deles,
+do caminho, dos parâmetros da consulta e do ``Accept``. Se o ETag coincide
+com o ``If-None-Match`` da requisição, a resposta é um 304 sem corpo e o
+endpoint nem roda; senão o middleware acrescenta ``ETag`` e
+``Cache-Control`` à resposta do endpoint.
+
+Os contadores são lidos antes dos dados: uma escrita concorrente pode fazer
+uma resposta nova sair com o ETag anterior (o cliente só vai buscá-la de
+novo), nunca o contrário.
+"""
+
+import hashlib
+from datetime import date
+from typing import Optional
+
+from fastapi import Depends, Request, Response
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from ..services import versoes_colecoes
+from ..services.metrics_calculator import MetricsCalculator
+from .db import get_db
+
+# O cliente pode guardar a resposta, mas deve revalidá-la a cada uso
+CACHE_CONTROL = "private, no-cache"
+
+
+class NaoModificado(Exception):
+    """A representação guardada pelo cliente continua válida (304)"""
+
+    def __init__(self, etag: str):
+        self.etag = etag
+
+
+def gerar_etag(request: Request, versoes: dict) -> str:
+    partes = [
+        request.url.path,
+        "&".join(f"{chave}={valor}" for chave, valor in sorted(request.query_params.multi_items())),
+        request.headers.get("accept", ""),
+        ",".join(f"{colecao}:{versao}" for colecao, versao in sorted(versoes.items())),
+        # Períodos padrão relativos a hoje e fórmulas das métricas
+        date.today().isoformat(),
+        str(MetricsCalculator.VERSAO),
+    ]
+    return '"' + hashlib.blake2b("\n".join(partes).encode(), digest_size=16).hexdigest() + '"'
+
+
+def corresponde(if_none_match: Optional[str], etag: str) -> bool:
+    """Comparação fraca do If-None-Match (lista de ETags ou ``*``)"""
+    if not if_none_match:
+        return False
+    for candidato in if_none_match.split(","):
+        candidato = candidato.strip()
+        if candidato == "*" or candidato.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def condicional(*colecoes: str):
+    """Dependência de rota: ETag das ``colecoes`` e 304 quando nada mudou"""
+
+    async def verificar(request: Request, db: AsyncIOMotorDatabase = Depends(get_db)) -> None:
+        if db is None:
+            return
+        etag = gerar_etag(request, await versoes_colecoes.consultar(db, colecoes))
+        if corresponde(request.headers.get("if-none-match"), etag):
+            raise NaoModificado(etag)
+        request.state.etag = etag
+
+    return Depends(verificar)
+
+
+def resposta_nao_modificado(request: Request, exc: NaoModificado) -> Response:
+    return Response(status_code=304, headers={"ETag": exc.etag, "Cache-Control": CACHE_CONTROL})
+
+
+async def acrescentar_cabecalhos(request: Request, call_next):
+    """Middleware: ``ETag`` e ``Cache-Control`` nas respostas 200 das rotas condicionais"""
+    response = await call_next(request)
+    etag = getattr(request.state, "etag", None)
+    if etag and response.status_code == 200:
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = CACHE_CONTROL
+    return response
@@ -17,6 +17,20 @@ class Settings(BaseSettings):
     ACCESS_TOKEN_EXPIRE_MINUTES: int = Field(default_factory=lambda: int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "60")))
     COOKIE_SECURE: bool = Field(default_factory=lambda: os.getenv("COOKIE_SECURE", "false").lower() == "true")
 
+    # Varredura de métricas desatualizadas (executada em segundo plano na inicialização)
+    METRICAS_VARREDURA_ATIVA: bool = Field(default=True)
+    METRICAS_VARREDURA_LOTE: int = Field(default=200)
+    METRICAS_VARREDURA_INTERVALO: float = Field(default=1.0, description="Pausa entre lotes, em segundos")
+
+    # Varredura das chaves de busca ausentes (documentos importados direto no banco)
+    BUSCA_VARREDURA_ATIVA: bool = Field(default=True)
+    BUSCA_VARREDURA_LOTE: int = Field(default=500)
+    BUSCA_VARREDURA_INTERVALO: float = Field(default=0.5, description="Pausa entre lotes, em segundos")
+
+    # Catálogo de produtos em memória: recarregado quando o contador de alterações
+    # muda e também após este tempo, pois scripts não incrementam o contador
+    CATALOGO_PRODUTOS_VALIDADE: float = Field(default=60.0, description="Idade máxima do catálogo, em segundos")
+
     @property
     def cors_origins(self) -> List[str]:
         """Convert CORS string to list"""
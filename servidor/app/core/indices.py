@@ -0,0 +1,159 @@
+"""
+Índices declarados das coleções do MongoDB.
+
+``INDICES`` é a fonte única dos índices usados pelas consultas dos CRUDs e
+serviços. Na inicialização da aplicação ``garantir_indices`` cria os que
+faltam (``create_index`` é idempotente) e relata a deriva: índices com as
+mesmas chaves mas opções diferentes e índices existentes que não estão
+declarados. Índices nunca são removidos automaticamente.
+
+``indices_mongodb.py`` mostra o mesmo relatório e as estatísticas de uso
+(``$indexStats``) pela linha de comando.
+"""
+
+from typing import Any, Dict, List, NamedTuple, Sequence, Tuple
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ASCENDING, DESCENDING
+
+from ..services import alertas, anomalias, consolidados, precos_frango
+
+
+class Indice(NamedTuple):
+    colecao: str
+    chaves: Tuple[Tuple[str, int], ...]
+    unico: bool = False
+
+    @property
+    def nome(self) -> str:
+        """Nome padrão do MongoDB (``campo_1_outro_-1``)"""
+        return "_".join(f"{campo}_{direcao}" for campo, direcao in self.chaves)
+
+
+def _indice(colecao: str, *chaves: Tuple[str, int], unico: bool = False) -> Indice:
+    return Indice(colecao, tuple(chaves), unico)
+
+
+_CELULA = (("periodo", ASCENDING), ("unidade", ASCENDING), ("tipo_ave", ASCENDING))
+
+INDICES: List[Indice] = [
+    # Listagens, contagens e agregações por período e pelas chaves de busca
+    # de unidade e tipo de ave (igualdade ou prefixo, ver ``busca``); o
+    # ``_id`` no fim atende a paginação por cursor (ver ``paginacao``)
+    _indice("abates_completos", ("data_abate", DESCENDING), ("_id", DESCENDING)),
+    _indice("abates_completos", ("busca.unidade", ASCENDING), ("data_abate", DESCENDING), ("_id", DESCENDING)),
+    _indice("abates_completos", ("busca.tipo_ave", ASCENDING), ("data_abate", DESCENDING), ("_id", DESCENDING)),
+    # Varredura de métricas de versões antigas
+    _indice("abates_completos", ("metricas_versao", ASCENDING)),
+
+    _indice("lotes_abate", ("data_abate", DESCENDING), ("_id", DESCENDING)),
+    _indice("lotes_abate", ("busca.unidade", ASCENDING), ("data_abate", DESCENDING), ("_id", DESCENDING)),
+    _indice("lotes_abate", ("busca.tipo_ave", ASCENDING), ("data_abate", DESCENDING), ("_id", DESCENDING)),
+
+    # produtos: sem índices secundários, o catálogo é lido inteiro para a
+    # memória (ver ``catalogo_produtos``)
+
+    _indice("produto_logs", ("produto_id", ASCENDING), ("data_alteracao", DESCENDING)),
+    _indice("produto_logs", ("data_alteracao", DESCENDING)),
+
+    _indice("usuarios", ("username", ASCENDING), unico=True),
+    _indice("usuarios", ("email", ASCENDING), unico=True),
+
+    _indice("configuracao_limites", ("updated_at", DESCENDING)),
+
+    _indice(alertas.COLECAO, ("abate_id", ASCENDING), ("regra", ASCENDING), unico=True),
+    _indice(alertas.COLECAO, ("status", ASCENDING), ("data_abate", DESCENDING)),
+    _indice(alertas.COLECAO, ("status", ASCENDING), ("unidade", ASCENDING), ("data_abate", DESCENDING)),
+    _indice(alertas.COLECAO, ("status", ASCENDING), ("severidade", ASCENDING), ("data_abate", DESCENDING)),
+
+    # Uma célula por período × unidade × tipo_ave (upserts dos consolidados)
+    *[_indice(colecao, *_CELULA, unico=True) for colecao in consolidados.GRANULARIDADES],
+
+    _indice(precos_frango.COLECAO_CACHE, ("unidade", ASCENDING), ("tipo_ave", ASCENDING), ("mes", ASCENDING), unico=True),
+    _indice(precos_frango.COLECAO_CACHE, ("mes", ASCENDING)),
+
+    _indice(anomalias.COLECAO, ("unidade", ASCENDING), ("versao", ASCENDING), unico=True),
+]
+
+
+def por_colecao(indices: Sequence[Indice] = INDICES) -> Dict[str, List[Indice]]:
+    resultado = {}
+    for indice in indices:
+        resultado.setdefault(indice.colecao, []).append(indice)
+    return resultado
+
+
+def chaves(existente: Dict[str, Any]) -> Tuple[Tuple[str, Any], ...]:
+    """Chaves de um índice de ``list_indexes`` (direções numéricas como int)"""
+    return tuple(
+        (campo, direcao if isinstance(direcao, str) else int(direcao))
+        for campo, direcao in existente["key"].items()
+    )
+
+
+def comparar(declarados: Sequence[Indice], existentes: Sequence[Dict[str, Any]]) -> Dict[str, List[str]]:
+    """Comparar os índices declarados de uma coleção com os de ``list_indexes``.
+
+    Retorna os nomes dos índices ``faltando``, ``divergentes`` (mesmas chaves,
+    opção ``unique`` diferente) e ``extras`` (existentes e não declarados).
+    """
+    por_chaves = {chaves(existente): existente for existente in existentes}
+    relatorio = {"faltando": [], "divergentes": [], "extras": []}
+    for indice in declarados:
+        existente = por_chaves.pop(indice.chaves, None)
+        if existente is None:
+            relatorio["faltando"].append(indice.nome)
+        elif bool(existente.get("unique")) != indice.unico:
+            relatorio["divergentes"].append(existente["name"])
+    relatorio["extras"] = [existente["name"] for existente in por_chaves.values() if existente["name"] != "_id_"]
+    return relatorio
+
+
+async def verificar_indices(db: AsyncIOMotorDatabase) -> Dict[str, Dict[str, List[str]]]:
+    """Relatório de deriva por coleção (só coleções com alguma diferença)"""
+    resultado = {}
+    for colecao, declarados in por_colecao().items():
+        existentes = await db[colecao].list_indexes().to_list(length=None)
+        relatorio = comparar(declarados, existentes)
+        if any(relatorio.values()):
+            resultado[colecao] = relatorio
+    return resultado
+
+
+async def garantir_indices(db: AsyncIOMotorDatabase) -> Dict[str, Dict[str, List[str]]]:
+    """Criar os índices declarados que faltam e relatar a deriva restante.
+
+    Um índice que não pode ser criado (por exemplo, único sobre dados
+    duplicados) não impede a criação dos demais e aparece em ``erros``.
+    """
+    deriva = await verificar_indices(db)
+    declarados = {(indice.colecao, indice.nome): indice for indice in INDICES}
+    for colecao, relatorio in deriva.items():
+        criados, erros = [], []
+        for nome in relatorio["faltando"]:
+            indice = declarados[(colecao, nome)]
+            try:
+                await db[colecao].create_index(list(indice.chaves), unique=indice.unico)
+                criados.append(nome)
+            except Exception as e:
+                erros.append(f"{nome}: {e}")
+        relatorio["criados"] = criados
+        relatorio["erros"] = erros
+        relatorio["faltando"] = [nome for nome in relatorio["faltando"] if nome not in criados]
+    return deriva
+
+
+def imprimir_relatorio(deriva: Dict[str, Dict[str, List[str]]]) -> None:
+    """Registrar o relatório de ``garantir_indices`` no log"""
+    if not deriva:
+        print("INFO: Índices do MongoDB conferidos, sem deriva")
+        return
+    for colecao, relatorio in sorted(deriva.items()):
+        if relatorio.get("criados"):
+            print(f"INFO: Índices criados em {colecao}: {', '.join(relatorio['criados'])}")
+        for erro in relatorio.get("erros", []):
+            print(f"ERROR: Não foi possível criar índice em {colecao}: {erro}")
+        if relatorio["divergentes"]:
+            print(f"AVISO: Índices com opções divergentes em {colecao}: {', '.join(relatorio['divergentes'])}")
+        if relatorio["extras"]:
+            print(f"AVISO: Índices não declarados em {colecao}: {', '.join(relatorio['extras'])}")
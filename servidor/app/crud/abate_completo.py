@@ -1,21 +1,105 @@
-from typing import List, Optional, Dict, Any
-from datetime import datetime
+import asyncio
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple
+from datetime import datetime, timedelta
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from bson import ObjectId
+from pymongo import UpdateOne
+from pymongo.errors import OperationFailure
 from ..models.abate_completo import (
     AbateCompleto,
     AbateCompletoCreate,
     AbateCompletoUpdate,
-    AbateCompletoInDB
+    AbateCompletoInDB,
+    DespesasFixas
 )
 from ..core.db import get_collection
 from ..services.metrics_calculator import MetricsCalculator
+from ..services import anomalias, busca, consolidados, cubo, envelope, leitura_rapida, paginacao, precos_frango, quantis, relatorio_consolidado, versoes_colecoes, visoes_abate
+from .alertas import get_alerta_crud
+
+# Código de erro do MongoDB para transações em servidor standalone
+_ERRO_TRANSACAO_NAO_SUPORTADA = 20
+
+
+# Métricas acompanhadas pelo endpoint de tendências
+METRICAS_TENDENCIA = ("rendimento_final", "lucro_liquido", "eficiencia_operacional")
+
+# Granularidades da série de tendências e a unidade correspondente do $dateTrunc
+UNIDADES_TEMPO = {"dia": "day", "semana": "week", "mes": "month"}
+
+
+def _estagio_posicao(prefixo: str) -> Dict[str, Any]:
+    """Numerar os abates por data (``<prefixo>_posicao``) e contar o total (``<prefixo>_total``)"""
+    return {"$setWindowFields": {
+        "sortBy": {"data_abate": 1, "_id": 1},
+        "output": {
+            f"{prefixo}_posicao": {"$documentNumber": {}},
+            f"{prefixo}_total": {"$count": {}, "window": {"documents": ["unbounded", "unbounded"]}}
+        }
+    }}
+
+
+def _segmentos_tendencia(prefixo: str, fracao_recente: float = 0.3) -> Dict[str, Any]:
+    """Marcar em que segmentos de comparação cada abate numerado cai.
+
+    ``primeira_metade``: metade mais antiga do período. ``recente`` e
+    ``anterior``: a fração mais recente dos abates e a fração imediatamente
+    anterior; com menos de 3 abates as duas metades são usadas, como no Dashboard.
+    """
+    posicao = f"${prefixo}_posicao"
+    total = f"${prefixo}_total"
+    metade = {"$max": [1, {"$floor": {"$divide": [total, 2]}}]}
+    grupo = {"$max": [1, {"$floor": {"$multiply": [total, fracao_recente]}}]}
+    return {
+        f"{prefixo}.primeira_metade": {"$lte": [posicao, metade]},
+        f"{prefixo}.recente": {"$cond": [
+            {"$gte": [total, 3]},
+            {"$gt": [posicao, {"$subtract": [total, grupo]}]},
+            {"$gt": [posicao, metade]}
+        ]},
+        f"{prefixo}.anterior": {"$cond": [
+            {"$gte": [total, 3]},
+            {"$and": [
+                {"$gt": [posicao, {"$subtract": [total, {"$multiply": [grupo, 2]}]}]},
+                {"$lte": [posicao, {"$subtract": [total, grupo]}]}
+            ]},
+            {"$lte": [posicao, metade]}
+        ]}
+    }
 
 
 class AbateCompletoCRUD:
+    # None até a primeira escrita descobrir se o servidor aceita transações
+    transacoes_suportadas: Optional[bool] = None
+
     def __init__(self, db: AsyncIOMotorDatabase):
         self.db = db
         self.collection = get_collection(db, "abates_completos")
+        self.alertas = get_alerta_crud(db)
+
+    @staticmethod
+    def _montar_filtro(
+        unidade: Optional[str] = None,
+        tipo_ave: Optional[str] = None,
+        data_inicio: Optional[datetime] = None,
+        data_fim: Optional[datetime] = None,
+        modo_busca: str = busca.EXATA
+    ) -> Dict[str, Any]:
+        """Montar o filtro de busca comum às listagens, contagens e agregações.
+
+        Unidade e tipo de ave são comparados pelas chaves normalizadas
+        (``busca``), também gravadas nos consolidados.
+        """
+        query = busca.aplicar({}, {"unidade": unidade, "tipo_ave": tipo_ave}, modo_busca)
+        if data_inicio or data_fim:
+            date_query = {}
+            if data_inicio:
+                date_query["$gte"] = data_inicio
+            if data_fim:
+                date_query["$lte"] = data_fim
+            query["data_abate"] = date_query
+        
+        return query
 
     async def create(self, abate_data: AbateCompletoCreate) -> AbateCompleto:
         """Criar um novo abate completo"""
@@ -27,8 +111,21 @@ class AbateCompletoCRUD:
         calculator = MetricsCalculator()
         metricas = calculator.calcular_metricas_completas(abate_dict)
         abate_dict.update(metricas)
+        abate_dict["metricas_versao"] = MetricsCalculator.VERSAO
+        abate_dict[busca.CAMPO] = busca.chaves(abate_dict, busca.CAMPOS["abates_completos"])
+        limites = await self.alertas.limites()
         
-        result = await self.collection.insert_one(abate_dict)
+        async def inserir(session):
+            result = await self.collection.insert_one(abate_dict, session=session)
+            await self._atualizar_consolidados(None, abate_dict, session)
+            await self.alertas.sincronizar([{**abate_dict, "_id": result.inserted_id}], limites, session)
+            return result
+        
+        result = await self._em_transacao(inserir)
+        # Estatísticas da unidade e contador são compartilhados por todas as escritas:
+        # ficam fora da transação para não fazer abates simultâneos conflitarem neles
+        await self._atualizar_estatisticas(None, abate_dict)
+        await versoes_colecoes.incrementar(self.db, self.collection.name)
         abate_dict["_id"] = result.inserted_id
         
         return AbateCompleto(**abate_dict)
@@ -40,6 +137,7 @@ class AbateCompletoCRUD:
             
         abate_data = await self.collection.find_one({"_id": ObjectId(abate_id)})
         if abate_data:
+            await self._atualizar_metricas_desatualizadas([abate_data])
             return AbateCompleto(**abate_data)
         return None
 
@@ -50,30 +148,25 @@ class AbateCompletoCRUD:
         unidade: Optional[str] = None,
         tipo_ave: Optional[str] = None,
         data_inicio: Optional[datetime] = None,
-        data_fim: Optional[datetime] = None
+        data_fim: Optional[datetime] = None,
+        modo_busca: str = busca.EXATA,
+        cursor: Optional[str] = None
     ) -> List[AbateCompleto]:
-        """Buscar múltiplos abates completos com filtros"""
-        query = {}
-        
-        if unidade:
-            query["unidade"] = {"$regex": unidade, "$options": "i"}
-        if tipo_ave:
-            query["tipo_ave"] = {"$regex": tipo_ave, "$options": "i"}
-        if data_inicio or data_fim:
-            date_query = {}
-            if data_inicio:
-                date_query["$gte"] = data_inicio
-            if data_fim:
-                date_query["$lte"] = data_fim
-            query["data_abate"] = date_query
-        
-        cursor = self.collection.find(query).skip(skip).limit(limit).sort("data_abate", -1)
-        abates = []
+        """Buscar múltiplos abates completos com filtros, mais recentes primeiro.
+
+        Com ``cursor`` (de ``paginacao.proximo``) a página começa depois do
+        último abate da página anterior e ``skip`` é ignorado.
+        """
+        query = self._montar_filtro(unidade, tipo_ave, data_inicio, data_fim, modo_busca)
+        if cursor:
+            query = paginacao.aplicar(query, cursor)
+            skip = 0
         
-        async for abate_data in cursor:
-            abates.append(AbateCompleto(**abate_data))
+        resultado = self.collection.find(query).sort(paginacao.ORDEM).skip(skip).limit(limit)
+        documentos = await resultado.to_list(length=limit)
+        await self._atualizar_metricas_desatualizadas(documentos)
         
-        return abates
+        return [AbateCompleto(**abate_data) for abate_data in documentos]
 
     async def update(self, abate_id: str, abate_update: AbateCompletoUpdate) -> Optional[AbateCompleto]:
         """Atualizar abate completo"""
@@ -87,61 +180,388 @@ class AbateCompletoCRUD:
             if not current_doc:
                 return None
             
+            # Gravar apenas os campos que realmente mudaram
+            update_data = {
+                campo: valor for campo, valor in update_data.items()
+                if current_doc.get(campo) != valor
+            }
+
             # Mesclar dados atuais com atualizações
             merged_data = {**current_doc, **update_data}
-            
-            # Recalcular métricas se dados relevantes foram alterados
-            relevant_fields = {
-                'quantidade_aves', 'valor_kg_vivo', 'peso_total_kg', 'peso_medio_ave',
-                'valor_total', 'produtos', 'despesas_fixas', 'horarios'
-            }
-            
-            if any(field in update_data for field in relevant_fields):
-                calculator = MetricsCalculator()
-                metricas = calculator.calcular_metricas_completas(merged_data)
-                update_data.update(metricas)
+            chaves_busca = busca.chaves(merged_data, busca.CAMPOS["abates_completos"])
+            if current_doc.get(busca.CAMPO) != chaves_busca:
+                update_data[busca.CAMPO] = chaves_busca
+
+            # Recalcular somente as métricas que dependem dos campos alterados e
+            # gravar as que mudaram; documentos de versão antiga têm todas recalculadas
+            if MetricsCalculator.metricas_desatualizadas(current_doc):
+                update_data.update(MetricsCalculator.calcular_metricas_completas(merged_data))
+                update_data["metricas_versao"] = MetricsCalculator.VERSAO
+            else:
+                metricas_afetadas = MetricsCalculator.metricas_afetadas(update_data.keys())
+                if metricas_afetadas:
+                    metricas = MetricsCalculator.calcular_metricas_parciais(merged_data, metricas_afetadas)
+                    update_data.update({
+                        nome: valor for nome, valor in metricas.items()
+                        if current_doc.get(nome) != valor
+                    })
             
             update_data["updated_at"] = datetime.utcnow()
+            novo = {**merged_data, **update_data}
+            limites = await self.alertas.limites()
             
-            result = await self.collection.update_one(
-                {"_id": ObjectId(abate_id)},
-                {"$set": update_data}
-            )
+            async def atualizar(session):
+                result = await self.collection.update_one(
+                    {"_id": ObjectId(abate_id)},
+                    {"$set": update_data},
+                    session=session
+                )
+                if result.modified_count:
+                    await self._atualizar_consolidados(current_doc, novo, session)
+                    await self.alertas.sincronizar([novo], limites, session)
+                return result
+            
+            result = await self._em_transacao(atualizar)
             
             if result.modified_count:
+                await self._atualizar_estatisticas(current_doc, novo)
+                await versoes_colecoes.incrementar(self.db, self.collection.name)
                 return await self.get(abate_id)
         
         return None
 
+    async def get_many_documentos(
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        unidade: Optional[str] = None,
+        tipo_ave: Optional[str] = None,
+        data_inicio: Optional[datetime] = None,
+        data_fim: Optional[datetime] = None,
+        modo_busca: str = busca.EXATA,
+        cursor: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Como ``get_many``, sem montar os modelos: itens prontos para ``leitura_rapida.serializar``"""
+        query = self._filtro_pagina(unidade, tipo_ave, data_inicio, data_fim, modo_busca, cursor)
+        campos = leitura_rapida.CAMPOS_LISTAGEM
+        documentos = await self._buscar(query, campos, 0 if cursor else skip, limit)
+        return [leitura_rapida.documento(doc, campos) for doc in documentos]
+
+    async def get_by_periodo_documentos(
+        self,
+        data_inicio: datetime,
+        data_fim: datetime,
+        unidade: Optional[str] = None,
+        modo_busca: str = busca.EXATA
+    ) -> List[Dict[str, Any]]:
+        """Como ``get_by_periodo``, sem montar os modelos"""
+        query = self._montar_filtro(unidade=unidade, data_inicio=data_inicio, data_fim=data_fim, modo_busca=modo_busca)
+        campos = leitura_rapida.CAMPOS_PERIODO
+        documentos = await self._buscar(query, campos)
+        return [leitura_rapida.documento(doc, campos) for doc in documentos]
+
+    async def pagina(
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        unidade: Optional[str] = None,
+        tipo_ave: Optional[str] = None,
+        data_inicio: Optional[datetime] = None,
+        data_fim: Optional[datetime] = None,
+        modo_busca: str = busca.EXATA,
+        cursor: Optional[str] = None,
+        campos: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """Itens (como em ``get_many_documentos`` ou ``get_many_campos``) e total do filtro, em duas consultas simultâneas"""
+        filtro = self._montar_filtro(unidade, tipo_ave, data_inicio, data_fim, modo_busca)
+        if cursor:
+            skip = 0
+        selecionados = campos or leitura_rapida.CAMPOS_LISTAGEM
+        montar = visoes_abate.recortar if campos else leitura_rapida.documento
+        documentos, total = await envelope.buscar(
+            self.collection, filtro, paginacao.ORDEM, skip, limit,
+            projecao=visoes_abate.projecao(selecionados),
+            pagina=paginacao.apos(cursor) if cursor else None
+        )
+        itens = [montar(doc, selecionados) for doc in await self._com_metricas_atuais(documentos)]
+        return envelope.montar(itens, total, skip, limit, paginacao.proximo(itens, limit), por_cursor=bool(cursor))
+
+    async def get_many_campos(
+        self,
+        campos: List[str],
+        skip: int = 0,
+        limit: int = 100,
+        unidade: Optional[str] = None,
+        tipo_ave: Optional[str] = None,
+        data_inicio: Optional[datetime] = None,
+        data_fim: Optional[datetime] = None,
+        modo_busca: str = busca.EXATA,
+        cursor: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Como ``get_many``, lendo do banco só os ``campos`` (de ``visoes_abate.resolver``)"""
+        query = self._filtro_pagina(unidade, tipo_ave, data_inicio, data_fim, modo_busca, cursor)
+        documentos = await self._buscar(query, campos, 0 if cursor else skip, limit)
+        return [visoes_abate.recortar(doc, campos) for doc in documentos]
+
+    async def get_by_periodo_campos(
+        self,
+        campos: List[str],
+        data_inicio: datetime,
+        data_fim: datetime,
+        unidade: Optional[str] = None,
+        modo_busca: str = busca.EXATA
+    ) -> List[Dict[str, Any]]:
+        """Como ``get_by_periodo``, lendo do banco só os ``campos``"""
+        query = self._montar_filtro(unidade=unidade, data_inicio=data_inicio, data_fim=data_fim, modo_busca=modo_busca)
+        documentos = await self._buscar(query, campos)
+        return [visoes_abate.recortar(doc, campos) for doc in documentos]
+
+    def _filtro_pagina(self, unidade, tipo_ave, data_inicio, data_fim, modo_busca, cursor) -> Dict[str, Any]:
+        query = self._montar_filtro(unidade, tipo_ave, data_inicio, data_fim, modo_busca)
+        return paginacao.aplicar(query, cursor)
+
+    async def _buscar(
+        self,
+        query: Dict[str, Any],
+        campos: Sequence[str],
+        skip: int = 0,
+        limit: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """Documentos com a projeção dos ``campos``, na ordem da paginação e com métricas atuais"""
+        resultado = self.collection.find(query, visoes_abate.projecao(campos)).sort(paginacao.ORDEM).skip(skip)
+        if limit:
+            resultado = resultado.limit(limit)
+        documentos = await resultado.to_list(length=limit)
+        return await self._com_metricas_atuais(documentos)
+
+    async def iterar_periodo(
+        self,
+        data_inicio: datetime,
+        data_fim: datetime,
+        unidade: Optional[str] = None,
+        modo_busca: str = busca.EXATA,
+        campos: Optional[List[str]] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Itens de ``get_by_periodo_documentos`` (ou ``get_by_periodo_campos``) um a um.
+
+        O cursor é lido em lotes de ``leitura_rapida.LOTE_STREAMING`` documentos
+        e só um lote fica em memória, qualquer que seja o período.
+        """
+        query = self._montar_filtro(unidade=unidade, data_inicio=data_inicio, data_fim=data_fim, modo_busca=modo_busca)
+        selecionados = campos or leitura_rapida.CAMPOS_PERIODO
+        montar = visoes_abate.recortar if campos else leitura_rapida.documento
+        cursor = (
+            self.collection.find(query, visoes_abate.projecao(selecionados))
+            .sort(paginacao.ORDEM)
+            .batch_size(leitura_rapida.LOTE_STREAMING)
+        )
+        lote = []
+        async for documento in cursor:
+            lote.append(documento)
+            if len(lote) < leitura_rapida.LOTE_STREAMING:
+                continue
+            for atual in await self._com_metricas_atuais(lote):
+                yield montar(atual, selecionados)
+            lote = []
+        for atual in await self._com_metricas_atuais(lote):
+            yield montar(atual, selecionados)
+
+    async def _com_metricas_atuais(self, documentos: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Documentos projetados, trocando os de métricas antigas pela versão recalculada"""
+        # O recálculo precisa do documento inteiro
+        desatualizados = [doc["_id"] for doc in documentos if MetricsCalculator.metricas_desatualizadas(doc)]
+        if not desatualizados:
+            return documentos
+        completos = await self.collection.find({"_id": {"$in": desatualizados}}).to_list(length=None)
+        await self._atualizar_metricas_desatualizadas(completos)
+        por_id = {doc["_id"]: doc for doc in completos}
+        return [por_id.get(doc["_id"], doc) for doc in documentos]
+
+    async def recalcular_metricas_no_servidor(self, filtro: Optional[Dict[str, Any]] = None) -> int:
+        """Recalcular as métricas no próprio MongoDB com um único update_many"""
+        pipeline = MetricsCalculator.pipeline_metricas()
+        pipeline.append({"$set": {"updated_at": "$$NOW", "metricas_versao": MetricsCalculator.VERSAO}})
+        result = await self.collection.update_many(filtro or {}, pipeline)
+        if result.modified_count:
+            await versoes_colecoes.incrementar(self.db, self.collection.name)
+        return result.modified_count
+
+    async def _atualizar_metricas_desatualizadas(self, documentos: List[Dict[str, Any]]) -> int:
+        """Recalcular e gravar, no lugar, as métricas de documentos de versão antiga.
+
+        Os documentos da lista são atualizados em memória para que a leitura já
+        retorne os valores novos, e os gravados passam a contar nas estatísticas
+        da unidade. Retorna quantos documentos foram atualizados.
+        """
+        desatualizados = [doc for doc in documentos if MetricsCalculator.metricas_desatualizadas(doc)]
+        if not desatualizados:
+            return 0
+        
+        todas_metricas = MetricsCalculator.calcular_metricas_lote(desatualizados)
+        antigos = [dict(doc) for doc in desatualizados]
+        # Uma escrita por documento para saber quais foram gravados; o filtro pela
+        # versão lida evita sobrescrever uma atualização concorrente
+        resultados = await asyncio.gather(*(
+            self.collection.update_one(
+                {"_id": antigo["_id"], "metricas_versao": antigo.get("metricas_versao")},
+                {"$set": {**metricas, "metricas_versao": MetricsCalculator.VERSAO}}
+            )
+            for antigo, metricas in zip(antigos, todas_metricas)
+        ))
+        for doc, metricas in zip(desatualizados, todas_metricas):
+            doc.update(metricas)
+            doc["metricas_versao"] = MetricsCalculator.VERSAO
+        
+        gravados = 0
+        for antigo, doc, result in zip(antigos, desatualizados, resultados):
+            if result.modified_count:
+                # Os valores da versão antiga nunca entraram nas estatísticas desta versão
+                await self._atualizar_estatisticas(antigo, doc)
+                gravados += 1
+        if gravados:
+            await versoes_colecoes.incrementar(self.db, self.collection.name)
+        return gravados
+
+    async def atualizar_lote_desatualizado(self, limite: int = 200) -> int:
+        """Atualizar até ``limite`` documentos cujas métricas são de versão anterior (ou sem versão)"""
+        # $not/$gte inclui os documentos sem o campo e não seleciona os de versão mais nova
+        cursor = self.collection.find(
+            {"metricas_versao": {"$not": {"$gte": MetricsCalculator.VERSAO}}}
+        ).limit(limite)
+        documentos = await cursor.to_list(length=limite)
+        if not documentos:
+            return 0
+        await self._atualizar_metricas_desatualizadas(documentos)
+        return len(documentos)
+
     async def delete(self, abate_id: str) -> bool:
         """Deletar abate completo"""
         if not ObjectId.is_valid(abate_id):
             return False
             
-        result = await self.collection.delete_one({"_id": ObjectId(abate_id)})
-        return result.deleted_count > 0
+        async def excluir(session):
+            documento = await self.collection.find_one_and_delete({"_id": ObjectId(abate_id)}, session=session)
+            if documento:
+                await self._atualizar_consolidados(documento, None, session)
+                await self.alertas.remover_abate(documento["_id"], session)
+            return documento
+        
+        documento = await self._em_transacao(excluir)
+        if documento is None:
+            return False
+        await self._atualizar_estatisticas(documento, None)
+        await versoes_colecoes.incrementar(self.db, self.collection.name)
+        return True
+
+    async def _em_transacao(self, operacao):
+        """Executar ``operacao(session)`` numa transação, quando o servidor suportar.
+
+        ``with_transaction`` repete a operação (e o commit) quando o servidor
+        acusa um conflito de escrita transitório, comum em abates simultâneos
+        que mexem nos mesmos consolidados. Em servidores standalone (sem replica
+        set) a operação é executada sem sessão; o verificador de consolidados
+        detecta eventuais divergências.
+        """
+        if AbateCompletoCRUD.transacoes_suportadas is not False:
+            async with await self.db.client.start_session() as session:
+                try:
+                    resultado = await session.with_transaction(operacao)
+                    AbateCompletoCRUD.transacoes_suportadas = True
+                    return resultado
+                except OperationFailure as e:
+                    if e.code != _ERRO_TRANSACAO_NAO_SUPORTADA:
+                        raise
+                    print("AVISO: MongoDB sem suporte a transações; consolidados serão atualizados sem transação")
+                    AbateCompletoCRUD.transacoes_suportadas = False
+        return await operacao(None)
+
+    async def _atualizar_consolidados(
+        self,
+        antigo: Optional[Dict[str, Any]],
+        novo: Optional[Dict[str, Any]],
+        session=None
+    ) -> None:
+        """Aplicar nos consolidados (dia, semana, mês e ano) a diferença entre dois estados do abate"""
+        for colecao, itens in consolidados.deltas(antigo, novo).items():
+            if not itens:
+                continue
+            operacoes = []
+            for filtro, incrementos, atributos in itens:
+                atualizacao = {"$inc": incrementos}
+                if atributos:
+                    atualizacao["$set"] = atributos
+                operacoes.append(UpdateOne(filtro, atualizacao, upsert=True))
+            await self.db[colecao].bulk_write(operacoes, ordered=True, session=session)
+            # Remover consolidados que ficaram sem abates (exclusão ou mudança de dia/unidade)
+            filtros = [filtro for filtro, _, _ in itens]
+            await self.db[colecao].delete_many({"$or": filtros, "abates": {"$lte": 0}}, session=session)
+        
+        # Descartar as estatísticas de preço dos meses afetados
+        meses = [consolidados.inicio_mes(abate["data_abate"]) for abate in (antigo, novo) if abate is not None]
+        await self.db[precos_frango.COLECAO_CACHE].delete_many({"mes": {"$in": meses}}, session=session)
+
+    async def _atualizar_estatisticas(
+        self,
+        antigo: Optional[Dict[str, Any]],
+        novo: Optional[Dict[str, Any]]
+    ) -> None:
+        """Retirar o estado antigo do abate e incluir o novo nas estatísticas da unidade.
+
+        Chamado depois do commit da escrita: o documento da unidade é disputado
+        por todos os abates dela e não entra nas transações.
+        """
+        def valores(abate):
+            # As estatísticas são por versão: valores de qualquer outra versão (anterior,
+            # mais nova ou ausente) não entraram nas desta
+            if abate is None or abate.get("metricas_versao") != MetricsCalculator.VERSAO:
+                return {}
+            return anomalias.valores(abate)
+
+        retirados, incluidos = valores(antigo), valores(novo)
+        unidade_antiga = antigo.get("unidade") if antigo else None
+        unidade_nova = novo.get("unidade") if novo else None
+        if unidade_antiga == unidade_nova:
+            # Na mesma unidade só mexem as métricas cujo valor mudou
+            mudaram = {m for m in retirados.keys() | incluidos.keys() if retirados.get(m) != incluidos.get(m)}
+            if not mudaram:
+                return
+            alteracoes = [(
+                unidade_nova,
+                {m: v for m, v in retirados.items() if m in mudaram},
+                {m: v for m, v in incluidos.items() if m in mudaram},
+            )]
+        else:
+            alteracoes = [(unidade_antiga, retirados, {}), (unidade_nova, {}, incluidos)]
+
+        colecao = self.db[anomalias.COLECAO]
+        for unidade, retirar, incluir in alteracoes:
+            estagios = anomalias.atualizacao(retirar, incluir)
+            if estagios:
+                await colecao.update_one(
+                    {"unidade": unidade, "versao": MetricsCalculator.VERSAO},
+                    estagios,
+                    upsert=bool(incluir)
+                )
+
+    async def anomalias(self, abate: AbateCompleto) -> List[Dict[str, Any]]:
+        """Métricas do abate (já gravado) fora do padrão dos outros abates da unidade"""
+        estatisticas = await self.db[anomalias.COLECAO].find_one(
+            {"unidade": abate.unidade, "versao": MetricsCalculator.VERSAO}
+        )
+        if not estatisticas:
+            return []
+        return anomalias.avaliar(abate.model_dump(), anomalias.estados(estatisticas))
 
     async def count(
         self,
         unidade: Optional[str] = None,
         tipo_ave: Optional[str] = None,
         data_inicio: Optional[datetime] = None,
-        data_fim: Optional[datetime] = None
+        data_fim: Optional[datetime] = None,
+        modo_busca: str = busca.EXATA
     ) -> int:
         """Contar abates completos com filtros"""
-        query = {}
-        
-        if unidade:
-            query["unidade"] = {"$regex": unidade, "$options": "i"}
-        if tipo_ave:
-            query["tipo_ave"] = {"$regex": tipo_ave, "$options": "i"}
-        if data_inicio or data_fim:
-            date_query = {}
-            if data_inicio:
-                date_query["$gte"] = data_inicio
-            if data_fim:
-                date_query["$lte"] = data_fim
-            query["data_abate"] = date_query
+        query = self._montar_filtro(unidade, tipo_ave, data_inicio, data_fim, modo_busca)
         
         return await self.collection.count_documents(query)
 
@@ -149,26 +569,811 @@ class AbateCompletoCRUD:
         self,
         data_inicio: datetime,
         data_fim: datetime,
-        unidade: Optional[str] = None
+        unidade: Optional[str] = None,
+        modo_busca: str = busca.EXATA
     ) -> List[AbateCompleto]:
         """Buscar abates por período específico"""
-        query = {
-            "data_abate": {
-                "$gte": data_inicio,
-                "$lte": data_fim
+        query = self._montar_filtro(unidade=unidade, data_inicio=data_inicio, data_fim=data_fim, modo_busca=modo_busca)
+        
+        cursor = self.collection.find(query).sort("data_abate", -1)
+        documentos = await cursor.to_list(length=None)
+        await self._atualizar_metricas_desatualizadas(documentos)
+        
+        return [AbateCompleto(**abate_data) for abate_data in documentos]
+
+    async def resumo(
+        self,
+        unidade: Optional[str] = None,
+        tipo_ave: Optional[str] = None,
+        data_inicio: Optional[datetime] = None,
+        data_fim: Optional[datetime] = None
+    ) -> Dict[str, Any]:
+        """Indicadores do dashboard calculados com uma única agregação.
+
+        Reproduz os cálculos de ``metricas``, ``custosOperacionais`` e
+        ``tendencias`` do Dashboard sem trafegar os documentos completos.
+        """
+        pipeline = self._pipeline_resumo(self._montar_filtro(unidade, tipo_ave, data_inicio, data_fim))
+        resultado = await self.collection.aggregate(pipeline).to_list(length=1)
+        return self._formatar_resumo(resultado[0] if resultado else {})
+
+    @staticmethod
+    def _pipeline_resumo(filtro: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Pipeline de agregação usado por ``resumo``"""
+        peso_produtos = {"$sum": "$produtos.peso_kg"}
+        def soma_se(condicao, valor):
+            return {"$sum": {"$cond": [condicao, valor, 0]}}
+
+        def media_por_abate(numerador):
+            # Mesma regra do Dashboard: abates sem peso vivo contam como zero
+            return {"$cond": [
+                {"$gt": ["$peso_total_kg", 0]},
+                {"$multiply": [{"$divide": [numerador, "$peso_total_kg"]}, 100]},
+                0
+            ]}
+
+        return [
+            {"$match": filtro},
+            _estagio_posicao("_resumo"),
+            {"$set": {
+                **_segmentos_tendencia("_resumo"),
+                "_resumo.peso_abatido": {"$cond": ["$peso_inteiro_abatido", "$peso_inteiro_abatido", peso_produtos]},
+                "_resumo.horas": {"$cond": [
+                    "$horarios.horas_reais",
+                    "$horarios.horas_reais",
+                    {"$cond": ["$horarios.horas_trabalhadas", "$horarios.horas_trabalhadas", 8]}
+                ]}
+            }},
+            {"$group": {
+                "_id": None,
+                "total_abates": {"$sum": 1},
+                "total_aves": {"$sum": "$quantidade_aves"},
+                "frangos_corte": soma_se({"$eq": ["$tipo_ave", "Frango de Corte"]}, "$quantidade_aves"),
+                "galinhas_poedeiras": soma_se({"$eq": ["$tipo_ave", "Galinha Poedeira"]}, "$quantidade_aves"),
+                "peso_total_produtos": {"$sum": peso_produtos},
+                "valor_total_produtos": {"$sum": {"$sum": "$produtos.valor_total"}},
+                "custo_total_aves": {"$sum": "$valor_total"},
+                "custo_operacional_total": {"$sum": {"$add": [
+                    {"$ifNull": [f"$despesas_fixas.{campo}", 0]}
+                    for campo in ("funcionarios", "agua", "energia", "embalagem", "gelo", "manutencao")
+                ]}},
+                "soma_rendimento": {"$sum": media_por_abate("$_resumo.peso_abatido")},
+                "soma_perdas": {"$sum": media_por_abate({"$subtract": ["$peso_total_kg", "$_resumo.peso_abatido"]})},
+                "soma_aves_hora": {"$sum": {"$cond": [
+                    {"$gt": ["$_resumo.horas", 0]},
+                    {"$divide": ["$quantidade_aves", "$_resumo.horas"]},
+                    0
+                ]}},
+                "soma_score": {"$sum": {"$ifNull": ["$score_performance", 0]}},
+                "soma_lucro": {"$sum": {"$ifNull": ["$lucro_liquido", 0]}},
+                "soma_eficiencia": {"$sum": {"$ifNull": ["$eficiencia_operacional", 0]}},
+                "mao_de_obra": {"$sum": {"$add": [
+                    {"$ifNull": [f"$despesas_fixas.{campo}", 0]}
+                    for campo in ("funcionarios", "horas_extras", "diaristas", "ferias", "inss", "recisao")
+                ]}},
+                "agua": {"$sum": {"$ifNull": ["$despesas_fixas.agua", 0]}},
+                "energia": {"$sum": {"$ifNull": ["$despesas_fixas.energia", 0]}},
+                "embalagem": {"$sum": {"$ifNull": ["$despesas_fixas.embalagem", 0]}},
+                "gelo": {"$sum": {"$ifNull": ["$despesas_fixas.gelo", 0]}},
+                "manutencao": {"$sum": {"$ifNull": ["$despesas_fixas.manutencao", 0]}},
+                "qtd_primeira": soma_se("$_resumo.primeira_metade", 1),
+                "rendimento_primeira": soma_se("$_resumo.primeira_metade", {"$ifNull": ["$rendimento_final", 0]}),
+                "rendimento_segunda": soma_se({"$not": ["$_resumo.primeira_metade"]}, {"$ifNull": ["$rendimento_final", 0]}),
+                "eficiencia_primeira": soma_se("$_resumo.primeira_metade", {"$ifNull": ["$eficiencia_operacional", 0]}),
+                "eficiencia_segunda": soma_se({"$not": ["$_resumo.primeira_metade"]}, {"$ifNull": ["$eficiencia_operacional", 0]}),
+                # Tendência de lucro: últimos 30% contra os 30% anteriores
+                "qtd_lucro_anterior": soma_se("$_resumo.anterior", 1),
+                "qtd_lucro_recente": soma_se("$_resumo.recente", 1),
+                "lucro_anterior": soma_se("$_resumo.anterior", {"$ifNull": ["$lucro_liquido", 0]}),
+                "lucro_recente": soma_se("$_resumo.recente", {"$ifNull": ["$lucro_liquido", 0]})
+            }}
+        ]
+
+    @staticmethod
+    def _formatar_resumo(dados: Dict[str, Any]) -> Dict[str, Any]:
+        """Converter as somas da agregação nos indicadores do dashboard"""
+        def media(soma, quantidade):
+            return soma / quantidade if quantidade > 0 else 0
+
+        def variacao(anterior, atual):
+            return ((atual - anterior) / anterior) * 100 if anterior > 0 else 0
+
+        total_abates = dados.get("total_abates", 0)
+        total_aves = dados.get("total_aves", 0)
+        peso_total_produtos = dados.get("peso_total_produtos", 0)
+        valor_total_produtos = dados.get("valor_total_produtos", 0)
+        custo_total_aves = dados.get("custo_total_aves", 0)
+        custo_operacional_total = dados.get("custo_operacional_total", 0)
+
+        lucro_total = valor_total_produtos - custo_total_aves - custo_operacional_total
+        rendimento_abate = media(dados.get("soma_rendimento", 0), total_abates)
+        score_performance = media(dados.get("soma_score", 0), total_abates) / 10
+
+        rendimento_tendencia = lucro_tendencia = eficiencia_tendencia = 0
+        if total_abates >= 2:
+            qtd_primeira = dados["qtd_primeira"]
+            qtd_segunda = total_abates - qtd_primeira
+            rendimento_tendencia = variacao(
+                media(dados["rendimento_primeira"], qtd_primeira),
+                media(dados["rendimento_segunda"], qtd_segunda)
+            )
+            lucro_tendencia = variacao(
+                media(dados["lucro_anterior"], dados["qtd_lucro_anterior"]),
+                media(dados["lucro_recente"], dados["qtd_lucro_recente"])
+            )
+            eficiencia_tendencia = variacao(
+                media(dados["eficiencia_primeira"], qtd_primeira),
+                media(dados["eficiencia_segunda"], qtd_segunda)
+            )
+
+        if total_abates == 0:
+            classificacao_qualidade = "Sem dados"
+        elif score_performance >= 8:
+            classificacao_qualidade = "Excelente"
+        elif score_performance >= 6:
+            classificacao_qualidade = "Boa"
+        elif score_performance >= 4:
+            classificacao_qualidade = "Regular"
+        else:
+            classificacao_qualidade = "Ruim"
+
+        return {
+            "total_abates": total_abates,
+            "metricas": {
+                "total_aves": total_aves,
+                "frangos_corte": dados.get("frangos_corte", 0),
+                "galinhas_poedeiras": dados.get("galinhas_poedeiras", 0),
+                "peso_total_produtos": round(peso_total_produtos, 2),
+                "valor_total_produtos": round(valor_total_produtos, 2),
+                "custo_total_aves": round(custo_total_aves, 2),
+                "custo_abate_por_kg": round(media(custo_operacional_total, peso_total_produtos), 2),
+                "lucro_por_ave": round(media(lucro_total, total_aves), 2),
+                "lucro_total": round(lucro_total, 2),
+                "rendimento_abate": round(rendimento_abate, 2),
+                "preco_medio_kg": round(media(valor_total_produtos, peso_total_produtos), 2),
+                "aves_hora": round(media(dados.get("soma_aves_hora", 0), total_abates), 2),
+                "eficiencia_operacional": round(min(100, (rendimento_abate / 75) * 100) if rendimento_abate > 0 else 0, 2),
+                "percentual_perdas": round(media(dados.get("soma_perdas", 0), total_abates), 2),
+                "score_performance": round(score_performance, 2)
+            },
+            "custos_operacionais": {
+                campo: round(dados.get(campo, 0), 2)
+                for campo in ("mao_de_obra", "agua", "energia", "embalagem", "gelo", "manutencao")
+            },
+            "tendencias": {
+                "rendimento_medio": round(rendimento_abate, 2),
+                "rendimento_tendencia": round(rendimento_tendencia, 2),
+                "lucro_medio": round(media(dados.get("soma_lucro", 0), total_abates), 2),
+                "lucro_tendencia": round(lucro_tendencia, 2),
+                "eficiencia_media": round(media(dados.get("soma_eficiencia", 0), total_abates), 2),
+                "eficiencia_tendencia": round(eficiencia_tendencia, 2),
+                "qualidade_geral": round(score_performance, 2),
+                "classificacao_qualidade": classificacao_qualidade
+            }
+        }
+
+    async def tendencias(
+        self,
+        unidade: Optional[str] = None,
+        tipo_ave: Optional[str] = None,
+        data_inicio: Optional[datetime] = None,
+        data_fim: Optional[datetime] = None,
+        granularidade: str = "dia",
+        janela: int = 7,
+        fracao_recente: float = 0.3
+    ) -> Dict[str, Any]:
+        """Tendências de rendimento, lucro e eficiência calculadas no MongoDB.
+
+        Retorna as comparações entre metades do período e entre a fração mais
+        recente e a anterior, e uma série por ``granularidade`` com médias
+        móveis de ``janela`` períodos e a variação em relação ao período anterior.
+        """
+        filtro = self._montar_filtro(unidade, tipo_ave, data_inicio, data_fim)
+        pipeline = self._pipeline_tendencias(filtro, granularidade, janela, fracao_recente)
+        resultado = await self.collection.aggregate(pipeline).to_list(length=1)
+        resultado = resultado[0] if resultado else {"comparacoes": [], "serie": []}
+        comparacoes = resultado["comparacoes"][0] if resultado["comparacoes"] else {}
+
+        def media(soma, quantidade):
+            return soma / quantidade if quantidade > 0 else 0
+
+        def comparacao(anterior, atual):
+            return {
+                "anterior": round(anterior, 2),
+                "atual": round(atual, 2),
+                "variacao": round(((atual - anterior) / anterior) * 100 if anterior > 0 else 0, 2)
             }
+
+        total_abates = comparacoes.get("total_abates", 0)
+        metricas = {}
+        for metrica in METRICAS_TENDENCIA:
+            if total_abates >= 2:
+                qtd_primeira = comparacoes["qtd_primeira"]
+                metades = comparacao(
+                    media(comparacoes[f"{metrica}_primeira"], qtd_primeira),
+                    media(comparacoes[f"{metrica}_segunda"], total_abates - qtd_primeira)
+                )
+                recentes = comparacao(
+                    media(comparacoes[f"{metrica}_anterior"], comparacoes["qtd_anterior"]),
+                    media(comparacoes[f"{metrica}_recente"], comparacoes["qtd_recente"])
+                )
+            else:
+                metades = recentes = comparacao(0, 0)
+            metricas[metrica] = {
+                "media": round(media(comparacoes.get(f"{metrica}_total", 0), total_abates), 2),
+                "metades": metades,
+                "recentes": recentes
+            }
+
+        return {
+            "total_abates": total_abates,
+            "granularidade": granularidade,
+            "janela": janela,
+            "fracao_recente": fracao_recente,
+            "metricas": metricas,
+            "serie": resultado["serie"]
         }
+
+    @staticmethod
+    def _pipeline_tendencias(
+        filtro: Dict[str, Any],
+        granularidade: str,
+        janela: int,
+        fracao_recente: float
+    ) -> List[Dict[str, Any]]:
+        """Pipeline de agregação usado por ``tendencias``"""
+        def soma_se(condicao, valor):
+            return {"$sum": {"$cond": [condicao, valor, 0]}}
+
+        valores = {metrica: {"$ifNull": [f"${metrica}", 0]} for metrica in METRICAS_TENDENCIA}
+        primeira_metade = "$_tendencia.primeira_metade"
+
+        comparacoes = {"_id": None, "total_abates": {"$sum": 1}}
+        comparacoes["qtd_primeira"] = soma_se(primeira_metade, 1)
+        comparacoes["qtd_anterior"] = soma_se("$_tendencia.anterior", 1)
+        comparacoes["qtd_recente"] = soma_se("$_tendencia.recente", 1)
+        for metrica, valor in valores.items():
+            comparacoes[f"{metrica}_total"] = {"$sum": valor}
+            comparacoes[f"{metrica}_primeira"] = soma_se(primeira_metade, valor)
+            comparacoes[f"{metrica}_segunda"] = soma_se({"$not": [primeira_metade]}, valor)
+            comparacoes[f"{metrica}_anterior"] = soma_se("$_tendencia.anterior", valor)
+            comparacoes[f"{metrica}_recente"] = soma_se("$_tendencia.recente", valor)
+
+        truncamento = {"date": "$data_abate", "unit": UNIDADES_TEMPO[granularidade]}
+        if granularidade == "semana":
+            truncamento["startOfWeek"] = "monday"
+
+        janela_movel = {"documents": [-(janela - 1), 0]}
+        saida_janela = {}
+        projecao = {"_id": 0, "periodo": "$_id", "abates": 1}
+        for metrica in METRICAS_TENDENCIA:
+            anterior = f"$_anterior_{metrica}"
+            saida_janela[f"media_movel_{metrica}"] = {"$avg": f"${metrica}", "window": janela_movel}
+            saida_janela[f"_anterior_{metrica}"] = {"$shift": {"output": f"${metrica}", "by": -1}}
+            projecao[metrica] = {"$round": [f"${metrica}", 2]}
+            projecao[f"media_movel_{metrica}"] = {"$round": [f"$media_movel_{metrica}", 2]}
+            # Variação percentual em relação ao período anterior (nula no primeiro período)
+            projecao[f"variacao_{metrica}"] = {"$cond": [
+                {"$gt": [anterior, 0]},
+                {"$round": [{"$multiply": [{"$divide": [{"$subtract": [f"${metrica}", anterior]}, anterior]}, 100]}, 2]},
+                None
+            ]}
+
+        return [
+            {"$match": filtro},
+            _estagio_posicao("_tendencia"),
+            {"$set": _segmentos_tendencia("_tendencia", fracao_recente)},
+            {"$facet": {
+                "comparacoes": [{"$group": comparacoes}],
+                "serie": [
+                    {"$group": {
+                        "_id": {"$dateTrunc": truncamento},
+                        "abates": {"$sum": 1},
+                        **{metrica: {"$avg": valor} for metrica, valor in valores.items()}
+                    }},
+                    {"$setWindowFields": {"sortBy": {"_id": 1}, "output": saida_janela}},
+                    {"$sort": {"_id": 1}},
+                    {"$project": projecao}
+                ]
+            }}
+        ]
+
+    @staticmethod
+    def _pipeline_mix_produtos(
+        filtro: Dict[str, Any],
+        agrupamento: str,
+        ordenar_por: str,
+        ordem: int,
+        skip: int,
+        limit: int
+    ) -> List[Dict[str, Any]]:
+        """Pipeline de agregação usado por ``mix_produtos``"""
+        if ordenar_por == agrupamento:
+            # Ordenar pelo agrupamento é ordenar pelo _id do grupo, que já é único
+            ordenacao = {"_id": ordem}
+        else:
+            ordenacao = {ordenar_por: ordem, "_id": 1}
+        return [
+            {"$match": filtro},
+            {"$project": {"_id": 0, "produtos": 1}},
+            {"$unwind": "$produtos"},
+            {"$group": {
+                "_id": f"$produtos.{agrupamento}",
+                "peso_kg": {"$sum": "$produtos.peso_kg"},
+                "valor_total": {"$sum": "$produtos.valor_total"},
+                "quantidade": {"$sum": 1}
+            }},
+            {"$facet": {
+                "totais": [{"$group": {
+                    "_id": None,
+                    "itens": {"$sum": 1},
+                    "peso_kg": {"$sum": "$peso_kg"},
+                    "valor_total": {"$sum": "$valor_total"},
+                    "quantidade": {"$sum": "$quantidade"}
+                }}],
+                "itens": [
+                    {"$sort": ordenacao},
+                    {"$skip": skip},
+                    {"$limit": limit}
+                ]
+            }}
+        ]
+
+    async def mix_produtos(
+        self,
+        agrupamento: str = "nome",
+        unidade: Optional[str] = None,
+        tipo_ave: Optional[str] = None,
+        data_inicio: Optional[datetime] = None,
+        data_fim: Optional[datetime] = None,
+        ordenar_por: str = "valor_total",
+        ordem: int = -1,
+        skip: int = 0,
+        limit: int = 10
+    ) -> Dict[str, Any]:
+        """Peso, valor, ocorrências e participação dos produtos agrupados por ``nome`` ou ``tipo``.
+
+        O agrupamento, a ordenação e a paginação (top-K com ``skip=0``) são
+        feitos no MongoDB; os totais consideram todos os itens do filtro.
+        """
+        filtro = self._montar_filtro(unidade, tipo_ave, data_inicio, data_fim)
+        pipeline = self._pipeline_mix_produtos(filtro, agrupamento, ordenar_por, ordem, skip, limit)
+        resultado = await self.collection.aggregate(pipeline).to_list(length=1)
+        resultado = resultado[0] if resultado else {"totais": [], "itens": []}
+        totais = resultado["totais"][0] if resultado["totais"] else {}
+        peso_total = totais.get("peso_kg", 0)
+        valor_total = totais.get("valor_total", 0)
+
+        itens = []
+        for item in resultado["itens"]:
+            itens.append({
+                agrupamento: item["_id"],
+                "peso_kg": round(item["peso_kg"], 2),
+                "valor_total": round(item["valor_total"], 2),
+                "quantidade": item["quantidade"],
+                "preco_medio_kg": round(item["valor_total"] / item["peso_kg"], 2) if item["peso_kg"] > 0 else 0,
+                "percentual_peso": round(item["peso_kg"] / peso_total * 100, 2) if peso_total > 0 else 0,
+                "percentual_valor": round(item["valor_total"] / valor_total * 100, 2) if valor_total > 0 else 0
+            })
+
+        return {
+            "agrupamento": agrupamento,
+            "total_itens": totais.get("itens", 0),
+            "skip": skip,
+            "limit": limit,
+            "totais": {
+                "peso_kg": round(peso_total, 2),
+                "valor_total": round(valor_total, 2),
+                "quantidade": totais.get("quantidade", 0)
+            },
+            "itens": itens
+        }
+
+    async def relatorio(
+        self,
+        unidade: Optional[str] = None,
+        tipo_ave: Optional[str] = None,
+        data_inicio: Optional[datetime] = None,
+        data_fim: Optional[datetime] = None,
+        usar_consolidados: bool = True
+    ) -> Optional[Dict[str, Any]]:
+        """Relatório consolidado do período (None quando não há abates).
+
+        Usa os consolidados diários/mensais quando estão na versão atual das
+        métricas e o período cobre dias inteiros; caso contrário agrega os abates.
+        """
+        somas = None
+        fonte = "consolidados"
+        if usar_consolidados:
+            somas = await self._somas_consolidadas(unidade, tipo_ave, data_inicio, data_fim)
+        if somas is None:
+            somas = await self._somas_abates(self._montar_filtro(unidade, tipo_ave, data_inicio, data_fim))
+            fonte = "abates"
+        
+        resultado = relatorio_consolidado.formatar(somas)
+        if resultado is not None:
+            resultado["fonte"] = fonte
+        return resultado
+
+    async def _somas_consolidadas(
+        self,
+        unidade: Optional[str],
+        tipo_ave: Optional[str],
+        data_inicio: Optional[datetime],
+        data_fim: Optional[datetime]
+    ) -> Optional[Dict[str, Any]]:
+        """Somar os consolidados que cobrem o período, ou None se não puderem ser usados"""
+        meta = await self.db[consolidados.COLECAO_META].find_one({"_id": consolidados.ID_META})
+        if not meta or meta.get("versao") != MetricsCalculator.VERSAO:
+            return None
+        divisao = relatorio_consolidado.dividir_periodo(data_inicio, data_fim)
+        if divisao is None:
+            return None
         
-        if unidade:
-            query["unidade"] = {"$regex": unidade, "$options": "i"}
+        def intervalo(inicio, fim):
+            limites = {}
+            if inicio is not None:
+                limites["$gte"] = inicio
+            if fim is not None:
+                limites["$lt"] = fim
+            return {"periodo": limites} if limites else {}
         
-        cursor = self.collection.find(query).sort("data_abate", -1)
-        abates = []
+        filtro = self._montar_filtro(unidade, tipo_ave)
+        intervalos_diarios, intervalo_mensal = divisao
+        documentos = []
+        if intervalos_diarios:
+            consulta = {**filtro, "$or": [intervalo(inicio, fim) for inicio, fim in intervalos_diarios]}
+            documentos += await self.db[consolidados.COLECAO_DIARIA].find(consulta, {"_id": 0}).to_list(length=None)
+        if intervalo_mensal is not None:
+            consulta = {**filtro, **intervalo(*intervalo_mensal)}
+            documentos += await self.db[consolidados.COLECAO_MENSAL].find(consulta, {"_id": 0}).to_list(length=None)
+        return consolidados.somar(documentos)
+
+    async def cubo(
+        self,
+        granularidade: str = "mes",
+        dimensoes: Optional[List[str]] = None,
+        medidas: Optional[List[str]] = None,
+        unidades: Optional[List[str]] = None,
+        tipos_ave: Optional[List[str]] = None,
+        data_inicio: Optional[datetime] = None,
+        data_fim: Optional[datetime] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Consultar uma fatia do cubo unidade × tipo_ave × período a partir dos consolidados.
+
+        Retorna None enquanto os consolidados não foram reconstruídos, pois
+        abates anteriores a eles ainda não estariam nas células.
+        """
+        dimensoes = list(dimensoes if dimensoes is not None else ["periodo"])
+        medidas = list(medidas or cubo.MEDIDAS_PADRAO)
+        cubo.validar(dimensoes, medidas)
+        
+        meta = await self.db[consolidados.COLECAO_META].find_one({"_id": consolidados.ID_META})
+        if not meta:
+            return None
+        
+        colecao, _ = cubo.NIVEIS[granularidade]
+        consulta = cubo.filtro(granularidade, unidades, tipos_ave, data_inicio, data_fim)
+        grupos = await self.db[colecao].aggregate(cubo.pipeline(dimensoes, medidas, consulta)).to_list(length=None)
+        
+        return {
+            "granularidade": granularidade,
+            "dimensoes": dimensoes,
+            "medidas": medidas,
+            "total_celulas": len(grupos),
+            "celulas": [cubo.celula(grupo, dimensoes, medidas) for grupo in grupos],
+            "total": cubo.total(grupos, medidas)
+        }
+
+    async def membros_cubo(self) -> Dict[str, List[str]]:
+        """Valores existentes das dimensões unidade e tipo_ave (para montar fatias)"""
+        colecao = self.db[consolidados.COLECAO_ANUAL]
+        return {
+            "unidade": sorted([valor for valor in await colecao.distinct("unidade") if valor]),
+            "tipo_ave": sorted([valor for valor in await colecao.distinct("tipo_ave") if valor])
+        }
+
+    async def comparar_periodos(
+        self,
+        periodos: List[Tuple[datetime, datetime]],
+        unidade: Optional[str] = None,
+        tipo_ave: Optional[str] = None,
+        medidas: Optional[List[str]] = None,
+        usar_consolidados: bool = True
+    ) -> Dict[str, Any]:
+        """Indicadores de cada período e diferenças em relação ao primeiro, numa agregação $facet.
+
+        Os períodos devem cobrir dias inteiros. Usa os consolidados diários
+        quando já foram reconstruídos; caso contrário agrega os abates.
+        """
+        medidas = list(medidas or cubo.MEDIDAS_PADRAO)
+        cubo.validar((), medidas)
+        
+        fonte = "abates"
+        if usar_consolidados and await self.db[consolidados.COLECAO_META].find_one({"_id": consolidados.ID_META}):
+            fonte = "consolidados"
+        
+        filtros = []
+        facetas = {}
+        for posicao, (inicio, fim) in enumerate(periodos):
+            if fonte == "consolidados":
+                filtro = {**self._montar_filtro(unidade, tipo_ave), "periodo": {"$gte": inicio, "$lte": fim}}
+            else:
+                filtro = self._montar_filtro(unidade, tipo_ave, inicio, fim)
+            filtros.append(filtro)
+            facetas[f"p{posicao}"] = [
+                {"$match": filtro},
+                {"$group": {"_id": None, **cubo.acumuladores(medidas, sobre_abates=fonte == "abates")}}
+            ]
+        
+        # O $match inicial (indexado) limita o $facet aos documentos de algum dos períodos
+        colecao = self.db[consolidados.COLECAO_DIARIA] if fonte == "consolidados" else self.collection
+        pipeline = [{"$match": {"$or": filtros}}, {"$facet": facetas}]
+        resultado = await colecao.aggregate(pipeline).to_list(length=1)
+        grupos = resultado[0] if resultado else {}
+        
+        indicadores = [
+            cubo.celula((grupos.get(f"p{posicao}") or [{}])[0], (), medidas)
+            for posicao in range(len(periodos))
+        ]
+        base = indicadores[0]
+        
+        def diferenca(medida, valores):
+            absoluta = valores[medida] - base[medida]
+            percentual = absoluta / abs(base[medida]) * 100 if base[medida] else None
+            return {
+                "absoluta": round(absoluta, 4),
+                "percentual": round(percentual, 2) if percentual is not None else None
+            }
+        
+        return {
+            "fonte": fonte,
+            "medidas": medidas,
+            "periodos": [
+                {
+                    "data_inicio": inicio.strftime("%Y-%m-%d"),
+                    "data_fim": fim.strftime("%Y-%m-%d"),
+                    "indicadores": valores,
+                    "diferencas": None if posicao == 0 else {
+                        medida: diferenca(medida, valores) for medida in medidas
+                    }
+                }
+                for posicao, ((inicio, fim), valores) in enumerate(zip(periodos, indicadores))
+            ]
+        }
+
+    async def percentis(
+        self,
+        fracoes: List[float],
+        metricas: Optional[List[str]] = None,
+        unidade: Optional[str] = None,
+        tipo_ave: Optional[str] = None,
+        data_inicio: Optional[datetime] = None,
+        data_fim: Optional[datetime] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Percentis das métricas a partir dos esboços mensais (meses que tocam o período).
+
+        Retorna None enquanto os consolidados não foram reconstruídos.
+        """
+        metricas = list(metricas or quantis.METRICAS)
+        desconhecidas = [metrica for metrica in metricas if metrica not in quantis.METRICAS]
+        if desconhecidas:
+            raise ValueError(f"Métricas sem esboço de quantis: {', '.join(desconhecidas)}")
+        
+        baldes = await self._baldes_quantis(metricas, self._montar_filtro(unidade, tipo_ave), data_inicio, data_fim)
+        if baldes is None:
+            return None
+        return {
+            "erro_relativo": quantis.ALFA,
+            "metricas": {
+                metrica: {
+                    "abates": quantis.total(baldes[metrica]),
+                    "percentis": {
+                        f"p{round(fracao * 100, 2):g}": round(valor, 4) if valor is not None else None
+                        for fracao, valor in zip(fracoes, quantis.quantis(baldes[metrica], fracoes))
+                    }
+                }
+                for metrica in metricas
+            }
+        }
+
+    async def percentis_abate(self, abate_id: str, meses: int = 1) -> Optional[Dict[str, Any]]:
+        """Posição (percentil) das métricas do abate entre os abates da mesma unidade.
+
+        A referência são o mês do abate e os ``meses - 1`` anteriores. Retorna
+        None quando o abate não existe; ``metricas`` fica None enquanto os
+        consolidados não foram reconstruídos.
+        """
+        if not ObjectId.is_valid(abate_id):
+            return None
+        projecao = {"data_abate": 1, "unidade": 1, "metricas_versao": 1, **{metrica: 1 for metrica in quantis.METRICAS}}
+        abate = await self.collection.find_one({"_id": ObjectId(abate_id)}, projecao)
+        if not abate:
+            return None
+        # Os esboços são da versão atual: valores antigos são recalculados antes da comparação
+        abate, = await self._com_metricas_atuais([abate])
+        
+        fim = consolidados.inicio_mes(abate["data_abate"])
+        inicio = fim
+        for _ in range(meses - 1):
+            inicio = consolidados.inicio_mes(inicio - timedelta(days=1))
+        baldes = await self._baldes_quantis(quantis.METRICAS, {"unidade": abate.get("unidade")}, inicio, fim)
+        
+        return {
+            "abate_id": abate_id,
+            "unidade": abate.get("unidade"),
+            "referencia": {"mes_inicio": inicio.strftime("%Y-%m"), "mes_fim": fim.strftime("%Y-%m")},
+            "metricas": None if baldes is None else {
+                metrica: {
+                    "valor": abate.get(metrica),
+                    "percentil": quantis.percentil(baldes[metrica], abate.get(metrica)),
+                    "abates": quantis.total(baldes[metrica])
+                }
+                for metrica in quantis.METRICAS
+            }
+        }
+
+    async def _baldes_quantis(
+        self,
+        metricas: List[str],
+        filtro: Dict[str, Any],
+        data_inicio: Optional[datetime],
+        data_fim: Optional[datetime]
+    ) -> Optional[Dict[str, Dict[Any, int]]]:
+        """Juntar os esboços mensais que atendem ao filtro, por métrica (None se não puderem ser usados)"""
+        meta = await self.db[consolidados.COLECAO_META].find_one({"_id": consolidados.ID_META})
+        if not meta or meta.get("versao") != MetricsCalculator.VERSAO:
+            return None
+        consulta = dict(filtro)
+        if data_inicio or data_fim:
+            limites = {}
+            if data_inicio:
+                limites["$gte"] = consolidados.inicio_mes(data_inicio)
+            if data_fim:
+                limites["$lte"] = data_fim
+            consulta["periodo"] = limites
+        esbocos = await self.db[consolidados.COLECAO_QUANTIS].find(
+            consulta, {metrica: 1 for metrica in metricas}
+        ).to_list(length=None)
+        return {
+            metrica: quantis.juntar([esboco.get(metrica) for esboco in esbocos])
+            for metrica in metricas
+        }
+
+    async def precos(
+        self,
+        unidade: Optional[str] = None,
+        tipo_ave: Optional[str] = None,
+        data_inicio: Optional[datetime] = None,
+        data_fim: Optional[datetime] = None
+    ) -> Dict[str, Any]:
+        """Estatísticas mensais de preço por kg (vivo, venda e spread).
+
+        Meses fechados inteiramente dentro do período vêm do cache quando
+        calculados na versão atual das métricas e no formato atual do cache
+        (``precos_frango.FORMATO_CACHE``); os demais são agregados e,
+        se fechados, gravados no cache.
+        """
+        filtro = self._montar_filtro(unidade, tipo_ave, data_inicio, data_fim)
+        chave = {"unidade": unidade, "tipo_ave": tipo_ave}
+        
+        # Intervalo [inicio, fim) dos meses que podem ser guardados
+        agora = datetime.now()
+        mes_atual = datetime(agora.year, agora.month, 1)
+        cacheavel = None
+        divisao = relatorio_consolidado.dividir_periodo(data_inicio, data_fim)
+        if divisao is not None and divisao[1] is not None:
+            inicio, fim = divisao[1]
+            fim = min(fim, mes_atual) if fim is not None else mes_atual
+            if inicio is None or inicio < fim:
+                cacheavel = (inicio, fim)
+        
+        guardados = []
+        if cacheavel is not None:
+            limites = {"$lt": cacheavel[1]}
+            if cacheavel[0] is not None:
+                limites["$gte"] = cacheavel[0]
+            guardados = await self.db[precos_frango.COLECAO_CACHE].find(
+                {**chave, "versao": MetricsCalculator.VERSAO, "formato": precos_frango.FORMATO_CACHE, "mes": limites},
+                {"_id": 0, "unidade": 0, "tipo_ave": 0, "versao": 0, "formato": 0, "calculado_em": 0}
+            ).to_list(length=None)
+            if guardados:
+                filtro["$nor"] = [
+                    {"data_abate": {"$gte": mes["mes"], "$lt": precos_frango.proximo_mes(mes["mes"])}}
+                    for mes in guardados
+                ]
+        
+        agregados = await self.collection.aggregate(precos_frango.pipeline(filtro)).to_list(length=None)
+        calculados = [precos_frango.formatar_mes(grupo) for grupo in agregados]
+        
+        operacoes = [
+            UpdateOne(
+                {**chave, "mes": mes["mes"]},
+                {"$set": {
+                    **mes,
+                    "versao": MetricsCalculator.VERSAO,
+                    "formato": precos_frango.FORMATO_CACHE,
+                    "calculado_em": agora
+                }},
+                upsert=True
+            )
+            for mes in calculados
+            if cacheavel is not None
+            and (cacheavel[0] is None or mes["mes"] >= cacheavel[0]) and mes["mes"] < cacheavel[1]
+        ]
+        if operacoes:
+            await self.db[precos_frango.COLECAO_CACHE].bulk_write(operacoes, ordered=False)
+        
+        meses = sorted(guardados + calculados, key=lambda mes: mes["mes"])
+        geral = precos_frango.combinar(meses)
+        return {
+            "meses": [
+                {
+                    "mes": mes["mes"].strftime("%Y-%m"),
+                    "abates": mes["abates"],
+                    **{serie: precos_frango.arredondar(mes[serie]) for serie in precos_frango.SERIES}
+                }
+                for mes in meses
+            ],
+            "geral": {
+                "abates": geral["abates"],
+                **{serie: precos_frango.arredondar(geral[serie]) for serie in precos_frango.SERIES}
+            },
+            "meses_em_cache": len(guardados)
+        }
+
+    async def _somas_abates(self, filtro: Dict[str, Any]) -> Dict[str, Any]:
+        """Somas do relatório numa única agregação sobre os abates (valores gravados)"""
+        def soma(campo):
+            return {"$sum": {"$ifNull": [campo, 0]}}
+        
+        totais = {
+            "_id": None,
+            "abates": {"$sum": 1},
+            "quantidade_aves": soma("$quantidade_aves"),
+            "peso_vivo_kg": soma("$peso_total_kg"),
+            "peso_inteiro_abatido": soma("$peso_inteiro_abatido"),
+            "valor_aves": soma("$valor_total"),
+            "horas_reais": soma("$horarios.horas_reais")
+        }
+        for campo in DespesasFixas.model_fields:
+            totais[f"despesas_{campo}"] = soma(f"$despesas_fixas.{campo}")
+        for metrica in consolidados.METRICAS_SOMADAS:
+            totais[f"metricas_{metrica}"] = soma(f"${metrica}")
+        for metrica, peso in consolidados.METRICAS_PONDERADAS.items():
+            totais[f"ponderadas_{metrica}"] = {"$sum": {"$multiply": [
+                {"$ifNull": [f"${metrica}", 0]}, {"$ifNull": [f"${peso}", 0]}
+            ]}}
         
-        async for abate_data in cursor:
-            abates.append(AbateCompleto(**abate_data))
+        pipeline = [
+            {"$match": filtro},
+            {"$facet": {
+                "totais": [{"$group": totais}],
+                "produtos": [
+                    {"$unwind": "$produtos"},
+                    {"$group": {
+                        "_id": "$produtos.nome",
+                        "tipo": {"$first": "$produtos.tipo"},
+                        "quantidade": {"$sum": 1},
+                        "peso_kg": soma("$produtos.peso_kg"),
+                        "valor_total": soma("$produtos.valor_total")
+                    }}
+                ]
+            }}
+        ]
+        resultado = await self.collection.aggregate(pipeline).to_list(length=1)
+        if not resultado or not resultado[0]["totais"]:
+            return {}
         
-        return abates
+        somas = {"despesas": {}, "metricas": {}, "ponderadas": {}}
+        for campo, valor in resultado[0]["totais"][0].items():
+            grupo, _, nome = campo.partition("_")
+            if grupo in somas and nome:
+                somas[grupo][nome] = valor
+            elif campo != "_id":
+                somas[campo] = valor
+        somas["produtos"] = {produto.pop("_id"): produto for produto in resultado[0]["produtos"]}
+        return somas
 
 
 def get_abate_completo_crud(db: AsyncIOMotorDatabase) -> AbateCompletoCRUD:
@@ -0,0 +1,174 @@
+from typing import List, Optional, Dict, Any
+from datetime import datetime
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import UpdateOne
+
+from ..core.db import get_collection
+from ..models.configuracao_limites import ConfiguracaoLimitesBase
+from ..services import alertas
+from .configuracao_limites import get_configuracao_limites_crud
+
+# Campos do abate copiados para o alerta (filtros da listagem)
+_CAMPOS_ABATE = ("unidade", "tipo_ave", "data_abate")
+
+
+class AlertaCRUD:
+    def __init__(self, db: AsyncIOMotorDatabase):
+        self.db = db
+        self.collection = get_collection(db, alertas.COLECAO)
+
+    async def limites(self) -> Dict[str, Any]:
+        """Configuração de limites atual (valores padrão quando não há configuração)"""
+        config = await get_configuracao_limites_crud(self.db).get_default()
+        return (config or ConfiguracaoLimitesBase()).model_dump()
+
+    async def sincronizar(
+        self,
+        abates: List[Dict[str, Any]],
+        limites: Dict[str, Any],
+        session=None
+    ) -> Dict[str, int]:
+        """Abrir, atualizar ou resolver os alertas dos abates conforme os limites.
+
+        Só grava alertas que mudaram. Retorna quantos foram abertos, quantos
+        continuaram abertos com valores novos e quantos foram resolvidos.
+        """
+        contagem = {"abertos": 0, "atualizados": 0, "resolvidos": 0}
+        if not abates:
+            return contagem
+
+        avaliacao = alertas.avaliar(abates, limites)
+        existentes = await self.collection.find(
+            {"abate_id": {"$in": [abate["_id"] for abate in abates]}},
+            session=session
+        ).to_list(length=None)
+        indice = {(alerta["abate_id"], alerta["regra"]): alerta for alerta in existentes}
+
+        agora = datetime.utcnow()
+        operacoes = []
+        for posicao, abate in enumerate(abates):
+            for regra, definicao in alertas.REGRAS.items():
+                atual = indice.get((abate["_id"], regra))
+                avaliada = avaliacao.get(regra)
+                if avaliada is not None and avaliada["disparado"][posicao]:
+                    campos = {
+                        **{campo: abate.get(campo) for campo in _CAMPOS_ABATE},
+                        "titulo": definicao.titulo,
+                        "severidade": definicao.severidade,
+                        "valor": float(avaliada["valor"][posicao]),
+                        "limite": avaliada["limite"],
+                    }
+                    aberto = atual is not None and atual.get("status") == alertas.ABERTO
+                    if aberto and all(atual.get(campo) == valor for campo, valor in campos.items()):
+                        continue
+                    campos["atualizado_em"] = agora
+                    if aberto:
+                        contagem["atualizados"] += 1
+                    else:
+                        campos.update({"status": alertas.ABERTO, "aberto_em": agora, "resolvido_em": None})
+                        contagem["abertos"] += 1
+                    operacoes.append(UpdateOne(
+                        {"abate_id": abate["_id"], "regra": regra},
+                        {"$set": campos, "$setOnInsert": {"criado_em": agora}},
+                        upsert=True
+                    ))
+                elif atual is not None and atual.get("status") == alertas.ABERTO:
+                    operacoes.append(UpdateOne(
+                        {"_id": atual["_id"]},
+                        {"$set": {"status": alertas.RESOLVIDO, "resolvido_em": agora, "atualizado_em": agora}}
+                    ))
+                    contagem["resolvidos"] += 1
+
+        if operacoes:
+            await self.collection.bulk_write(operacoes, ordered=False, session=session)
+        return contagem
+
+    async def remover_abate(self, abate_id: Any, session=None) -> int:
+        """Excluir os alertas de um abate excluído"""
+        result = await self.collection.delete_many({"abate_id": abate_id}, session=session)
+        return result.deleted_count
+
+    async def reavaliar(self, tamanho_lote: int = 2000) -> Dict[str, int]:
+        """Reavaliar os alertas de todos os abates com os limites atuais, em lotes"""
+        limites = await self.limites()
+        projecao = {campo: 1 for campo in alertas.CAMPOS + _CAMPOS_ABATE}
+        cursor = self.db["abates_completos"].find({}, projecao).batch_size(tamanho_lote)
+
+        totais = {"abates": 0, "abertos": 0, "atualizados": 0, "resolvidos": 0}
+        lote = []
+        async for abate in cursor:
+            lote.append(abate)
+            if len(lote) >= tamanho_lote:
+                await self._acumular(totais, lote, limites)
+                lote = []
+        if lote:
+            await self._acumular(totais, lote, limites)
+        return totais
+
+    async def _acumular(self, totais: Dict[str, int], lote: List[Dict[str, Any]], limites: Dict[str, Any]) -> None:
+        totais["abates"] += len(lote)
+        for chave, quantidade in (await self.sincronizar(lote, limites)).items():
+            totais[chave] += quantidade
+
+    @staticmethod
+    def _montar_filtro(
+        status: Optional[str] = alertas.ABERTO,
+        unidade: Optional[str] = None,
+        severidade: Optional[str] = None,
+        regra: Optional[str] = None,
+        data_inicio: Optional[datetime] = None,
+        data_fim: Optional[datetime] = None
+    ) -> Dict[str, Any]:
+        """Filtro por igualdade nos campos indexados"""
+        query = {}
+        if status:
+            query["status"] = status
+        if unidade:
+            query["unidade"] = unidade
+        if severidade:
+            query["severidade"] = severidade
+        if regra:
+            query["regra"] = regra
+        if data_inicio or data_fim:
+            date_query = {}
+            if data_inicio:
+                date_query["$gte"] = data_inicio
+            if data_fim:
+                date_query["$lte"] = data_fim
+            query["data_abate"] = date_query
+        return query
+
+    async def get_many(self, skip: int = 0, limit: int = 100, **filtros) -> List[Dict[str, Any]]:
+        """Listar alertas, mais recentes primeiro"""
+        cursor = self.collection.find(self._montar_filtro(**filtros)).sort("data_abate", -1).skip(skip).limit(limit)
+        documentos = await cursor.to_list(length=limit)
+        for documento in documentos:
+            documento["id"] = str(documento.pop("_id"))
+            documento["abate_id"] = str(documento["abate_id"])
+        return documentos
+
+    async def count(self, **filtros) -> int:
+        return await self.collection.count_documents(self._montar_filtro(**filtros))
+
+    async def resumo(self, status: Optional[str] = alertas.ABERTO) -> Dict[str, Any]:
+        """Quantidade de alertas por severidade e por regra"""
+        pipeline = [
+            {"$match": self._montar_filtro(status=status)},
+            {"$facet": {
+                "severidade": [{"$group": {"_id": "$severidade", "quantidade": {"$sum": 1}}}],
+                "regra": [{"$group": {"_id": "$regra", "quantidade": {"$sum": 1}}}]
+            }}
+        ]
+        resultado = await self.collection.aggregate(pipeline).to_list(length=1)
+        grupos = resultado[0] if resultado else {"severidade": [], "regra": []}
+        por_severidade = {grupo["_id"]: grupo["quantidade"] for grupo in grupos["severidade"]}
+        return {
+            "total": sum(por_severidade.values()),
+            "por_severidade": {severidade: por_severidade.get(severidade, 0) for severidade in alertas.SEVERIDADES},
+            "por_regra": {grupo["_id"]: grupo["quantidade"] for grupo in grupos["regra"]}
+        }
+
+
+def get_alerta_crud(db: AsyncIOMotorDatabase) -> AlertaCRUD:
+    """Factory function para criar instância do CRUD"""
+    return AlertaCRUD(db)
@@ -4,9 +4,11 @@ from bson import ObjectId
 from datetime import datetime
 
 from app.models.configuracao_limites import ConfiguracaoLimites, ConfiguracaoLimitesCreate, ConfiguracaoLimitesUpdate
+from app.services import versoes_colecoes
 
 class CRUDConfiguracaoLimites:
     def __init__(self, db: AsyncIOMotorDatabase):
+        self.db = db
         self.collection: AsyncIOMotorCollection = db.configuracao_limites
     
     async def get_default(self) -> Optional[ConfiguracaoLimites]:
@@ -31,6 +33,7 @@ class CRUDConfiguracaoLimites:
                 {"_id": existing["_id"]},
                 {"$set": config_dict}
             )
+            await versoes_colecoes.incrementar(self.db, self.collection.name)
             updated_config = await self.collection.find_one({"_id": existing["_id"]})
             updated_config["id"] = str(updated_config["_id"])
             return ConfiguracaoLimites(**updated_config)
@@ -38,6 +41,7 @@ class CRUDConfiguracaoLimites:
             # Criar novo registro
             config_dict["created_at"] = datetime.now()
             result = await self.collection.insert_one(config_dict)
+            await versoes_colecoes.incrementar(self.db, self.collection.name)
             created_config = await self.collection.find_one({"_id": result.inserted_id})
             created_config["id"] = str(created_config["_id"])
             return ConfiguracaoLimites(**created_config)
@@ -55,6 +59,7 @@ class CRUDConfiguracaoLimites:
             {"_id": existing["_id"]},
             {"$set": update_data}
         )
+        await versoes_colecoes.incrementar(self.db, self.collection.name)
         
         updated_config = await self.collection.find_one({"_id": existing["_id"]})
         updated_config["id"] = str(updated_config["_id"])
@@ -63,6 +68,8 @@ class CRUDConfiguracaoLimites:
     async def delete(self) -> bool:
         """Deletar configuração de limites"""
         result = await self.collection.delete_many({})
+        if result.deleted_count:
+            await versoes_colecoes.incrementar(self.db, self.collection.name)
         return result.deleted_count > 0
 
 def get_configuracao_limites_crud(db: AsyncIOMotorDatabase) -> CRUDConfiguracaoLimites:
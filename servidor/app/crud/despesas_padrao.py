@@ -4,9 +4,11 @@ from bson import ObjectId
 from datetime import datetime
 
 from app.models.despesas_padrao import DespesasPadrao, DespesasPadraoCreate, DespesasPadraoUpdate
+from app.services import versoes_colecoes
 
 class CRUDDespesasPadrao:
     def __init__(self, db: AsyncIOMotorDatabase):
+        self.db = db
         self.collection: AsyncIOMotorCollection = db.despesas_padrao
     
     async def get_default(self) -> Optional[DespesasPadrao]:
@@ -31,6 +33,7 @@ class CRUDDespesasPadrao:
                 {"_id": existing["_id"]},
                 {"$set": despesas_dict}
             )
+            await versoes_colecoes.incrementar(self.db, self.collection.name)
             updated_despesa = await self.collection.find_one({"_id": existing["_id"]})
             updated_despesa["id"] = str(updated_despesa["_id"])
             return DespesasPadrao(**updated_despesa)
@@ -38,6 +41,7 @@ class CRUDDespesasPadrao:
             # Criar novo registro
             despesas_dict["created_at"] = datetime.now()
             result = await self.collection.insert_one(despesas_dict)
+            await versoes_colecoes.incrementar(self.db, self.collection.name)
             created_despesa = await self.collection.find_one({"_id": result.inserted_id})
             created_despesa["id"] = str(created_despesa["_id"])
             return DespesasPadrao(**created_despesa)
@@ -55,6 +59,7 @@ class CRUDDespesasPadrao:
             {"_id": existing["_id"]},
             {"$set": update_data}
         )
+        await versoes_colecoes.incrementar(self.db, self.collection.name)
         
         updated_despesa = await self.collection.find_one({"_id": existing["_id"]})
         updated_despesa["id"] = str(updated_despesa["_id"])
@@ -63,6 +68,8 @@ class CRUDDespesasPadrao:
     async def delete(self) -> bool:
         """Deletar valores padrão das despesas"""
         result = await self.collection.delete_many({})
+        if result.deleted_count:
+            await versoes_colecoes.incrementar(self.db, self.collection.name)
         return result.deleted_count > 0
 
 def get_despesas_padrao_crud(db: AsyncIOMotorDatabase) -> CRUDDespesasPadrao:
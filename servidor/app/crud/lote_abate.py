@@ -1,14 +1,18 @@
 from datetime import datetime
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from bson import ObjectId
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from pymongo import DESCENDING
 
 from app.models.lote_abate import LoteAbate, LoteAbateCreate, LoteAbateUpdate
+from app.services import busca, envelope, paginacao, versoes_colecoes
+
+_CAMPOS_BUSCA = busca.CAMPOS["lotes_abate"]
 
 
 class CRUDLoteAbate:
     def __init__(self, db: AsyncIOMotorDatabase):
+        self.db = db
         self.collection = db.lotes_abate
 
     async def create(self, lote_data: LoteAbateCreate) -> LoteAbate:
@@ -16,8 +20,10 @@ class CRUDLoteAbate:
         lote_dict = lote_data.dict()
         lote_dict["created_at"] = datetime.utcnow()
         lote_dict["updated_at"] = None
+        lote_dict[busca.CAMPO] = busca.chaves(lote_dict, _CAMPOS_BUSCA)
         
         result = await self.collection.insert_one(lote_dict)
+        await versoes_colecoes.incrementar(self.db, self.collection.name)
         created_lote = await self.collection.find_one({"_id": result.inserted_id})
         return LoteAbate(**created_lote)
 
@@ -32,14 +38,33 @@ class CRUDLoteAbate:
         return None
 
     async def get_multi(
-        self, *, skip: int = 0, limit: int = 100, filters: Optional[dict] = None
+        self, *, skip: int = 0, limit: int = 100, filters: Optional[dict] = None, cursor: Optional[str] = None
     ) -> List[LoteAbate]:
-        """Retrieve multiple lotes de abate with pagination and filters"""
+        """Retrieve multiple lotes de abate with pagination and filters.
+
+        Ordena por data do abate (mais recentes primeiro); com ``cursor`` a
+        página começa depois do último lote da anterior e ``skip`` é ignorado.
+        """
         query = filters or {}
-        cursor = self.collection.find(query).skip(skip).limit(limit)
-        lotes = await cursor.to_list(length=limit)
+        if cursor:
+            query = paginacao.aplicar(query, cursor)
+            skip = 0
+        resultado = self.collection.find(query).sort(paginacao.ORDEM).skip(skip).limit(limit)
+        lotes = await resultado.to_list(length=limit)
         return [LoteAbate(**lote) for lote in lotes]
 
+    async def get_multi_com_total(
+        self, *, skip: int = 0, limit: int = 100, filters: Optional[dict] = None, cursor: Optional[str] = None
+    ) -> Tuple[List[LoteAbate], int]:
+        """Como ``get_multi``, com o total do filtro contado em paralelo (``envelope.buscar``)"""
+        if cursor:
+            skip = 0
+        lotes, total = await envelope.buscar(
+            self.collection, filters or {}, paginacao.ORDEM, skip, limit,
+            pagina=paginacao.apos(cursor) if cursor else None
+        )
+        return [LoteAbate(**lote) for lote in lotes], total
+
     async def update(self, lote_id: str, lote_update: LoteAbateUpdate) -> Optional[LoteAbate]:
         """Atualizar lote existente"""
         if not ObjectId.is_valid(lote_id):
@@ -48,11 +73,15 @@ class CRUDLoteAbate:
         update_data = lote_update.dict(exclude_unset=True)
         if update_data:
             update_data["updated_at"] = datetime.utcnow()
+            if any(campo in update_data for campo in _CAMPOS_BUSCA):
+                atual = await self.collection.find_one({"_id": ObjectId(lote_id)}) or {}
+                update_data[busca.CAMPO] = busca.chaves({**atual, **update_data}, _CAMPOS_BUSCA)
             
             await self.collection.update_one(
                 {"_id": ObjectId(lote_id)},
                 {"$set": update_data}
             )
+            await versoes_colecoes.incrementar(self.db, self.collection.name)
             
         updated_lote = await self.collection.find_one({"_id": ObjectId(lote_id)})
         if updated_lote:
@@ -65,24 +94,35 @@ class CRUDLoteAbate:
             return False
             
         result = await self.collection.delete_one({"_id": ObjectId(lote_id)})
+        if result.deleted_count:
+            await versoes_colecoes.incrementar(self.db, self.collection.name)
         return result.deleted_count > 0
 
-    async def count(self, unidade: Optional[str] = None, tipo_ave: Optional[str] = None) -> int:
+    @staticmethod
+    def montar_filtro(
+        unidade: Optional[str] = None,
+        tipo_ave: Optional[str] = None,
+        modo_busca: str = busca.EXATA
+    ) -> dict:
+        """Filtro pelas chaves normalizadas de unidade e tipo de ave"""
+        return busca.aplicar({}, {"unidade": unidade, "tipo_ave": tipo_ave}, modo_busca)
+
+    async def count(
+        self,
+        unidade: Optional[str] = None,
+        tipo_ave: Optional[str] = None,
+        modo_busca: str = busca.EXATA
+    ) -> int:
         """Contar total de lotes com filtros opcionais"""
-        query = {}
-        
-        if unidade:
-            query["unidade"] = {"$regex": unidade, "$options": "i"}
-        if tipo_ave:
-            query["tipo_ave"] = tipo_ave
-            
+        query = self.montar_filtro(unidade, tipo_ave, modo_busca)
         return await self.collection.count_documents(query)
 
     async def get_by_date_range(
         self, 
         start_date: datetime, 
         end_date: datetime,
-        unidade: Optional[str] = None
+        unidade: Optional[str] = None,
+        modo_busca: str = busca.EXATA
     ) -> List[LoteAbate]:
         """Buscar lotes por período"""
         query = {
@@ -92,9 +132,7 @@ class CRUDLoteAbate:
             }
         }
         
-        if unidade:
-            query["unidade"] = {"$regex": unidade, "$options": "i"}
-            
+        query.update(self.montar_filtro(unidade=unidade, modo_busca=modo_busca))
         cursor = self.collection.find(query).sort("data_abate", DESCENDING)
         lotes = await cursor.to_list(length=None)
         return [LoteAbate(**lote) for lote in lotes]
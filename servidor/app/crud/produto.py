@@ -1,35 +1,51 @@
 from datetime import datetime
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from bson import ObjectId
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from pymongo import DESCENDING
 
 from app.models.produto import Produto, ProdutoCreate, ProdutoUpdate
+from app.services import busca, versoes_colecoes
+from app.services.catalogo_produtos import catalogo
+
+_CAMPOS_BUSCA = busca.CAMPOS["produtos"]
 
 
 class CRUDProduto:
+    """Produtos do catálogo: leituras na memória (``catalogo_produtos``), escritas no banco e na memória"""
+
     def __init__(self, db: AsyncIOMotorDatabase):
+        self.db = db
         self.collection = db.produtos
 
+    async def _catalogo(self):
+        versoes = await versoes_colecoes.consultar(self.db, [self.collection.name])
+        if catalogo.desatualizado(versoes[self.collection.name]):
+            await catalogo.carregar(self.collection)
+        return catalogo
+
+    async def _registrar_alteracao(self) -> None:
+        """Incrementar o contador depois de o catálogo já refletir a escrita"""
+        catalogo.acompanhar(await versoes_colecoes.incrementar(self.db, self.collection.name))
+
     async def create(self, produto_data: ProdutoCreate) -> Produto:
         """Criar um novo produto"""
         produto_dict = produto_data.dict()
         produto_dict["created_at"] = datetime.utcnow()
         produto_dict["updated_at"] = None
+        produto_dict[busca.CAMPO] = busca.chaves(produto_dict, _CAMPOS_BUSCA)
         
         result = await self.collection.insert_one(produto_dict)
         created_produto = await self.collection.find_one({"_id": result.inserted_id})
+        catalogo.gravar(created_produto)
+        await self._registrar_alteracao()
         return Produto(**created_produto)
 
     async def get(self, produto_id: str) -> Optional[Produto]:
         """Buscar produto por ID"""
         if not ObjectId.is_valid(produto_id):
             return None
-            
-        produto = await self.collection.find_one({"_id": ObjectId(produto_id)})
-        if produto:
-            return Produto(**produto)
-        return None
+        return (await self._catalogo()).get(produto_id)
 
     async def get_multi(
         self, 
@@ -37,26 +53,25 @@ class CRUDProduto:
         limit: int = 100,
         search: Optional[str] = None,
         tipo: Optional[str] = None,
-        unidade_origem: Optional[str] = None
+        unidade_origem: Optional[str] = None,
+        modo_busca: str = busca.EXATA
     ) -> List[Produto]:
         """Listar produtos com filtros opcionais"""
-        query = {}
-        
-        # Busca por texto em nome e tipo
-        if search:
-            query["$or"] = [
-                {"nome": {"$regex": search, "$options": "i"}},
-                {"tipo": {"$regex": search, "$options": "i"}}
-            ]
-        
-        if tipo:
-            query["tipo"] = {"$regex": tipo, "$options": "i"}
-        if unidade_origem:
-            query["unidade_origem"] = {"$regex": unidade_origem, "$options": "i"}
-            
-        cursor = self.collection.find(query).sort("nome", 1).skip(skip).limit(limit)
-        produtos = await cursor.to_list(length=limit)
-        return [Produto(**produto) for produto in produtos]
+        produtos = (await self._catalogo()).filtrar(tipo, unidade_origem, modo_busca, search)
+        return produtos[skip:skip + limit]
+
+    async def get_multi_com_total(
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        search: Optional[str] = None,
+        tipo: Optional[str] = None,
+        unidade_origem: Optional[str] = None,
+        modo_busca: str = busca.EXATA
+    ) -> Tuple[List[Produto], int]:
+        """Como ``get_multi``, com o total do filtro"""
+        produtos = (await self._catalogo()).filtrar(tipo, unidade_origem, modo_busca, search)
+        return produtos[skip:skip + limit], len(produtos)
 
     async def update(self, produto_id: str, produto_update: ProdutoUpdate) -> Optional[Produto]:
         """Atualizar produto existente"""
@@ -66,6 +81,9 @@ class CRUDProduto:
         update_data = produto_update.dict(exclude_unset=True)
         if update_data:
             update_data["updated_at"] = datetime.utcnow()
+            if any(campo in update_data for campo in _CAMPOS_BUSCA):
+                atual = await self.collection.find_one({"_id": ObjectId(produto_id)}) or {}
+                update_data[busca.CAMPO] = busca.chaves({**atual, **update_data}, _CAMPOS_BUSCA)
             
             await self.collection.update_one(
                 {"_id": ObjectId(produto_id)},
@@ -74,8 +92,12 @@ class CRUDProduto:
             
         updated_produto = await self.collection.find_one({"_id": ObjectId(produto_id)})
         if updated_produto:
-            return Produto(**updated_produto)
-        return None
+            catalogo.gravar(updated_produto)
+        else:
+            catalogo.remover(produto_id)
+        if update_data:
+            await self._registrar_alteracao()
+        return Produto(**updated_produto) if updated_produto else None
 
     async def delete(self, produto_id: str) -> bool:
         """Deletar produto por ID"""
@@ -83,37 +105,27 @@ class CRUDProduto:
             return False
             
         result = await self.collection.delete_one({"_id": ObjectId(produto_id)})
+        catalogo.remover(produto_id)
+        if result.deleted_count:
+            await self._registrar_alteracao()
         return result.deleted_count > 0
 
-    async def count(self, tipo: Optional[str] = None, unidade_origem: Optional[str] = None) -> int:
+    async def count(
+        self,
+        tipo: Optional[str] = None,
+        unidade_origem: Optional[str] = None,
+        modo_busca: str = busca.EXATA
+    ) -> int:
         """Contar total de produtos com filtros opcionais"""
-        query = {}
-        
-        if tipo:
-            query["tipo"] = {"$regex": tipo, "$options": "i"}
-        if unidade_origem:
-            query["unidade_origem"] = {"$regex": unidade_origem, "$options": "i"}
-            
-        return await self.collection.count_documents(query)
+        return len((await self._catalogo()).filtrar(tipo, unidade_origem, modo_busca))
 
     async def get_by_tipo(self, tipo: str) -> List[Produto]:
-        """Buscar produtos por tipo"""
-        query = {"tipo": {"$regex": tipo, "$options": "i"}}
-        cursor = self.collection.find(query).sort("nome", 1)
-        produtos = await cursor.to_list(length=None)
-        return [Produto(**produto) for produto in produtos]
+        """Buscar produtos cujo tipo contém o texto (sem acentos e maiúsculas)"""
+        return (await self._catalogo()).contendo("tipo", tipo)
 
     async def get_price_range(self, min_price: float, max_price: float) -> List[Produto]:
         """Buscar produtos por faixa de preço"""
-        query = {
-            "preco_kg": {
-                "$gte": min_price,
-                "$lte": max_price
-            }
-        }
-        cursor = self.collection.find(query).sort("preco_kg", 1)
-        produtos = await cursor.to_list(length=None)
-        return [Produto(**produto) for produto in produtos]
+        return (await self._catalogo()).faixa_preco(min_price, max_price)
 
 
 def get_produto_crud(db: AsyncIOMotorDatabase) -> CRUDProduto:
@@ -1,9 +1,58 @@
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from app.core import condicional
 from app.core.config import settings
+from app.core.db import get_db
+from app.core.indices import garantir_indices, imprimir_relatorio
+from app.services import paginacao
+from app.services.catalogo_produtos import catalogo
+from app.services.varredura_busca import varrer_chaves_busca
+from app.services.varredura_metricas import varrer_metricas_desatualizadas
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    db = await get_db()
+    tarefas = []
+    
+    if db is not None:
+        try:
+            imprimir_relatorio(await garantir_indices(db))
+        except Exception as e:
+            print(f"AVISO: Não foi possível conferir os índices do MongoDB: {e}")
+    
+    # Catálogo de produtos em memória (sem ele, carregado na primeira consulta)
+    if db is not None:
+        try:
+            await catalogo.carregar(db.produtos)
+            print(f"INFO: Catálogo de produtos carregado: {len(catalogo.ordenados)} produtos")
+        except Exception as e:
+            print(f"AVISO: Não foi possível carregar o catálogo de produtos: {e}")
+    
+    # Atualizar métricas de versões antigas sem bloquear a inicialização
+    if db is not None and settings.METRICAS_VARREDURA_ATIVA:
+        tarefas.append(asyncio.create_task(varrer_metricas_desatualizadas(db)))
+    
+    # Preencher chaves de busca ausentes (sem elas o documento some dos filtros)
+    if db is not None and settings.BUSCA_VARREDURA_ATIVA:
+        tarefas.append(asyncio.create_task(varrer_chaves_busca(db)))
+    
+    yield
+    
+    for tarefa in tarefas:
+        tarefa.cancel()
+    await asyncio.gather(*tarefas, return_exceptions=True)
+
+
+app = FastAPI(title=settings.APP_NAME, lifespan=lifespan)
 
-app = FastAPI(title=settings.APP_NAME)
+# GET condicional: 304 quando o If-None-Match confere, ETag nas respostas 200
+app.add_exception_handler(condicional.NaoModificado, condicional.resposta_nao_modificado)
+app.middleware("http")(condicional.acrescentar_cabecalhos)
 
 # Debug: Log das configurações CORS
 print(f"BACKEND_CORS_ORIGINS (raw): {settings.BACKEND_CORS_ORIGINS}")
@@ -19,6 +68,8 @@ if origins:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        # Cursor da próxima página das listagens e ETag dos GETs condicionais
+        expose_headers=[paginacao.CABECALHO, "ETag"],
     )
 else:
     print("AVISO: Nenhuma origin CORS configurada!")
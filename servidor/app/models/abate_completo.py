@@ -280,6 +280,7 @@ class AbateCompletoInDB(AbateCompletoBase):
     id: Optional[PyObjectId] = Field(default=None, alias="_id")
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: Optional[datetime] = None
+    metricas_versao: Optional[int] = Field(default=None, description="Versão do cálculo que gerou as métricas")
 
     class Config:
         populate_by_name = True
@@ -0,0 +1,95 @@
+"""
+Regras de alerta dos abates a partir da configuração de limites.
+
+Cada regra compara uma métrica gravada no abate com um limite de
+``ConfiguracaoLimites`` e só é avaliada quando ``alertas_ativos`` e o seu
+interruptor (``alerta_*``) estão ligados. A avaliação é feita em lote com
+NumPy: a escrita de um abate avalia um lote de um documento e a mudança de
+limites reavalia todos os abates em lotes maiores, com as mesmas regras.
+"""
+
+from typing import Any, Dict, List, NamedTuple, Optional
+
+import numpy as np
+
+COLECAO = "alertas"
+
+ABERTO = "aberto"
+RESOLVIDO = "resolvido"
+
+SEVERIDADES = ("alta", "media", "baixa")
+
+# Campos do abate usados pelas regras
+CAMPOS = (
+    "rendimento_final",
+    "lucro_frango",
+    "aves_hora",
+    "peso_medio_ave",
+    "custo_ave",
+    "custo_frango",
+    "percentual_perda_total",
+)
+
+
+class Regra(NamedTuple):
+    titulo: str
+    limite: str
+    maximo: bool
+    severidade: str
+    interruptor: Optional[str]
+
+
+REGRAS = {
+    "rendimento_baixo": Regra("Rendimento abaixo do mínimo", "rendimento_minimo", False, "media", "alerta_rendimento_baixo"),
+    "lucro_baixo": Regra("Lucro por ave abaixo do mínimo", "lucro_minimo_por_ave", False, "alta", "alerta_lucro_baixo"),
+    "eficiencia_baixa": Regra("Aves por hora abaixo do mínimo", "aves_por_hora_minimo", False, "baixa", "alerta_eficiencia_baixa"),
+    "qualidade_baixa": Regra("Peso médio abaixo do mínimo", "peso_medio_minimo", False, "media", "alerta_qualidade_baixa"),
+    "custo_alto": Regra("Custo operacional por ave acima do máximo", "custo_operacional_maximo_por_ave", True, "media", "alerta_custo_alto"),
+    "perdas_altas": Regra("Percentual de perdas acima do máximo", "percentual_perdas_maximo", True, "alta", None),
+}
+
+
+def colunas(abates: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+    """Colunas float dos campos usados pelas regras (NaN quando ausentes)"""
+    resultado = {}
+    for campo in CAMPOS:
+        valores = [abate.get(campo) for abate in abates]
+        resultado[campo] = np.array(
+            [valor if isinstance(valor, (int, float)) else np.nan for valor in valores],
+            dtype=np.float64
+        )
+    return resultado
+
+
+def valores(dados: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """Valor comparado por cada regra"""
+    return {
+        "rendimento_baixo": dados["rendimento_final"],
+        "lucro_baixo": dados["lucro_frango"],
+        "eficiencia_baixa": dados["aves_hora"],
+        "qualidade_baixa": dados["peso_medio_ave"],
+        # Custo operacional = custos totais por ave menos a compra do frango vivo
+        "custo_alto": dados["custo_ave"] - dados["custo_frango"],
+        "perdas_altas": dados["percentual_perda_total"],
+    }
+
+
+def avaliar(abates: List[Dict[str, Any]], limites: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """Regras disparadas no lote: regra -> {"disparado": máscara, "valor": valores, "limite": limite}.
+
+    Regras desligadas na configuração ficam fora do resultado.
+    """
+    if not limites.get("alertas_ativos", True) or not abates:
+        return {}
+
+    resultado = {}
+    for nome, valor in valores(colunas(abates)).items():
+        regra = REGRAS[nome]
+        if regra.interruptor and not limites.get(regra.interruptor, True):
+            continue
+        limite = limites[regra.limite]
+        # Comparações com NaN são falsas: abates sem a métrica não disparam
+        with np.errstate(invalid="ignore"):
+            disparado = valor > limite if regra.maximo else valor < limite
+        resultado[nome] = {"disparado": disparado, "valor": valor, "limite": limite}
+    return resultado
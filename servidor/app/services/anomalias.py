@@ -0,0 +1,216 @@
+"""
+Detecção incremental de abates fora do padrão da unidade.
+
+Para cada unidade e métrica é mantido o estado de Welford (quantidade, média
+e soma dos quadrados dos desvios, ``m2``), atualizado a cada escrita por um
+update com pipeline: o documento da unidade é alterado atomicamente no
+servidor, sem ler antes, e a exclusão ou a versão anterior de um abate
+alterado é retirada pela fórmula inversa.
+
+Um abate é marcado como anômalo numa métrica quando o seu valor fica a mais
+de ``LIMIAR_Z`` desvios padrão da média dos *outros* abates da unidade
+(a contribuição do próprio abate é retirada antes da comparação), desde que
+a unidade tenha pelo menos ``MINIMO_AMOSTRAS`` abates com a métrica.
+"""
+
+import math
+from typing import Any, Dict, Iterable, List, Optional
+
+from .metricas_definicoes import DESPESAS_CUSTOS_FIXOS
+
+COLECAO = "abates_estatisticas"
+
+LIMIAR_Z = 3.0
+MINIMO_AMOSTRAS = 30
+
+# Métrica -> caminho do campo no abate
+METRICAS = {
+    "rendimento_final": "rendimento_final",
+    "percentual_perda_total": "percentual_perda_total",
+    "custo_kg": "custo_kg",
+    **{f"despesas.{campo}": f"despesas_fixas.{campo}" for campo in DESPESAS_CUSTOS_FIXOS},
+}
+
+# Campos dos abates lidos pelas estatísticas
+PROJECAO = {"unidade": 1, "metricas_versao": 1, "despesas_fixas": 1, "rendimento_final": 1,
+            "percentual_perda_total": 1, "custo_kg": 1}
+
+
+def _valido(valor: Any) -> bool:
+    return (
+        isinstance(valor, (int, float)) and not isinstance(valor, bool)
+        and not math.isnan(valor) and not math.isinf(valor)
+    )
+
+
+def valores(abate: Dict[str, Any]) -> Dict[str, float]:
+    """Valores numéricos das métricas acompanhadas (métricas ausentes ficam de fora)"""
+    resultado = {}
+    for metrica, caminho in METRICAS.items():
+        valor = abate
+        for parte in caminho.split("."):
+            valor = valor.get(parte) if isinstance(valor, dict) else None
+        if _valido(valor):
+            resultado[metrica] = float(valor)
+    return resultado
+
+
+# Estado de Welford em Python (reconstrução e comparação)
+
+def incluir(estado: Optional[Dict[str, float]], valor: float) -> Dict[str, float]:
+    n = (estado or {}).get("n", 0) + 1
+    media = (estado or {}).get("media", 0.0)
+    delta = valor - media
+    media += delta / n
+    return {"n": n, "media": media, "m2": (estado or {}).get("m2", 0.0) + delta * (valor - media)}
+
+
+def retirar(estado: Optional[Dict[str, float]], valor: float) -> Dict[str, float]:
+    n = (estado or {}).get("n", 0)
+    if n <= 1:
+        return {"n": 0, "media": 0.0, "m2": 0.0}
+    media = estado.get("media", 0.0)
+    media_sem = (n * media - valor) / (n - 1)
+    m2 = estado.get("m2", 0.0) - (valor - media_sem) * (valor - media)
+    return {"n": n - 1, "media": media_sem, "m2": max(m2, 0.0)}
+
+
+def desvio_padrao(estado: Dict[str, float]) -> Optional[float]:
+    n = estado.get("n", 0)
+    return math.sqrt(max(estado.get("m2", 0.0), 0.0) / (n - 1)) if n > 1 else None
+
+
+# Atualização no servidor (update com pipeline)
+
+def _campo(metrica: str) -> str:
+    return f"metricas.{metrica}"
+
+
+def _incluir_expr(metrica: str, valor: float) -> Dict[str, Any]:
+    campo = _campo(metrica)
+    return {"$let": {
+        "vars": {
+            "n": {"$add": [{"$ifNull": [f"${campo}.n", 0]}, 1]},
+            "media": {"$ifNull": [f"${campo}.media", 0]},
+            "m2": {"$ifNull": [f"${campo}.m2", 0]},
+        },
+        "in": {"$let": {
+            "vars": {"nova": {"$add": ["$$media", {"$divide": [{"$subtract": [valor, "$$media"]}, "$$n"]}]}},
+            "in": {
+                "n": "$$n",
+                "media": "$$nova",
+                "m2": {"$add": ["$$m2", {"$multiply": [
+                    {"$subtract": [valor, "$$media"]}, {"$subtract": [valor, "$$nova"]}
+                ]}]},
+            },
+        }},
+    }}
+
+
+def _retirar_expr(metrica: str, valor: float) -> Dict[str, Any]:
+    campo = _campo(metrica)
+    return {"$let": {
+        "vars": {
+            "n": {"$ifNull": [f"${campo}.n", 0]},
+            "media": {"$ifNull": [f"${campo}.media", 0]},
+            "m2": {"$ifNull": [f"${campo}.m2", 0]},
+        },
+        "in": {"$cond": [
+            {"$lte": ["$$n", 1]},
+            {"n": 0, "media": 0, "m2": 0},
+            {"$let": {
+                "vars": {"sem": {"$divide": [
+                    {"$subtract": [{"$multiply": ["$$n", "$$media"]}, valor]},
+                    {"$subtract": ["$$n", 1]}
+                ]}},
+                "in": {
+                    "n": {"$subtract": ["$$n", 1]},
+                    "media": "$$sem",
+                    "m2": {"$max": [0, {"$subtract": ["$$m2", {"$multiply": [
+                        {"$subtract": [valor, "$$sem"]}, {"$subtract": [valor, "$$media"]}
+                    ]}]}]},
+                },
+            }},
+        ]},
+    }}
+
+
+def atualizacao(retirados: Dict[str, float], incluidos: Dict[str, float]) -> List[Dict[str, Any]]:
+    """Pipeline de update que retira os valores antigos e inclui os novos, em sequência"""
+    estagios = []
+    if retirados:
+        estagios.append({"$set": {_campo(m): _retirar_expr(m, v) for m, v in retirados.items()}})
+    if incluidos:
+        estagios.append({"$set": {_campo(m): _incluir_expr(m, v) for m, v in incluidos.items()}})
+    return estagios
+
+
+def _achatar(metricas: Dict[str, Any], prefixo: str = "") -> Dict[str, Dict[str, float]]:
+    """``{"despesas": {"agua": estado}}`` -> ``{"despesas.agua": estado}``"""
+    resultado = {}
+    for chave, valor in (metricas or {}).items():
+        if isinstance(valor, dict) and "n" not in valor:
+            resultado.update(_achatar(valor, f"{prefixo}{chave}."))
+        elif isinstance(valor, dict):
+            resultado[f"{prefixo}{chave}"] = valor
+    return resultado
+
+
+def estados(documento: Optional[Dict[str, Any]]) -> Dict[str, Dict[str, float]]:
+    """Estados por métrica de um documento de estatísticas"""
+    return _achatar((documento or {}).get("metricas"))
+
+
+def documento(estados_metricas: Dict[str, Dict[str, float]]) -> Dict[str, Any]:
+    """Campo ``metricas`` aninhado a partir dos estados por métrica"""
+    metricas = {}
+    for metrica, estado in estados_metricas.items():
+        destino = metricas
+        *grupos, nome = metrica.split(".")
+        for grupo in grupos:
+            destino = destino.setdefault(grupo, {})
+        destino[nome] = estado
+    return metricas
+
+
+def acumular(abates: Iterable[Dict[str, Any]]) -> Dict[str, Dict[str, Dict[str, float]]]:
+    """Estados por unidade e métrica numa única passada pelos abates"""
+    por_unidade = {}
+    for abate in abates:
+        estados_unidade = por_unidade.setdefault(abate.get("unidade"), {})
+        for metrica, valor in valores(abate).items():
+            estados_unidade[metrica] = incluir(estados_unidade.get(metrica), valor)
+    return por_unidade
+
+
+def avaliar(
+    abate: Dict[str, Any],
+    estados_unidade: Dict[str, Dict[str, float]],
+    incluido: bool = True
+) -> List[Dict[str, Any]]:
+    """Métricas do abate fora de ``LIMIAR_Z`` desvios da média dos outros abates da unidade.
+
+    Com ``incluido`` o valor do próprio abate está nos estados e é retirado
+    antes da comparação.
+    """
+    resultado = []
+    for metrica, valor in valores(abate).items():
+        estado = estados_unidade.get(metrica)
+        if not estado:
+            continue
+        if incluido:
+            estado = retirar(estado, valor)
+        desvio = desvio_padrao(estado)
+        if estado["n"] < MINIMO_AMOSTRAS or not desvio:
+            continue
+        z = (valor - estado["media"]) / desvio
+        if abs(z) > LIMIAR_Z:
+            resultado.append({
+                "metrica": metrica,
+                "valor": valor,
+                "media": round(estado["media"], 4),
+                "desvio_padrao": round(desvio, 4),
+                "z": round(z, 2),
+                "amostras": estado["n"],
+            })
+    return sorted(resultado, key=lambda item: -abs(item["z"]))
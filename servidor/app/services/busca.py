@@ -0,0 +1,78 @@
+"""
+Chaves normalizadas para filtros por texto (unidade, tipo de ave, tipo de produto).
+
+Cada documento guarda, no subdocumento ``busca``, o valor dos campos filtráveis
+sem acentos, em minúsculas e com espaços simples. Os filtros comparam a chave
+normalizada do valor pedido com a chave gravada:
+
+- ``exata``: igualdade, que usa o índice sobre ``busca.<campo>``;
+- ``prefixo``: regex ancorada (``^...``) sobre a chave, também resolvida por
+  faixa do índice.
+
+As chaves são gravadas pelos CRUDs na criação e na atualização; documentos
+antigos recebem as chaves com ``migrar_chaves_busca.py``.
+"""
+
+import re
+import unicodedata
+from typing import Any, Dict, Iterable, Optional
+
+CAMPO = "busca"
+
+EXATA = "exata"
+PREFIXO = "prefixo"
+MODOS = (EXATA, PREFIXO)
+
+# Coleção -> campos com chave de busca
+CAMPOS = {
+    "abates_completos": ("unidade", "tipo_ave"),
+    "lotes_abate": ("unidade", "tipo_ave"),
+    "produtos": ("nome", "tipo", "unidade_origem"),
+}
+
+
+def normalizar(valor: Any) -> str:
+    """Texto sem acentos, em minúsculas e com espaços simples"""
+    texto = unicodedata.normalize("NFKD", str(valor))
+    texto = "".join(caractere for caractere in texto if not unicodedata.combining(caractere))
+    return " ".join(texto.casefold().split())
+
+
+def chaves(documento: Dict[str, Any], campos: Iterable[str]) -> Dict[str, str]:
+    """Subdocumento ``busca`` com as chaves dos campos preenchidos"""
+    return {
+        campo: normalizar(documento[campo])
+        for campo in campos
+        if documento.get(campo) is not None
+    }
+
+
+def validar_modo(modo: str) -> None:
+    if modo not in MODOS:
+        raise ValueError(f"Modo de busca inválido: {modo}. Use {', '.join(MODOS)}")
+
+
+def filtro(campo: str, valor: str, modo: str = EXATA) -> Dict[str, Any]:
+    """Condição sobre a chave normalizada de ``campo``"""
+    validar_modo(modo)
+    chave = normalizar(valor)
+    if modo == PREFIXO:
+        return {f"{CAMPO}.{campo}": {"$regex": f"^{re.escape(chave)}"}}
+    return {f"{CAMPO}.{campo}": chave}
+
+
+def contendo(campo: str, valor: str) -> Dict[str, Any]:
+    """Condição de busca livre: a chave contém o texto (sem índice, para catálogos pequenos)"""
+    return {f"{CAMPO}.{campo}": {"$regex": re.escape(normalizar(valor))}}
+
+
+def aplicar(
+    query: Dict[str, Any],
+    valores: Dict[str, Optional[str]],
+    modo: str = EXATA
+) -> Dict[str, Any]:
+    """Acrescentar à consulta as condições dos campos informados"""
+    for campo, valor in valores.items():
+        if valor:
+            query.update(filtro(campo, valor, modo))
+    return query
@@ -0,0 +1,153 @@
+"""
+Catálogo de produtos em memória.
+
+A coleção ``produtos`` é um catálogo pequeno (algumas dezenas de cortes) lido
+em quase toda tela. O catálogo inteiro fica na memória do processo, carregado
+na inicialização, com índices montados a cada alteração:
+
+- ``ordenados``: por nome (e ``_id``), para as listagens;
+- ``por_tipo``: agrupados pela chave normalizada do tipo;
+- ``por_preco``: ordenados por preço, com ``bisect`` nas faixas.
+
+Os filtros seguem as regras das demais listagens: tipo e unidade de origem
+comparados pelas chaves normalizadas de ``busca``, por igualdade ou prefixo.
+As escritas do ``CRUDProduto`` atualizam o catálogo logo após gravar no
+banco e antes de incrementar o contador de ``produtos`` (``versoes_colecoes``):
+um ETag novo nunca acompanha um catálogo antigo. O catálogo guarda o valor do
+contador que reflete e é recarregado quando o contador gravado é outro, ou
+seja, quando outro processo alterou a coleção. Gravações por fora dos CRUDs
+(scripts) não incrementam o contador; para elas o catálogo também é
+recarregado depois de ``CATALOGO_PRODUTOS_VALIDADE`` segundos.
+"""
+
+import time
+from bisect import bisect_left, bisect_right
+from typing import Any, Dict, List, Optional
+
+from ..core.config import settings
+from ..models.produto import Produto
+from . import busca, versoes_colecoes
+
+
+class CatalogoProdutos:
+    def __init__(self):
+        self._produtos: Dict[str, Produto] = {}
+        self._chaves: Dict[str, Dict[str, str]] = {}
+        self.ordenados: List[Produto] = []
+        self.por_tipo: Dict[str, List[Produto]] = {}
+        self.por_preco: List[Produto] = []
+        self._precos: List[float] = []
+        self.carregado_em: Optional[float] = None
+        # Valor do contador de alterações da coleção refletido no catálogo
+        self.versao: Optional[int] = None
+        # Incrementada a cada escrita: descarta cargas que cruzaram uma escrita
+        self._geracao = 0
+
+    def expirado(self) -> bool:
+        return self.carregado_em is None or time.monotonic() - self.carregado_em > settings.CATALOGO_PRODUTOS_VALIDADE
+
+    def desatualizado(self, versao: int) -> bool:
+        """O contador gravado (``versao``) indica alterações que o catálogo não tem"""
+        return self.versao != versao or self.expirado()
+
+    async def carregar(self, collection) -> None:
+        """Ler a coleção inteira e montar os índices"""
+        while True:
+            geracao = self._geracao
+            # O contador é lido antes dos documentos: uma escrita no meio só causa outra carga
+            versao = (await versoes_colecoes.consultar(collection.database, [collection.name]))[collection.name]
+            documentos = await collection.find({}).to_list(length=None)
+            if geracao == self._geracao:
+                break
+            # Uma escrita terminou durante a leitura, que pode não a conter: ler de novo
+        self._produtos = {}
+        self._chaves = {}
+        for documento in documentos:
+            self._guardar(documento)
+        self._indexar()
+        self.carregado_em = time.monotonic()
+        self.versao = versao
+
+    def acompanhar(self, versao: int) -> None:
+        """Contador após uma escrita deste processo, já aplicada com ``gravar``/``remover``.
+
+        Só avança quando não houve outra escrita entre a carga e esta; senão o
+        catálogo continua desatualizado e é recarregado na próxima leitura.
+        """
+        if self.versao is not None and self.versao == versao - 1:
+            self.versao = versao
+
+    def gravar(self, documento: Dict[str, Any]) -> None:
+        """Incluir ou substituir o produto (documento como gravado no banco)"""
+        self._geracao += 1
+        self._guardar(documento)
+        self._indexar()
+
+    def remover(self, produto_id: str) -> None:
+        self._geracao += 1
+        self._produtos.pop(produto_id, None)
+        self._chaves.pop(produto_id, None)
+        self._indexar()
+
+    def _guardar(self, documento: Dict[str, Any]) -> None:
+        produto = Produto(**documento)
+        self._produtos[produto.id] = produto
+        self._chaves[produto.id] = busca.chaves(documento, busca.CAMPOS["produtos"])
+
+    def _indexar(self) -> None:
+        self.ordenados = sorted(self._produtos.values(), key=lambda produto: (produto.nome, produto.id))
+        por_tipo: Dict[str, List[Produto]] = {}
+        for produto in self.ordenados:
+            por_tipo.setdefault(self._chaves[produto.id].get("tipo"), []).append(produto)
+        self.por_tipo = por_tipo
+        self.por_preco = sorted(self.ordenados, key=lambda produto: produto.preco_kg)
+        self._precos = [produto.preco_kg for produto in self.por_preco]
+
+    def get(self, produto_id: str) -> Optional[Produto]:
+        return self._produtos.get(produto_id)
+
+    def filtrar(
+        self,
+        tipo: Optional[str] = None,
+        unidade_origem: Optional[str] = None,
+        modo_busca: str = busca.EXATA,
+        search: Optional[str] = None
+    ) -> List[Produto]:
+        """Produtos por nome, filtrados pelas chaves normalizadas de ``busca``.
+
+        ``search`` procura o texto dentro do nome ou do tipo.
+        """
+        busca.validar_modo(modo_busca)
+        if tipo and modo_busca == busca.EXATA:
+            produtos = self.por_tipo.get(busca.normalizar(tipo), [])
+            tipo = None
+        else:
+            produtos = self.ordenados
+
+        condicoes = []
+        for campo, valor in (("tipo", tipo), ("unidade_origem", unidade_origem)):
+            if valor:
+                chave = busca.normalizar(valor)
+                if modo_busca == busca.PREFIXO:
+                    condicoes.append(lambda chaves, campo=campo, chave=chave: chaves.get(campo, "").startswith(chave))
+                else:
+                    condicoes.append(lambda chaves, campo=campo, chave=chave: chaves.get(campo) == chave)
+        if search:
+            texto = busca.normalizar(search)
+            condicoes.append(lambda chaves: texto in chaves.get("nome", "") or texto in chaves.get("tipo", ""))
+
+        if not condicoes:
+            return list(produtos)
+        return [produto for produto in produtos if all(condicao(self._chaves[produto.id]) for condicao in condicoes)]
+
+    def contendo(self, campo: str, texto: str) -> List[Produto]:
+        """Produtos por nome cuja chave normalizada de ``campo`` contém ``texto``"""
+        chave = busca.normalizar(texto)
+        return [produto for produto in self.ordenados if chave in self._chaves[produto.id].get(campo, "")]
+
+    def faixa_preco(self, minimo: float, maximo: float) -> List[Produto]:
+        """Produtos com preço em ``[minimo, maximo]``, do mais barato ao mais caro"""
+        return self.por_preco[bisect_left(self._precos, minimo):bisect_right(self._precos, maximo)]
+
+
+catalogo = CatalogoProdutos()
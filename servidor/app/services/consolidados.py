@@ -0,0 +1,344 @@
+"""
+Consolidação dos abates por dia, semana, mês e ano.
+
+Cada documento consolidado guarda, para uma combinação período × unidade ×
+tipo_ave, as somas das quantidades de um conjunto de abates: aves, peso vivo,
+peso processado, receita, custos, cada despesa e peso/valor de cada produto.
+As coleções são mantidas com deltas ``$inc`` a cada escrita em
+``abates_completos`` e podem ser reconstruídas a partir dos abates.
+
+``abates_quantis_mes`` guarda, com as mesmas chaves (mês × unidade ×
+tipo_ave), esboços de quantis de algumas métricas (ver ``quantis``), mantidos
+com os mesmos deltas.
+
+Os documentos de todas as coleções guardam também as chaves normalizadas de
+unidade e tipo_ave (``busca``), para usar os mesmos filtros dos abates.
+
+As somas de valores de entrada não dependem das fórmulas das métricas. As
+somas de métricas (``metricas.*`` e ``ponderadas.*``) usam as métricas
+gravadas no abate, recalculadas a partir das entradas só quando são de uma
+versão anterior; a versão das métricas usada na última
+reconstrução fica em ``abates_consolidados_meta`` e, enquanto não coincidir
+com ``MetricsCalculator.VERSAO``, os consolidados não devem ser usados para
+indicadores derivados de métricas.
+"""
+
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from . import busca, quantis
+from .metricas_definicoes import DESPESAS_CUSTOS_FIXOS, METRICAS
+from .metrics_calculator import MetricsCalculator
+
+COLECAO_DIARIA = "abates_consolidados_dia"
+COLECAO_SEMANAL = "abates_consolidados_semana"
+COLECAO_MENSAL = "abates_consolidados_mes"
+COLECAO_ANUAL = "abates_consolidados_ano"
+COLECAO_QUANTIS = "abates_quantis_mes"
+COLECAO_META = "abates_consolidados_meta"
+ID_META = "metricas"
+
+# Métricas somadas (para totais e médias aritméticas por abate)
+METRICAS_SOMADAS = (
+    "peso_total_perdas",
+    "receita_bruta",
+    "custos_totais",
+    "lucro_liquido",
+    "valor_perdas",
+    "percentual_perda_total",
+    "eficiencia_aproveitamento",
+    "score_performance",
+    "diversificacao_produtos",
+    "aves_hora",
+    "kg_hora",
+    "eficiencia_operacional",
+)
+
+# Métricas somadas com peso (médias ponderadas) e o campo usado como peso
+METRICAS_PONDERADAS = {
+    "media_valor_kg": "peso_total_kg",
+    "custo_ave": "quantidade_aves",
+    "custo_abate_kg": "peso_total_kg",
+    "custo_frango": "quantidade_aves",
+    "lucro_frango": "quantidade_aves",
+    "lucro_total": "quantidade_aves",
+    "peso_medio_geral": "peso_total_kg",
+}
+
+# Tolerância relativa usada pelo verificador (os $inc acumulam erro de ponto flutuante)
+TOLERANCIA = 1e-6
+
+
+def inicio_dia(data: datetime) -> datetime:
+    return datetime(data.year, data.month, data.day)
+
+
+def inicio_semana(data: datetime) -> datetime:
+    """Segunda-feira da semana (mesma convenção do $dateTrunc com startOfWeek monday)"""
+    return inicio_dia(data) - timedelta(days=data.weekday())
+
+
+def inicio_mes(data: datetime) -> datetime:
+    return datetime(data.year, data.month, 1)
+
+
+def inicio_ano(data: datetime) -> datetime:
+    return datetime(data.year, 1, 1)
+
+
+GRANULARIDADES = {
+    COLECAO_DIARIA: inicio_dia,
+    COLECAO_SEMANAL: inicio_semana,
+    COLECAO_MENSAL: inicio_mes,
+    COLECAO_ANUAL: inicio_ano,
+    COLECAO_QUANTIS: inicio_mes,
+}
+
+
+def chave_produto(nome: str) -> str:
+    """Nome do produto usável como chave de subdocumento"""
+    return str(nome).replace(".", "_").lstrip("$") or "_"
+
+
+def chave(abate: Dict[str, Any], colecao: str) -> Dict[str, Any]:
+    """Filtro do documento consolidado que recebe o abate"""
+    return {
+        "periodo": GRANULARIDADES[colecao](abate["data_abate"]),
+        "unidade": abate.get("unidade"),
+        "tipo_ave": abate.get("tipo_ave"),
+    }
+
+
+def metricas_do_abate(abate: Dict[str, Any]) -> Dict[str, Any]:
+    """Métricas gravadas no abate; recalculadas se forem de versão anterior ou estiverem incompletas"""
+    if MetricsCalculator.metricas_desatualizadas(abate) or any(nome not in abate for nome in METRICAS):
+        return MetricsCalculator.calcular_metricas_completas(abate)
+    return {nome: abate[nome] for nome in METRICAS}
+
+
+def contribuicao(abate: Dict[str, Any], metricas: Optional[Dict[str, Any]] = None) -> Dict[str, float]:
+    """Valores que o abate soma ao consolidado, por caminho do campo.
+
+    ``metricas`` evita recalcular as métricas quando já foram calculadas em lote.
+    """
+    if metricas is None:
+        metricas = metricas_do_abate(abate)
+    produtos = abate.get("produtos") or []
+    despesas = abate.get("despesas_fixas") or {}
+    horarios = abate.get("horarios") or {}
+
+    peso_vivo = abate.get("peso_total_kg", 0)
+    receita = sum([produto.get("valor_total", 0) for produto in produtos])
+    custo_frango_vivo = peso_vivo * abate.get("valor_kg_vivo", 0)
+    custos_fixos = sum([despesas.get(campo, 0) for campo in DESPESAS_CUSTOS_FIXOS])
+    custos_totais = custos_fixos + custo_frango_vivo
+
+    valores = {
+        "abates": 1,
+        "quantidade_aves": abate.get("quantidade_aves", 0),
+        "peso_vivo_kg": peso_vivo,
+        "peso_processado_kg": sum([produto.get("peso_kg", 0) for produto in produtos]),
+        "peso_inteiro_abatido": abate.get("peso_inteiro_abatido") or 0,
+        "valor_aves": abate.get("valor_total", 0),
+        "horas_trabalhadas": horarios.get("horas_trabalhadas", 0),
+        "horas_reais": horarios.get("horas_reais", 0),
+        "receita_bruta": receita,
+        "custo_frango_vivo": custo_frango_vivo,
+        "custos_fixos": custos_fixos,
+        "custos_totais": custos_totais,
+        "lucro_liquido": receita - custos_totais,
+    }
+    for metrica in METRICAS_SOMADAS:
+        valores[f"metricas.{metrica}"] = metricas.get(metrica, 0)
+    for metrica, peso in METRICAS_PONDERADAS.items():
+        valores[f"ponderadas.{metrica}"] = metricas.get(metrica, 0) * (abate.get(peso) or 0)
+    for campo, valor in despesas.items():
+        if isinstance(valor, (int, float)):
+            valores[f"despesas.{campo}"] = valor
+    for produto in produtos:
+        prefixo = f"produtos.{chave_produto(produto.get('nome', ''))}"
+        valores[f"{prefixo}.quantidade"] = valores.get(f"{prefixo}.quantidade", 0) + 1
+        valores[f"{prefixo}.peso_kg"] = valores.get(f"{prefixo}.peso_kg", 0) + produto.get("peso_kg", 0)
+        valores[f"{prefixo}.valor_total"] = valores.get(f"{prefixo}.valor_total", 0) + produto.get("valor_total", 0)
+    return valores
+
+
+def chaves_busca(abate: Dict[str, Any]) -> Dict[str, str]:
+    """Chaves normalizadas de unidade e tipo_ave, por caminho do campo"""
+    return {
+        f"{busca.CAMPO}.{campo}": valor
+        for campo, valor in busca.chaves(abate, ("unidade", "tipo_ave")).items()
+    }
+
+
+def atributos(abate: Dict[str, Any]) -> Dict[str, Any]:
+    """Campos não numéricos gravados com ``$set`` (tipo de cada produto e chaves de busca)"""
+    return {
+        **{
+            f"produtos.{chave_produto(produto.get('nome', ''))}.tipo": produto.get("tipo")
+            for produto in abate.get("produtos") or []
+        },
+        **chaves_busca(abate),
+    }
+
+
+def contribuicoes(abate: Dict[str, Any], metricas: Optional[Dict[str, Any]] = None) -> Dict[str, Tuple[Dict[str, float], Dict[str, Any]]]:
+    """Valores somados e atributos do abate em cada coleção (métricas obtidas uma vez)"""
+    if metricas is None:
+        metricas = metricas_do_abate(abate)
+    somas = (contribuicao(abate, metricas), atributos(abate))
+    esbocos = ({"abates": 1, **quantis.contribuicao(metricas)}, chaves_busca(abate))
+    return {
+        colecao: esbocos if colecao == COLECAO_QUANTIS else somas
+        for colecao in GRANULARIDADES
+    }
+
+
+def deltas(
+    antigo: Optional[Dict[str, Any]],
+    novo: Optional[Dict[str, Any]]
+) -> Dict[str, List[Tuple[Dict[str, Any], Dict[str, float], Dict[str, Any]]]]:
+    """Trios (filtro, incrementos, atributos) por coleção para trocar ``antigo`` por ``novo``.
+
+    ``antigo`` é None na criação e ``novo`` é None na exclusão.
+    """
+    contribuicoes_antigas = contribuicoes(antigo) if antigo is not None else None
+    contribuicoes_novas = contribuicoes(novo) if novo is not None else None
+    resultado = {}
+    for colecao in GRANULARIDADES:
+        itens = []
+        if antigo is not None and novo is not None and chave(antigo, colecao) == chave(novo, colecao):
+            valores_antigos = contribuicoes_antigas[colecao][0]
+            valores_novos, textos = contribuicoes_novas[colecao]
+            incrementos = {
+                campo: valores_novos.get(campo, 0) - valores_antigos.get(campo, 0)
+                for campo in {**valores_antigos, **valores_novos}
+            }
+            incrementos = {campo: valor for campo, valor in incrementos.items() if valor != 0}
+            if incrementos:
+                itens.append((chave(novo, colecao), incrementos, textos))
+        else:
+            if antigo is not None:
+                incrementos = {campo: -valor for campo, valor in contribuicoes_antigas[colecao][0].items()}
+                itens.append((chave(antigo, colecao), incrementos, {}))
+            if novo is not None:
+                itens.append((chave(novo, colecao), *contribuicoes_novas[colecao]))
+        resultado[colecao] = itens
+    return resultado
+
+
+def _expandir(valores: Dict[str, float]) -> Dict[str, Any]:
+    """Transformar caminhos 'a.b.c' em subdocumentos"""
+    documento = {}
+    for caminho, valor in valores.items():
+        alvo = documento
+        *pais, campo = caminho.split(".")
+        for pai in pais:
+            alvo = alvo.setdefault(pai, {})
+        alvo[campo] = valor
+    return documento
+
+
+def _achatar(documento: Dict[str, Any], prefixo: str = "") -> Dict[str, float]:
+    valores = {}
+    for campo, valor in documento.items():
+        caminho = f"{prefixo}{campo}"
+        if isinstance(valor, dict):
+            valores.update(_achatar(valor, f"{caminho}."))
+        elif isinstance(valor, (int, float)) and not isinstance(valor, bool):
+            valores[caminho] = valor
+    return valores
+
+
+def somar(documentos: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """Somar documentos consolidados (ou contribuições já expandidas) campo a campo"""
+    somas = {}
+    textos = {}
+    for documento in documentos:
+        for campo, valor in _achatar(documento).items():
+            somas[campo] = somas.get(campo, 0) + valor
+        textos.update(_textos(documento))
+    return _expandir({**textos, **somas})
+
+
+def _textos(documento: Dict[str, Any], prefixo: str = "") -> Dict[str, Any]:
+    valores = {}
+    for campo, valor in documento.items():
+        if campo in ("_id", "periodo", "unidade", "tipo_ave", busca.CAMPO) and not prefixo:
+            continue
+        caminho = f"{prefixo}{campo}"
+        if isinstance(valor, dict):
+            valores.update(_textos(valor, f"{caminho}."))
+        elif isinstance(valor, str):
+            valores[caminho] = valor
+    return valores
+
+
+def consolidar(abates: Iterable[Dict[str, Any]], tamanho_lote: int = 1000) -> Dict[str, List[Dict[str, Any]]]:
+    """Documentos consolidados, por coleção, calculados a partir dos abates"""
+    acumulado = {colecao: {} for colecao in GRANULARIDADES}
+
+    def acumular(lote):
+        for abate, metricas in zip(lote, MetricsCalculator.calcular_metricas_lote(lote)):
+            por_colecao = contribuicoes(abate, metricas)
+            for colecao, grupos in acumulado.items():
+                valores, textos = por_colecao[colecao]
+                filtro = chave(abate, colecao)
+                identificador = tuple(filtro.values())
+                if identificador not in grupos:
+                    grupos[identificador] = (filtro, {})
+                somas = grupos[identificador][1]
+                for campo, valor in valores.items():
+                    somas[campo] = somas.get(campo, 0) + valor
+                somas.update(textos)
+
+    lote = []
+    for abate in abates:
+        lote.append(abate)
+        if len(lote) >= tamanho_lote:
+            acumular(lote)
+            lote = []
+    if lote:
+        acumular(lote)
+
+    return {
+        colecao: [{**filtro, **_expandir(somas)} for filtro, somas in grupos.values()]
+        for colecao, grupos in acumulado.items()
+    }
+
+
+def comparar(
+    esperados: List[Dict[str, Any]],
+    atuais: List[Dict[str, Any]],
+    tolerancia: float = TOLERANCIA
+) -> List[str]:
+    """Divergências entre os consolidados esperados e os gravados"""
+    def indexar(documentos):
+        indice = {}
+        for documento in documentos:
+            identificador = (documento["periodo"], documento.get("unidade"), documento.get("tipo_ave"))
+            valores = _achatar({
+                campo: valor for campo, valor in documento.items()
+                if campo not in ("_id", "periodo", "unidade", "tipo_ave")
+            })
+            # Consolidados zerados equivalem a consolidados inexistentes
+            if valores.get("abates", 0) != 0:
+                indice[identificador] = valores
+        return indice
+
+    indice_esperado = indexar(esperados)
+    indice_atual = indexar(atuais)
+    divergencias = []
+    for identificador in sorted(set(indice_esperado) | set(indice_atual), key=str):
+        esperado = indice_esperado.get(identificador, {})
+        atual = indice_atual.get(identificador, {})
+        for campo in sorted(set(esperado) | set(atual)):
+            valor_esperado = esperado.get(campo, 0)
+            valor_atual = atual.get(campo, 0)
+            limite = tolerancia * max(1.0, abs(valor_esperado))
+            if abs(valor_esperado - valor_atual) > limite:
+                divergencias.append(
+                    f"{identificador[0]:%Y-%m-%d} {identificador[1]} / {identificador[2]}: "
+                    f"{campo} esperado={valor_esperado} gravado={valor_atual}"
+                )
+    return divergencias
@@ -0,0 +1,191 @@
+"""
+Cubo de abates: unidade × tipo_ave × período (dia, semana, mês ou ano).
+
+As células do cubo são os documentos consolidados (ver ``consolidados``), um
+por combinação período × unidade × tipo_ave em cada granularidade. Uma
+consulta escolhe a granularidade do período, as dimensões mantidas no
+resultado (drill-down acrescenta dimensões ou desce a granularidade; roll-up
+as remove ou sobe a granularidade) e os valores de cada dimensão (fatia). As
+dimensões removidas são somadas, sem ler ``abates_completos``.
+
+Só entram medidas que são somas de valores de entrada ou razões entre essas
+somas, pois elas continuam corretas em qualquer nível de agregação e não
+dependem da versão das métricas.
+"""
+
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence
+
+from . import consolidados
+from .metricas_definicoes import DESPESAS_CUSTOS_FIXOS
+
+# Granularidade do período -> (coleção de células, início do período)
+NIVEIS = {
+    "dia": (consolidados.COLECAO_DIARIA, consolidados.inicio_dia),
+    "semana": (consolidados.COLECAO_SEMANAL, consolidados.inicio_semana),
+    "mes": (consolidados.COLECAO_MENSAL, consolidados.inicio_mes),
+    "ano": (consolidados.COLECAO_ANUAL, consolidados.inicio_ano),
+}
+
+DIMENSOES = ("unidade", "tipo_ave", "periodo")
+
+# Somas guardadas em cada célula
+MEDIDAS_SOMADAS = (
+    "abates",
+    "quantidade_aves",
+    "peso_vivo_kg",
+    "peso_processado_kg",
+    "peso_inteiro_abatido",
+    "valor_aves",
+    "horas_trabalhadas",
+    "horas_reais",
+    "receita_bruta",
+    "custo_frango_vivo",
+    "custos_fixos",
+    "custos_totais",
+    "lucro_liquido",
+) + tuple(f"despesas.{campo}" for campo in DESPESAS_CUSTOS_FIXOS)
+
+# Razões entre somas: medida -> (numerador, denominador, fator)
+MEDIDAS_DERIVADAS = {
+    "rendimento_final": ("peso_inteiro_abatido", "peso_vivo_kg", 100),
+    "peso_medio_ave": ("peso_vivo_kg", "quantidade_aves", 1),
+    "aves_hora": ("quantidade_aves", "horas_trabalhadas", 1),
+    "preco_medio_kg": ("receita_bruta", "peso_processado_kg", 1),
+    "custo_kg": ("custos_totais", "peso_vivo_kg", 1),
+    "lucro_kg": ("lucro_liquido", "peso_vivo_kg", 1),
+    "lucro_por_ave": ("lucro_liquido", "quantidade_aves", 1),
+}
+
+
+def _valor(campo: str) -> Dict[str, Any]:
+    return {"$ifNull": [f"${campo}", 0]}
+
+
+_CUSTO_FRANGO_VIVO = {"$multiply": [_valor("peso_total_kg"), _valor("valor_kg_vivo")]}
+_CUSTOS_FIXOS = {"$add": [_valor(f"despesas_fixas.{campo}") for campo in DESPESAS_CUSTOS_FIXOS]}
+_RECEITA = {"$sum": "$produtos.valor_total"}
+
+# Expressão de cada soma sobre um documento de abates_completos
+# (mesmos valores de ``consolidados.contribuicao``)
+EXPRESSOES_ABATE = {
+    "abates": 1,
+    "quantidade_aves": _valor("quantidade_aves"),
+    "peso_vivo_kg": _valor("peso_total_kg"),
+    "peso_processado_kg": {"$sum": "$produtos.peso_kg"},
+    "peso_inteiro_abatido": _valor("peso_inteiro_abatido"),
+    "valor_aves": _valor("valor_total"),
+    "horas_trabalhadas": _valor("horarios.horas_trabalhadas"),
+    "horas_reais": _valor("horarios.horas_reais"),
+    "receita_bruta": _RECEITA,
+    "custo_frango_vivo": _CUSTO_FRANGO_VIVO,
+    "custos_fixos": _CUSTOS_FIXOS,
+    "custos_totais": {"$add": [_CUSTOS_FIXOS, _CUSTO_FRANGO_VIVO]},
+    "lucro_liquido": {"$subtract": [_RECEITA, {"$add": [_CUSTOS_FIXOS, _CUSTO_FRANGO_VIVO]}]},
+    **{f"despesas.{campo}": _valor(f"despesas_fixas.{campo}") for campo in DESPESAS_CUSTOS_FIXOS},
+}
+
+MEDIDAS_PADRAO = (
+    "abates",
+    "quantidade_aves",
+    "peso_vivo_kg",
+    "receita_bruta",
+    "custos_totais",
+    "lucro_liquido",
+    "rendimento_final",
+)
+
+
+def validar(dimensoes: Sequence[str], medidas: Sequence[str]) -> None:
+    """Levantar ValueError para dimensões ou medidas desconhecidas"""
+    desconhecidas = [dimensao for dimensao in dimensoes if dimensao not in DIMENSOES]
+    if desconhecidas:
+        raise ValueError(f"Dimensões inválidas: {', '.join(desconhecidas)}. Use {', '.join(DIMENSOES)}")
+    desconhecidas = [
+        medida for medida in medidas
+        if medida not in MEDIDAS_SOMADAS and medida not in MEDIDAS_DERIVADAS
+    ]
+    if desconhecidas:
+        raise ValueError(f"Medidas inválidas: {', '.join(desconhecidas)}")
+
+
+def _somas_necessarias(medidas: Sequence[str]) -> List[str]:
+    somas = []
+    for medida in medidas:
+        campos = MEDIDAS_DERIVADAS[medida][:2] if medida in MEDIDAS_DERIVADAS else (medida,)
+        for campo in campos:
+            if campo not in somas:
+                somas.append(campo)
+    return somas
+
+
+def _apelido(campo: str) -> str:
+    """Nome do acumulador no $group (sem pontos)"""
+    return campo.replace(".", "_")
+
+
+def filtro(
+    granularidade: str,
+    unidades: Optional[Sequence[str]] = None,
+    tipos_ave: Optional[Sequence[str]] = None,
+    data_inicio: Optional[datetime] = None,
+    data_fim: Optional[datetime] = None
+) -> Dict[str, Any]:
+    """Fatia do cubo: valores exatos das dimensões e períodos que tocam o intervalo"""
+    _, inicio_periodo = NIVEIS[granularidade]
+    consulta = {}
+    if unidades:
+        consulta["unidade"] = {"$in": list(unidades)}
+    if tipos_ave:
+        consulta["tipo_ave"] = {"$in": list(tipos_ave)}
+    if data_inicio or data_fim:
+        limites = {}
+        if data_inicio:
+            limites["$gte"] = inicio_periodo(data_inicio)
+        if data_fim:
+            limites["$lte"] = data_fim
+        consulta["periodo"] = limites
+    return consulta
+
+
+def acumuladores(medidas: Sequence[str], sobre_abates: bool = False) -> Dict[str, Any]:
+    """Acumuladores $sum das somas usadas pelas medidas, sobre células ou sobre abates"""
+    return {
+        _apelido(campo): {"$sum": EXPRESSOES_ABATE[campo] if sobre_abates else _valor(campo)}
+        for campo in _somas_necessarias(medidas)
+    }
+
+
+def pipeline(dimensoes: Sequence[str], medidas: Sequence[str], consulta: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Agregação sobre as células: somar as medidas agrupando pelas dimensões mantidas"""
+    grupo = {"_id": {dimensao: f"${dimensao}" for dimensao in dimensoes} or None}
+    grupo.update(acumuladores(medidas))
+    return [
+        {"$match": consulta},
+        {"$group": grupo},
+        {"$sort": {f"_id.{dimensao}": 1 for dimensao in dimensoes} or {"_id": 1}},
+    ]
+
+
+def celula(grupo: Dict[str, Any], dimensoes: Sequence[str], medidas: Sequence[str]) -> Dict[str, Any]:
+    """Formatar um resultado do $group com as dimensões e as medidas pedidas"""
+    resultado = {dimensao: (grupo.get("_id") or {}).get(dimensao) for dimensao in dimensoes}
+    for medida in medidas:
+        if medida in MEDIDAS_DERIVADAS:
+            numerador, denominador, fator = MEDIDAS_DERIVADAS[medida]
+            divisor = grupo.get(_apelido(denominador), 0)
+            valor = grupo.get(_apelido(numerador), 0) / divisor * fator if divisor else 0
+            resultado[medida] = round(valor, 4)
+        else:
+            resultado[medida] = grupo.get(_apelido(medida), 0)
+    return resultado
+
+
+def total(grupos: List[Dict[str, Any]], medidas: Sequence[str]) -> Dict[str, Any]:
+    """Roll-up de todas as células retornadas (ápice da fatia)"""
+    somas = {}
+    for grupo in grupos:
+        for campo in _somas_necessarias(medidas):
+            apelido = _apelido(campo)
+            somas[apelido] = somas.get(apelido, 0) + grupo.get(apelido, 0)
+    return celula(somas, (), medidas)
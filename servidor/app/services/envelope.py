@@ -0,0 +1,73 @@
+"""
+Páginas com itens e total em duas consultas simultâneas.
+
+As telas de listagem pediam a página e depois ``/count`` com os mesmos
+filtros, em duas requisições. Aqui a página (``find`` com filtro, ordenação,
+skip, limite e projeção) e a contagem do filtro (``count_documents``) são
+enviadas juntas e esperadas em paralelo; as duas usam os índices do filtro e
+da ordenação, o que um ``$facet`` impediria (os estágios dentro dele não usam
+índice). Sem filtros o total vem de ``estimated_document_count``, que lê os
+metadados da coleção em vez de contar documentos (pode divergir do exato logo
+após uma queda do servidor, o que basta para a paginação).
+
+Página e total não vêm do mesmo instante: uma escrita entre as duas consultas
+pode deixar o total uma unidade fora, como já acontecia com o ``/count``.
+"""
+
+import asyncio
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from motor.motor_asyncio import AsyncIOMotorCollection
+
+
+def _juntar(filtro: Dict[str, Any], pagina: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    if not pagina:
+        return filtro
+    if not filtro:
+        return pagina
+    return {"$and": [filtro, pagina]}
+
+
+async def buscar(
+    collection: AsyncIOMotorCollection,
+    filtro: Dict[str, Any],
+    ordem: Sequence[Tuple[str, int]],
+    skip: int,
+    limit: int,
+    projecao: Optional[Dict[str, Any]] = None,
+    pagina: Optional[Dict[str, Any]] = None
+) -> Tuple[List[Dict[str, Any]], int]:
+    """Documentos da página e total de documentos do filtro.
+
+    ``pagina`` restringe só os itens (condição do cursor), não o total.
+    """
+    consulta = collection.find(_juntar(filtro, pagina), projecao).sort(list(ordem)).skip(skip).limit(limit)
+    contagem = collection.count_documents(filtro) if filtro else collection.estimated_document_count()
+    itens, total = await asyncio.gather(consulta.to_list(length=limit), contagem)
+    return itens, total
+
+
+def montar(
+    itens: List[Any],
+    total: int,
+    skip: int,
+    limit: int,
+    proximo_cursor: Optional[str] = None,
+    por_cursor: bool = False
+) -> Dict[str, Any]:
+    """Envelope da resposta: ``items``, ``total`` e ``paging``.
+
+    Em páginas por cursor há mais itens enquanto houver ``proximo_cursor``;
+    com ``skip``, enquanto a página não alcança o total.
+    """
+    tem_mais = proximo_cursor is not None if por_cursor else skip + len(itens) < total
+    return {
+        "items": itens,
+        "total": total,
+        "paging": {
+            "skip": skip,
+            "limit": limit,
+            "proximo_cursor": proximo_cursor,
+            "tem_mais": tem_mais,
+        },
+    }
@@ -0,0 +1,111 @@
+"""
+Leitura confiável das listagens de abates: documentos BSON direto para JSON.
+
+O caminho de leitura padrão monta um ``AbateCompleto`` (com a validação de
+produtos, despesas e horários) para cada documento, copia o modelo num
+dicionário da resposta e o FastAPI ainda o valida e converte com
+``jsonable_encoder`` antes do ``json.dumps``. Os abates são gravados pelo
+próprio ``AbateCompletoCRUD`` a partir de modelos já validados, então na
+leitura basta escolher os campos e serializar os documentos de uma vez com
+o orjson, que converte ``datetime`` nativamente; ``ObjectId`` vira texto.
+
+Consultas longas (GET /periodo com ``Accept: application/x-ndjson``) saem
+como NDJSON: um documento JSON por linha, escrito à medida que o cursor do
+MongoDB avança.
+
+A resposta tem as mesmas chaves e valores do caminho validado. Documentos
+inseridos por fora do CRUD (scripts, restaurações) devem passar por
+``recalcular_metricas.py`` antes de serem servidos por este caminho.
+"""
+
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Sequence, Union
+
+import orjson
+from bson import ObjectId
+from fastapi import Response
+from fastapi.responses import StreamingResponse
+
+from ..models.abate_completo import AbateCompleto
+
+NDJSON = "application/x-ndjson"
+
+# Documentos por lote do cursor no streaming: ~4 KB de BSON cada, alguns MB por
+# ida ao banco, longe do limite de 16 MB por lote
+LOTE_STREAMING = 500
+
+# Campos da listagem completa, na ordem da resposta
+CAMPOS_LISTAGEM = (
+    "data_abate", "quantidade_aves", "valor_kg_vivo", "peso_total_kg", "peso_medio_ave",
+    "valor_total", "unidade", "tipo_ave", "observacoes", "horarios", "produtos",
+    "despesas_fixas", "peso_inteiro_abatido", "preco_venda_kg",
+    # Métricas Cortes vs Inteiro
+    "cortes_peso_total", "cortes_valor_total", "cortes_percentual_peso", "cortes_percentual_valor",
+    "inteiro_peso_total", "inteiro_valor_total", "inteiro_percentual_peso", "inteiro_percentual_valor",
+    # Indicadores de Performance
+    "receita_bruta", "custos_totais", "lucro_liquido", "rendimento_final", "media_valor_kg",
+    "custo_kg", "custo_ave", "custo_abate_kg", "custo_frango", "lucro_kg", "lucro_frango", "lucro_total",
+    # Indicadores de Eficiência Operacional
+    "aves_hora", "kg_hora", "tempo_medio_ave", "eficiencia_operacional",
+    # Análise de Perdas
+    "peso_total_perdas", "percentual_perda_total", "valor_perdas", "eficiencia_aproveitamento",
+    # Indicadores de Qualidade e Performance Score
+    "diversificacao_produtos", "peso_medio_geral", "score_performance", "classificacao_performance",
+    # Percentuais
+    "percentual_receita_bruta", "percentual_custos_totais", "percentual_lucro_liquido",
+    "percentual_rendimento", "percentual_media_valor_kg", "percentual_custo_kg",
+    "percentual_custo_ave", "percentual_custo_abate_kg", "percentual_custo_frango",
+    "percentual_lucro_kg", "percentual_lucro_frango", "percentual_lucro_total",
+    "created_at", "updated_at",
+)
+
+# Campos da busca por período (sem os indicadores)
+CAMPOS_PERIODO = CAMPOS_LISTAGEM[:CAMPOS_LISTAGEM.index("receita_bruta")] + ("created_at", "updated_at")
+
+# Valores dos campos ausentes no documento, como o modelo os preencheria
+_PADROES = {
+    campo: info.get_default(call_default_factory=True)
+    for campo, info in AbateCompleto.model_fields.items()
+    if not info.is_required() and campo != "created_at"
+}
+_PADROES["despesas_fixas"] = _PADROES["despesas_fixas"].model_dump()
+
+
+def _padrao_json(valor: Any) -> Any:
+    if isinstance(valor, ObjectId):
+        return str(valor)
+    raise TypeError(f"Tipo não serializável: {type(valor).__name__}")
+
+
+def documento(doc: Dict[str, Any], campos: Sequence[str] = CAMPOS_LISTAGEM) -> Dict[str, Any]:
+    """Item da resposta (``_id`` como ``id``), sem validar nem copiar subdocumentos"""
+    item = {"id": str(doc["_id"])}
+    for campo in campos:
+        item[campo] = doc.get(campo, _PADROES.get(campo))
+    return item
+
+
+def serializar(conteudo: Union[Dict[str, Any], Iterable[Dict[str, Any]]]) -> bytes:
+    """JSON da lista de itens ou do envelope (``datetime`` em ISO 8601, ``ObjectId`` como texto)"""
+    if not isinstance(conteudo, (dict, list)):
+        conteudo = list(conteudo)
+    return orjson.dumps(conteudo, default=_padrao_json)
+
+
+def resposta(conteudo: Union[Dict[str, Any], List[Dict[str, Any]]], headers: Dict[str, str] = None) -> Response:
+    """Resposta HTTP já serializada (ignora o ``response_model`` da rota)"""
+    return Response(content=serializar(conteudo), media_type="application/json", headers=headers)
+
+
+def aceita_ndjson(accept: Optional[str]) -> bool:
+    """Se o cabeçalho ``Accept`` pede NDJSON"""
+    return bool(accept) and NDJSON in accept
+
+
+async def _linhas(itens: AsyncIterator[Dict[str, Any]]) -> AsyncIterator[bytes]:
+    async for item in itens:
+        yield orjson.dumps(item, default=_padrao_json, option=orjson.OPT_APPEND_NEWLINE)
+
+
+def resposta_ndjson(itens: AsyncIterator[Dict[str, Any]]) -> StreamingResponse:
+    """Resposta em NDJSON, escrita item a item"""
+    return StreamingResponse(_linhas(itens), media_type=NDJSON)
@@ -0,0 +1,765 @@
+from typing import Dict, Any, Optional, Iterable, List, Set, FrozenSet, Tuple, Callable
+from functools import lru_cache
+
+import numpy as np
+
+
+class Expr:
+    """Expressão de uma métrica derivada.
+
+    As expressões são montadas com os operadores do Python (+, -, *, /, <, >, ...)
+    e sabem se traduzir para Python, NumPy e MongoDB e informar do que dependem.
+    """
+
+    def python(self) -> str:
+        """Código Python equivalente, sobre o documento ``d`` e os nós já calculados (``n_<nome>``)"""
+        raise NotImplementedError
+
+    def numpy(self) -> str:
+        """Código NumPy equivalente, sobre as colunas de entrada (``colunas``) e os nós já calculados"""
+        raise NotImplementedError
+
+    def preparos(self) -> Dict[str, str]:
+        """Variáveis auxiliares do código Python, calculadas uma vez por documento"""
+        return {}
+
+    def dependencias(self) -> Set[Tuple[str, str]]:
+        """Dependências diretas: ("campo", nome) ou ("no", nome)"""
+        return set()
+
+    def compilar(self, inline: bool = False) -> Any:
+        """Expressão de agregação do MongoDB equivalente.
+
+        Com ``inline`` as referências a outros nós são expandidas; sem ele elas
+        apontam para os campos temporários gravados por ``compilar_pipeline``.
+        """
+        raise NotImplementedError
+
+    def __add__(self, outro): return Operacao('+', self, _expr(outro))
+    def __radd__(self, outro): return Operacao('+', _expr(outro), self)
+    def __sub__(self, outro): return Operacao('-', self, _expr(outro))
+    def __rsub__(self, outro): return Operacao('-', _expr(outro), self)
+    def __mul__(self, outro): return Operacao('*', self, _expr(outro))
+    def __rmul__(self, outro): return Operacao('*', _expr(outro), self)
+    def __truediv__(self, outro): return Operacao('/', self, _expr(outro))
+    def __rtruediv__(self, outro): return Operacao('/', _expr(outro), self)
+    def __lt__(self, outro): return Comparacao('<', self, _expr(outro))
+    def __le__(self, outro): return Comparacao('<=', self, _expr(outro))
+    def __gt__(self, outro): return Comparacao('>', self, _expr(outro))
+    def __ge__(self, outro): return Comparacao('>=', self, _expr(outro))
+
+
+def _expr(valor) -> Expr:
+    return valor if isinstance(valor, Expr) else Const(valor)
+
+
+def _dividir(a, b):
+    return a / b if b > 0 else 0
+
+
+def _somar_campos(dados, campos):
+    return sum([dados.get(campo, 0) for campo in campos])
+
+
+def _separar_inteiros(itens):
+    """Itens inteiros e cortes, na ordem original"""
+    inteiros, cortes = [], []
+    for item in itens:
+        tipo = item.get('tipo', '').lower()
+        (inteiros if 'inteiro' in tipo or 'inteira' in tipo else cortes).append(item)
+    return inteiros, cortes
+
+
+def _dividir_vetor(a, b):
+    a, b = np.broadcast_arrays(np.asarray(a, dtype=np.float64), np.asarray(b, dtype=np.float64))
+    return np.divide(a, b, out=np.zeros(a.shape, dtype=np.float64), where=b > 0)
+
+
+# Funções auxiliares visíveis no código gerado
+_AUXILIARES = {'_dividir': _dividir, '_somar_campos': _somar_campos, '_separar_inteiros': _separar_inteiros}
+_AUXILIARES_VETOR = {'np': np, '_dividir_vetor': _dividir_vetor}
+
+
+class Const(Expr):
+    def __init__(self, valor: Any):
+        self.valor = valor
+
+    def python(self):
+        return repr(self.valor)
+
+    def numpy(self):
+        return repr(self.valor)
+
+    def compilar(self, inline=False):
+        return {"$literal": self.valor} if isinstance(self.valor, str) else self.valor
+
+
+class _Folha(Expr):
+    """Valor lido do documento: no modo em lote vira uma coluna de entrada"""
+
+    def coluna(self) -> str:
+        """Nome da coluna de entrada no modo em lote"""
+        raise NotImplementedError
+
+    def numpy(self):
+        return f"colunas[{self.coluna()!r}]"
+
+
+class Campo(_Folha):
+    """Campo de entrada do documento (aceita caminho com ponto); ausente vale 0"""
+
+    def __init__(self, caminho: str):
+        self.caminho = caminho
+        self.partes = caminho.split('.')
+
+    def preparos(self):
+        codigo = "d"
+        for parte in self.partes[:-1]:
+            codigo += f".get({parte!r}, {{}})"
+        return {self.python(): codigo + f".get({self.partes[-1]!r}, 0)"}
+
+    def python(self):
+        return "c_" + "__".join(self.partes)
+
+    def coluna(self):
+        return self.caminho
+
+    def dependencias(self):
+        return {("campo", self.partes[0])}
+
+    def compilar(self, inline=False):
+        return {"$ifNull": [f"${self.caminho}", 0]}
+
+
+class Ref(Expr):
+    """Referência a outro nó do grafo"""
+
+    def __init__(self, nome: str):
+        self.nome = nome
+
+    def python(self):
+        return f"n_{self.nome}"
+
+    def numpy(self):
+        return f"n_{self.nome}"
+
+    def dependencias(self):
+        return {("no", self.nome)}
+
+    def compilar(self, inline=False):
+        if inline:
+            return NOS[self.nome].compilar(inline=True)
+        return f"${CAMPO_TEMPORARIO}.{self.nome}"
+
+
+class _Composta(Expr):
+    def __init__(self, *filhos: Expr):
+        self.filhos = [_expr(f) for f in filhos]
+
+    def preparos(self):
+        variaveis = {}
+        for filho in self.filhos:
+            variaveis.update(filho.preparos())
+        return variaveis
+
+    def dependencias(self):
+        deps = set()
+        for filho in self.filhos:
+            deps |= filho.dependencias()
+        return deps
+
+
+_OPERADORES_MONGO: Dict[str, str] = {
+    '+': '$add',
+    '-': '$subtract',
+    '*': '$multiply',
+    '/': '$divide',
+    '<': '$lt',
+    '<=': '$lte',
+    '>': '$gt',
+    '>=': '$gte',
+}
+
+
+class Operacao(_Composta):
+    def __init__(self, operador: str, a: Expr, b: Expr):
+        super().__init__(a, b)
+        self.operador = operador
+
+    def python(self):
+        a, b = (f.python() for f in self.filhos)
+        return f"({a} {self.operador} {b})"
+
+    def numpy(self):
+        a, b = (f.numpy() for f in self.filhos)
+        return f"({a} {self.operador} {b})"
+
+    def compilar(self, inline=False):
+        return {_OPERADORES_MONGO[self.operador]: [f.compilar(inline) for f in self.filhos]}
+
+
+class Comparacao(Operacao):
+    pass
+
+
+class DivisaoSegura(_Composta):
+    """a / b quando b > 0, senão 0"""
+
+    def python(self):
+        a, b = (f.python() for f in self.filhos)
+        if b.isidentifier():
+            return f"({a} / {b} if {b} > 0 else 0)"
+        return f"_dividir({a}, {b})"
+
+    def numpy(self):
+        a, b = (f.numpy() for f in self.filhos)
+        return f"_dividir_vetor({a}, {b})"
+
+    def compilar(self, inline=False):
+        a, b = (f.compilar(inline) for f in self.filhos)
+        return {"$cond": [{"$gt": [b, 0]}, {"$divide": [a, b]}, 0]}
+
+
+class Minimo(_Composta):
+    def python(self):
+        a, b = (f.python() for f in self.filhos)
+        return f"min({a}, {b})"
+
+    def numpy(self):
+        a, b = (f.numpy() for f in self.filhos)
+        return f"np.minimum({a}, {b})"
+
+    def compilar(self, inline=False):
+        return {"$min": [f.compilar(inline) for f in self.filhos]}
+
+
+class Maximo(_Composta):
+    def python(self):
+        a, b = (f.python() for f in self.filhos)
+        return f"max({a}, {b})"
+
+    def numpy(self):
+        a, b = (f.numpy() for f in self.filhos)
+        return f"np.maximum({a}, {b})"
+
+    def compilar(self, inline=False):
+        return {"$max": [f.compilar(inline) for f in self.filhos]}
+
+
+class Se(_Composta):
+    """Condicional: avalia apenas o ramo escolhido"""
+
+    def python(self):
+        condicao, entao, senao = (f.python() for f in self.filhos)
+        return f"({entao} if {condicao} else {senao})"
+
+    def numpy(self):
+        condicao, entao, senao = (f.numpy() for f in self.filhos)
+        return f"np.where({condicao}, {entao}, {senao})"
+
+    def compilar(self, inline=False):
+        return {"$cond": [f.compilar(inline) for f in self.filhos]}
+
+
+class SomaCampos(_Folha):
+    """Soma de subcampos de um objeto (ex.: despesas_fixas), na ordem informada"""
+
+    def __init__(self, objeto: str, campos: Iterable[str]):
+        self.objeto = objeto
+        self.campos = tuple(campos)
+
+    def python(self):
+        return f"_somar_campos(d.get({self.objeto!r}, {{}}), {self.campos!r})"
+
+    def coluna(self):
+        return self.objeto
+
+    def dependencias(self):
+        return {("campo", self.objeto)}
+
+    def compilar(self, inline=False):
+        return {"$add": [{"$ifNull": [f"${self.objeto}.{campo}", 0]} for campo in self.campos]}
+
+
+class FiltroTipoInteiro:
+    """Separa produtos inteiros (tipo contém 'inteiro'/'inteira') dos cortes"""
+
+    def __init__(self, inteiro: bool):
+        self.inteiro = inteiro
+
+    def aceita(self, produto: Dict[str, Any]) -> bool:
+        tipo = produto.get('tipo', '').lower()
+        return ('inteiro' in tipo or 'inteira' in tipo) == self.inteiro
+
+    def compilar(self, variavel: str) -> Dict[str, Any]:
+        condicao = {
+            "$regexMatch": {
+                "input": {"$ifNull": [f"$${variavel}.tipo", ""]},
+                "regex": "inteir[oa]",
+                "options": "i"
+            }
+        }
+        return condicao if self.inteiro else {"$not": [condicao]}
+
+
+def _lista_python(lista: str) -> str:
+    return f"l_{lista}"
+
+
+class SomaLista(_Folha):
+    """Soma de um campo sobre os itens de uma lista (ex.: produtos.peso_kg)"""
+
+    def __init__(self, lista: str, campo: str, filtro: Optional[FiltroTipoInteiro] = None):
+        self.lista = lista
+        self.campo = campo
+        self.filtro = filtro
+
+    def preparos(self):
+        itens = _lista_python(self.lista)
+        if self.filtro is None:
+            return {itens: f"d.get({self.lista!r}, [])"}
+        # Os itens são separados uma vez e servem a todas as somas filtradas
+        return {
+            itens: f"d.get({self.lista!r}, [])",
+            f"{itens}_inteiros, {itens}_cortes": f"_separar_inteiros({itens})",
+        }
+
+    def python(self):
+        itens = _lista_python(self.lista)
+        if self.filtro is None:
+            return f"sum([item.get({self.campo!r}, 0) for item in {itens}])"
+        parte = "inteiros" if self.filtro.inteiro else "cortes"
+        return f"sum([item.get({self.campo!r}, 0) for item in {itens}_{parte}])"
+
+    def coluna(self):
+        if self.filtro is None:
+            return f"{self.lista}.{self.campo}"
+        return f"{self.lista}.{self.campo}[{'inteiro' if self.filtro.inteiro else 'cortes'}]"
+
+    def dependencias(self):
+        return {("campo", self.lista)}
+
+    def compilar(self, inline=False):
+        itens = {"$ifNull": [f"${self.lista}", []]}
+        if self.filtro is not None:
+            itens = {"$filter": {"input": itens, "as": "item", "cond": self.filtro.compilar("item")}}
+        return {"$sum": {"$map": {"input": itens, "as": "item", "in": {"$ifNull": [f"$$item.{self.campo}", 0]}}}}
+
+
+class Contagem(_Folha):
+    def __init__(self, lista: str):
+        self.lista = lista
+
+    def preparos(self):
+        return {_lista_python(self.lista): f"d.get({self.lista!r}, [])"}
+
+    def python(self):
+        return f"len({_lista_python(self.lista)})"
+
+    def coluna(self):
+        return f"len({self.lista})"
+
+    def numpy(self):
+        return f"{super().numpy()}.astype(np.int64)"
+
+    def dependencias(self):
+        return {("campo", self.lista)}
+
+    def compilar(self, inline=False):
+        return {"$size": {"$ifNull": [f"${self.lista}", []]}}
+
+
+# Campo temporário que guarda os nós intermediários durante o pipeline de agregação
+CAMPO_TEMPORARIO = "_metricas_calculo"
+
+
+def clamp(v: Expr, lo: float = 0.0, hi: float = 100.0) -> Expr:
+    return Maximo(lo, Minimo(hi, v))
+
+
+# Despesas que compõem os custos fixos (a ordem da soma é mantida em todos os caminhos)
+DESPESAS_CUSTOS_FIXOS = (
+    'funcionarios',
+    'agua',
+    'energia',
+    'embalagem',
+    'refeicao',
+    'materiais_limpeza',
+    'gelo',
+    'horas_extras',
+    'amonia',
+    'epi',
+    'manutencao',
+    'lenha_caldeira',
+    'diaristas',
+    'depreciacao',
+    'recisao',
+    'ferias',
+    'inss',
+)
+
+_quantidade_aves = Campo('quantidade_aves')
+_peso_total_kg = Campo('peso_total_kg')
+_horas_trabalhadas = Campo('horarios.horas_trabalhadas')
+_peso_total_produtos = Ref('peso_total_produtos')
+_receita_produtos = Ref('receita_produtos')
+_rendimento_final = Ref('rendimento_final')
+_aves_hora = Ref('aves_hora')
+_percentual_perda_total = Ref('percentual_perda_total')
+
+# Nós do grafo: valores intermediários e métricas, sem arredondamento
+NOS: Dict[str, Expr] = {
+    # Produtos e custos
+    'peso_total_produtos': SomaLista('produtos', 'peso_kg'),
+    'receita_produtos': SomaLista('produtos', 'valor_total'),
+    'custos_fixos': SomaCampos('despesas_fixas', DESPESAS_CUSTOS_FIXOS),
+    'custo_frango_vivo': _peso_total_kg * Campo('valor_kg_vivo'),
+    'custos_totais': Ref('custos_fixos') + Ref('custo_frango_vivo'),
+
+    # Métricas principais
+    'preco_venda_kg': DivisaoSegura(_receita_produtos, _peso_total_produtos),
+    'lucro_liquido': _receita_produtos - Ref('custos_totais'),
+    'rendimento_final': Se(
+        _peso_total_kg > 0,
+        Minimo(DivisaoSegura(_peso_total_produtos, _peso_total_kg) * 100, 100.0),
+        0
+    ),
+
+    # Perdas
+    'peso_total_perdas': Maximo(_peso_total_kg - _peso_total_produtos, 0),
+    'percentual_perda_total': DivisaoSegura(Ref('peso_total_perdas'), _peso_total_kg) * 100,
+    'valor_perdas': Se(
+        Ref('preco_venda_kg') > 0,
+        Ref('peso_total_perdas') * Ref('preco_venda_kg'),
+        0
+    ),
+    'eficiencia_aproveitamento': Minimo(_rendimento_final, 100.0),
+
+    # Indicadores por unidade
+    'media_valor_kg': DivisaoSegura(_receita_produtos, _peso_total_produtos),
+    'custo_kg': DivisaoSegura(Ref('custos_totais'), _peso_total_produtos),
+    'custo_abate_kg': DivisaoSegura(Ref('custos_fixos'), _peso_total_produtos),
+    'lucro_kg': DivisaoSegura(Ref('lucro_liquido'), _peso_total_produtos),
+    'custo_ave': DivisaoSegura(Ref('custos_totais'), _quantidade_aves),
+    'custo_frango': DivisaoSegura(Ref('custo_frango_vivo'), _quantidade_aves),
+    'lucro_frango': DivisaoSegura(Ref('lucro_liquido'), _quantidade_aves),
+    'receita_por_ave': DivisaoSegura(_receita_produtos, _quantidade_aves),
+
+    # Eficiência operacional
+    'aves_hora': DivisaoSegura(_quantidade_aves, _horas_trabalhadas),
+    'kg_hora': DivisaoSegura(_peso_total_produtos, _horas_trabalhadas),
+    'tempo_medio_ave': DivisaoSegura(_horas_trabalhadas * 60, _quantidade_aves),
+    'eficiencia_base_rendimento': Se(
+        _rendimento_final < 70,
+        100 - (70 - _rendimento_final) * 0.5,
+        100
+    ),
+    'eficiencia_base_velocidade': Se(
+        _aves_hora < 50,
+        Ref('eficiencia_base_rendimento') - (50 - _aves_hora) * 0.3,
+        Ref('eficiencia_base_rendimento')
+    ),
+    'eficiencia_base_perdas': Se(
+        _percentual_perda_total > 10,
+        Ref('eficiencia_base_velocidade') - (_percentual_perda_total - 10) * 2,
+        Ref('eficiencia_base_velocidade')
+    ),
+    'eficiencia_operacional': Maximo(Minimo(Ref('eficiencia_base_perdas'), 100.0), 0.0),
+
+    # Qualidade e performance
+    'diversificacao_produtos': Contagem('produtos'),
+    'peso_medio_geral': DivisaoSegura(_peso_total_produtos, _quantidade_aves),
+    'score_performance': (
+        (_rendimento_final * 0.3) +
+        (Ref('eficiencia_operacional') * 0.3) +
+        (Minimo(_aves_hora / 100 * 100, 100) * 0.2) +
+        (Minimo((100 - _percentual_perda_total), 100) * 0.2)
+    ),
+    'classificacao_performance': Se(
+        Ref('score_performance') >= 90, "Excelente",
+        Se(Ref('score_performance') >= 80, "Muito Bom",
+           Se(Ref('score_performance') >= 70, "Bom",
+              Se(Ref('score_performance') >= 60, "Regular", "Ruim")))
+    ),
+
+    # Cortes vs Inteiro
+    'cortes_peso_total': SomaLista('produtos', 'peso_kg', FiltroTipoInteiro(False)),
+    'cortes_valor_total': SomaLista('produtos', 'valor_total', FiltroTipoInteiro(False)),
+    'inteiro_peso_total': SomaLista('produtos', 'peso_kg', FiltroTipoInteiro(True)),
+    'inteiro_valor_total': SomaLista('produtos', 'valor_total', FiltroTipoInteiro(True)),
+    'cortes_percentual_peso': DivisaoSegura(Ref('cortes_peso_total'), _peso_total_produtos) * 100,
+    'cortes_percentual_valor': DivisaoSegura(Ref('cortes_valor_total'), _receita_produtos) * 100,
+    'inteiro_percentual_peso': DivisaoSegura(Ref('inteiro_peso_total'), _peso_total_produtos) * 100,
+    'inteiro_percentual_valor': DivisaoSegura(Ref('inteiro_valor_total'), _receita_produtos) * 100,
+
+    # Percentuais
+    'percentual_lucro_liquido': clamp(DivisaoSegura(Ref('lucro_liquido'), _receita_produtos) * 100, -100.0, 100.0),
+    'percentual_rendimento': clamp(_rendimento_final),
+    'percentual_custo_abate_kg': clamp(DivisaoSegura(Ref('custo_abate_kg'), Ref('custo_kg')) * 100),
+    'percentual_custo_frango': clamp(DivisaoSegura(Ref('custo_frango'), Ref('custo_ave')) * 100),
+    'percentual_lucro_kg': clamp(DivisaoSegura(Ref('lucro_kg'), Ref('preco_venda_kg')) * 100, -100.0, 100.0),
+    'percentual_lucro_frango': clamp(DivisaoSegura(Ref('lucro_frango'), Ref('receita_por_ave')) * 100, -100.0, 100.0),
+}
+
+# Métricas gravadas no documento -> nó de origem, na ordem em que são gravadas
+METRICAS: Dict[str, Expr] = {
+    'peso_inteiro_abatido': _peso_total_produtos,
+    'preco_venda_kg': Ref('preco_venda_kg'),
+    'receita_bruta': _receita_produtos,
+    'custos_totais': Ref('custos_totais'),
+    'lucro_liquido': Ref('lucro_liquido'),
+    'rendimento_final': _rendimento_final,
+    'cortes_peso_total': Ref('cortes_peso_total'),
+    'cortes_valor_total': Ref('cortes_valor_total'),
+    'cortes_percentual_peso': Ref('cortes_percentual_peso'),
+    'cortes_percentual_valor': Ref('cortes_percentual_valor'),
+    'inteiro_peso_total': Ref('inteiro_peso_total'),
+    'inteiro_valor_total': Ref('inteiro_valor_total'),
+    'inteiro_percentual_peso': Ref('inteiro_percentual_peso'),
+    'inteiro_percentual_valor': Ref('inteiro_percentual_valor'),
+    'media_valor_kg': Ref('media_valor_kg'),
+    'custo_kg': Ref('custo_kg'),
+    'custo_ave': Ref('custo_ave'),
+    'custo_abate_kg': Ref('custo_abate_kg'),
+    'custo_frango': Ref('custo_frango'),
+    'lucro_kg': Ref('lucro_kg'),
+    'lucro_frango': Ref('lucro_frango'),
+    'lucro_total': Ref('lucro_liquido'),
+    'aves_hora': _aves_hora,
+    'kg_hora': Ref('kg_hora'),
+    'tempo_medio_ave': Ref('tempo_medio_ave'),
+    'eficiencia_operacional': Ref('eficiencia_operacional'),
+    'peso_total_perdas': Ref('peso_total_perdas'),
+    'percentual_perda_total': _percentual_perda_total,
+    'valor_perdas': Ref('valor_perdas'),
+    'eficiencia_aproveitamento': Ref('eficiencia_aproveitamento'),
+    'diversificacao_produtos': Ref('diversificacao_produtos'),
+    'peso_medio_geral': Ref('peso_medio_geral'),
+    'score_performance': Ref('score_performance'),
+    'classificacao_performance': Ref('classificacao_performance'),
+    'percentual_receita_bruta': Const(100.0),
+    'percentual_custos_totais': Const(100.0),
+    'percentual_lucro_liquido': Ref('percentual_lucro_liquido'),
+    'percentual_rendimento': Ref('percentual_rendimento'),
+    'percentual_media_valor_kg': Const(100.0),
+    'percentual_custo_kg': Const(100.0),
+    'percentual_custo_ave': Const(100.0),
+    'percentual_custo_abate_kg': Ref('percentual_custo_abate_kg'),
+    'percentual_custo_frango': Ref('percentual_custo_frango'),
+    'percentual_lucro_kg': Ref('percentual_lucro_kg'),
+    'percentual_lucro_frango': Ref('percentual_lucro_frango'),
+    'percentual_lucro_total': Ref('percentual_lucro_liquido'),
+}
+
+# Métricas gravadas sem arredondamento
+METRICAS_NAO_ARREDONDADAS = frozenset({'diversificacao_produtos', 'classificacao_performance'})
+
+
+def _folhas(expr: Expr) -> List[_Folha]:
+    if isinstance(expr, _Folha):
+        return [expr]
+    if isinstance(expr, _Composta):
+        return [folha for filho in expr.filhos for folha in _folhas(filho)]
+    return []
+
+
+# Colunas de entrada do modo em lote: tudo o que as fórmulas leem do documento
+COLUNAS: Dict[str, _Folha] = {}
+for _expressao in [*NOS.values(), *METRICAS.values()]:
+    for _folha in _folhas(_expressao):
+        COLUNAS.setdefault(_folha.coluna(), _folha)
+
+
+@lru_cache(maxsize=None)
+def _campos_do_no(nome: str) -> FrozenSet[str]:
+    return _campos_da_expressao(NOS[nome])
+
+
+def _campos_da_expressao(expr: Expr) -> FrozenSet[str]:
+    campos = set()
+    for tipo, nome in expr.dependencias():
+        if tipo == "campo":
+            campos.add(nome)
+        else:
+            campos |= _campos_do_no(nome)
+    return frozenset(campos)
+
+
+# Grafo de dependências: métrica -> campos de entrada do documento que ela lê
+DEPENDENCIAS_METRICAS: Dict[str, FrozenSet[str]] = {
+    nome: _campos_da_expressao(expr) for nome, expr in METRICAS.items()
+}
+
+# Todos os campos de entrada que influenciam alguma métrica
+CAMPOS_ENTRADA: FrozenSet[str] = frozenset().union(*DEPENDENCIAS_METRICAS.values())
+
+
+def metricas_afetadas(campos_alterados: Iterable[str]) -> List[str]:
+    """Métricas que precisam ser recalculadas quando os campos informados mudam"""
+    alterados = set(campos_alterados)
+    return [nome for nome, campos in DEPENDENCIAS_METRICAS.items() if campos & alterados]
+
+
+def calcular(dados_abate: Dict[str, Any], metricas: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+    """Avalia as métricas informadas (ou todas) sobre um documento de abate.
+
+    Apenas os nós necessários para as métricas pedidas são avaliados.
+    """
+    return funcao_python(None if metricas is None else tuple(metricas))(dados_abate)
+
+
+@lru_cache(maxsize=None)
+def _nos_do_no(nome: str) -> FrozenSet[str]:
+    return frozenset({nome}) | _nos_da_expressao(NOS[nome])
+
+
+def _nos_da_expressao(expr: Expr) -> FrozenSet[str]:
+    nos = set()
+    for tipo, nome in expr.dependencias():
+        if tipo == "no":
+            nos |= _nos_do_no(nome)
+    return frozenset(nos)
+
+
+@lru_cache(maxsize=None)
+def _nivel(nome: str) -> int:
+    deps = [dep for tipo, dep in NOS[nome].dependencias() if tipo == "no"]
+    return 1 + max((_nivel(dep) for dep in deps), default=-1)
+
+
+@lru_cache(maxsize=256)
+def funcao_python(metricas: Optional[Tuple[str, ...]] = None) -> Callable[[Dict[str, Any]], Dict[str, Any]]:
+    """Função Python que calcula as métricas informadas (ou todas) sobre um documento.
+
+    O código é gerado uma vez por conjunto de métricas: cada nó necessário vira
+    uma variável local, atribuída em ordem de dependência (depois dos
+    ``preparos``), e as métricas são arredondadas no dicionário retornado.
+    """
+    nomes = list(METRICAS.keys() if metricas is None else metricas)
+    necessarios = set()
+    for nome in nomes:
+        necessarios |= _nos_da_expressao(METRICAS[nome])
+
+    ordem = sorted(necessarios, key=lambda no: (_nivel(no), no))
+    preparos = {}
+    for no in ordem:
+        preparos.update(NOS[no].preparos())
+
+    linhas = ["def calcular(d):"]
+    for variavel, codigo in preparos.items():
+        linhas.append(f"    {variavel} = {codigo}")
+    for no in ordem:
+        linhas.append(f"    n_{no} = {NOS[no].python()}")
+    linhas.append("    return {")
+    for nome in nomes:
+        expr = METRICAS[nome]
+        if isinstance(expr, Const):
+            codigo = repr(expr.valor if nome in METRICAS_NAO_ARREDONDADAS else round(expr.valor, 2))
+        elif nome in METRICAS_NAO_ARREDONDADAS:
+            codigo = expr.python()
+        else:
+            codigo = f"round({expr.python()}, 2)"
+        linhas.append(f"        {nome!r}: {codigo},")
+    linhas.append("    }")
+
+    escopo = dict(_AUXILIARES)
+    exec(compile("\n".join(linhas), f"<metricas {len(nomes)}>", "exec"), escopo)
+    return escopo["calcular"]
+
+
+@lru_cache(maxsize=None)
+def funcao_colunas() -> Callable[[Dict[str, Any]], Tuple[Any, ...]]:
+    """Função Python que lê de um documento os valores das ``COLUNAS``, na mesma ordem.
+
+    As somas são as mesmas do código de ``funcao_python``, para que o modo em
+    lote chegue aos mesmos valores bit a bit.
+    """
+    preparos = {}
+    for folha in COLUNAS.values():
+        preparos.update(folha.preparos())
+
+    linhas = ["def extrair(d):"]
+    for variavel, codigo in preparos.items():
+        linhas.append(f"    {variavel} = {codigo}")
+    linhas.append("    return (")
+    for folha in COLUNAS.values():
+        linhas.append(f"        {folha.python()},")
+    linhas.append("    )")
+
+    escopo = dict(_AUXILIARES)
+    exec(compile("\n".join(linhas), "<colunas>", "exec"), escopo)
+    return escopo["extrair"]
+
+
+@lru_cache(maxsize=256)
+def funcao_vetorizada(metricas: Optional[Tuple[str, ...]] = None) -> Callable[[Dict[str, np.ndarray]], Dict[str, np.ndarray]]:
+    """Função NumPy que calcula as métricas informadas (ou todas) sobre as colunas de vários abates.
+
+    Mesmo grafo de ``funcao_python``, com os nós calculados como arrays; o
+    resultado não é arredondado.
+    """
+    nomes = list(METRICAS.keys() if metricas is None else metricas)
+    necessarios = set()
+    for nome in nomes:
+        necessarios |= _nos_da_expressao(METRICAS[nome])
+
+    linhas = [
+        "def calcular(colunas):",
+        "    tamanho = len(next(iter(colunas.values())))",
+    ]
+    for no in sorted(necessarios, key=lambda no: (_nivel(no), no)):
+        linhas.append(f"    n_{no} = {NOS[no].numpy()}")
+    linhas.append("    return {")
+    for nome in nomes:
+        expr = METRICAS[nome]
+        if isinstance(expr, Const):
+            codigo = f"np.full(tamanho, {expr.valor!r})"
+        else:
+            codigo = expr.numpy()
+        linhas.append(f"        {nome!r}: {codigo},")
+    linhas.append("    }")
+
+    escopo = dict(_AUXILIARES_VETOR)
+    exec(compile("\n".join(linhas), f"<metricas vetorizadas {len(nomes)}>", "exec"), escopo)
+    return escopo["calcular"]
+
+
+def _metrica_compilada(nome: str, inline: bool) -> Any:
+    expr = METRICAS[nome].compilar(inline)
+    return expr if nome in METRICAS_NAO_ARREDONDADAS else {"$round": [expr, 2]}
+
+
+def compilar_pipeline(metricas: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+    """Estágios $set que gravam as métricas informadas (ou todas) em cada documento.
+
+    Os nós intermediários são calculados em estágios por nível de dependência,
+    num campo temporário removido ao final. O resultado serve tanto para
+    ``aggregate`` quanto para ``update_many`` com pipeline.
+    """
+    nomes = list(METRICAS.keys() if metricas is None else metricas)
+
+    necessarios = set()
+    for nome in nomes:
+        necessarios |= _nos_da_expressao(METRICAS[nome])
+
+    niveis: Dict[int, List[str]] = {}
+    for no in necessarios:
+        niveis.setdefault(_nivel(no), []).append(no)
+
+    pipeline = []
+    for nivel in sorted(niveis):
+        pipeline.append({"$set": {
+            f"{CAMPO_TEMPORARIO}.{no}": NOS[no].compilar()
+            for no in sorted(niveis[nivel])
+        }})
+    pipeline.append({"$set": {nome: _metrica_compilada(nome, inline=False) for nome in nomes}})
+    if necessarios:
+        pipeline.append({"$unset": CAMPO_TEMPORARIO})
+    return pipeline
+
+
+def expressao_mongo(nome: str, arredondar: bool = False) -> Any:
+    """Expressão autocontida de uma métrica, para uso em $group, $project, etc."""
+    if arredondar:
+        return _metrica_compilada(nome, inline=True)
+    return METRICAS[nome].compilar(inline=True)
@@ -0,0 +1,76 @@
+"""
+Paginação por cursor (keyset) das listagens ordenadas por data do abate.
+
+As listagens são ordenadas por ``(data_abate, _id)`` decrescentes; o ``_id``
+desempata abates do mesmo instante. O cursor codifica o par do último item de
+uma página e a próxima página é buscada com ``data_abate < d`` ou
+``data_abate == d e _id < id``, que o índice ``(..., data_abate, _id)``
+resolve sem percorrer as páginas anteriores, ao contrário de ``skip``.
+
+Documentos sem ``data_abate`` (ou com None) vêm por último na ordem
+decrescente do MongoDB; o cursor guarda a data vazia e as páginas seguintes
+continuam entre eles pelo ``_id``.
+
+O cursor é opaco para o cliente (base64 url-safe); o formato pode mudar.
+"""
+
+import base64
+import binascii
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from bson import ObjectId
+from bson.errors import InvalidId
+
+CABECALHO = "X-Proximo-Cursor"
+
+ORDEM: List[Tuple[str, int]] = [("data_abate", -1), ("_id", -1)]
+
+
+def codificar(data_abate: Optional[datetime], identificador: Any) -> str:
+    data = data_abate.isoformat() if data_abate is not None else ""
+    bruto = f"{data}|{identificador}".encode()
+    return base64.urlsafe_b64encode(bruto).decode().rstrip("=")
+
+
+def decodificar(cursor: str) -> Tuple[Optional[datetime], ObjectId]:
+    """Par ``(data_abate, _id)`` do cursor (data None para abates sem data); ValueError quando inválido"""
+    try:
+        bruto = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        data, identificador = bruto.split("|", 1)
+        return datetime.fromisoformat(data) if data else None, ObjectId(identificador)
+    except (binascii.Error, InvalidId, UnicodeDecodeError, ValueError, TypeError) as e:
+        raise ValueError("Cursor de paginação inválido") from e
+
+
+def apos(cursor: str) -> Dict[str, Any]:
+    """Condição dos documentos posteriores ao cursor na ordem ``ORDEM``"""
+    data_abate, identificador = decodificar(cursor)
+    if data_abate is None:
+        return {"data_abate": None, "_id": {"$lt": identificador}}
+    return {"$or": [
+        {"data_abate": {"$lt": data_abate}},
+        {"data_abate": data_abate, "_id": {"$lt": identificador}},
+        # $lt não compara datas com null: os abates sem data vêm depois de todos
+        {"data_abate": None},
+    ]}
+
+
+def aplicar(query: Dict[str, Any], cursor: Optional[str]) -> Dict[str, Any]:
+    """Acrescentar a condição do cursor à consulta (sem cursor, a consulta não muda)"""
+    if not cursor:
+        return query
+    return {"$and": [query, apos(cursor)]} if query else apos(cursor)
+
+
+def proximo(itens: Sequence[Any], limit: int) -> Optional[str]:
+    """Cursor da página seguinte, ou None quando a página veio incompleta.
+
+    Aceita modelos ou dicionários (listagens com campos selecionados).
+    """
+    if not itens or len(itens) < limit:
+        return None
+    ultimo = itens[-1]
+    if isinstance(ultimo, dict):
+        return codificar(ultimo.get("data_abate"), ultimo["id"])
+    return codificar(getattr(ultimo, "data_abate", None), ultimo.id)
@@ -0,0 +1,121 @@
+"""
+Estatísticas mensais de preço por kg: frango vivo, venda dos produtos e spread.
+
+Substitui os cálculos em Python de ``analisar_precos_frango.py`` e
+``verificar_precos_mercado.py``: a agregação agrupa os abates por mês e
+calcula quantidade, mínimo, máximo, média, mediana e desvio padrão amostral
+de ``valor_kg_vivo``, ``preco_venda_kg`` e do spread entre os dois (venda -
+vivo, por abate). Só entram valores positivos, como nos scripts.
+
+A mediana é exata, como nos scripts: os valores de cada mês (algumas
+centenas no máximo) vêm no resultado do $group e ``statistics.median`` é
+aplicado em Python. O $percentile do MongoDB só oferece o método aproximado.
+
+Meses fechados são guardados em ``precos_frango_mensal`` e reaproveitados;
+uma escrita em ``abates_completos`` descarta o mês afetado.
+"""
+
+import math
+import statistics
+from datetime import datetime
+from typing import Any, Dict, List
+
+COLECAO_CACHE = "precos_frango_mensal"
+# Formato dos meses guardados: incrementar quando o cálculo mudar (2: mediana exata)
+FORMATO_CACHE = 2
+
+# Série -> expressão do valor por abate (None quando não entra na estatística)
+SERIES = {
+    "valor_kg_vivo": {"$cond": [{"$gt": ["$valor_kg_vivo", 0]}, "$valor_kg_vivo", None]},
+    "preco_venda_kg": {"$cond": [{"$gt": ["$preco_venda_kg", 0]}, "$preco_venda_kg", None]},
+    "spread_kg": {"$cond": [
+        {"$and": [{"$gt": ["$valor_kg_vivo", 0]}, {"$gt": ["$preco_venda_kg", 0]}]},
+        {"$subtract": ["$preco_venda_kg", "$valor_kg_vivo"]},
+        None
+    ]},
+}
+
+
+def pipeline(filtro: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Agregação das estatísticas por mês.
+
+    Os valores de cada mês são devolvidos em ``<serie>_valores`` para a
+    mediana exata de ``formatar_mes``.
+    """
+    grupo = {
+        "_id": {"$dateTrunc": {"date": "$data_abate", "unit": "month"}},
+        "abates": {"$sum": 1},
+    }
+    for serie, valor in SERIES.items():
+        grupo[f"{serie}_quantidade"] = {"$sum": {"$cond": [{"$eq": [valor, None]}, 0, 1]}}
+        grupo[f"{serie}_minimo"] = {"$min": valor}
+        grupo[f"{serie}_maximo"] = {"$max": valor}
+        grupo[f"{serie}_media"] = {"$avg": valor}
+        grupo[f"{serie}_desvio_padrao"] = {"$stdDevSamp": valor}
+        grupo[f"{serie}_valores"] = {"$push": valor}
+    return [
+        {"$match": filtro},
+        {"$group": grupo},
+        {"$sort": {"_id": 1}},
+    ]
+
+
+def formatar_mes(grupo: Dict[str, Any]) -> Dict[str, Any]:
+    """Documento do mês no formato da resposta (e do cache)"""
+    mes = {"mes": grupo["_id"], "abates": grupo["abates"]}
+    for serie in SERIES:
+        quantidade = grupo.get(f"{serie}_quantidade", 0)
+        valores = [valor for valor in grupo.get(f"{serie}_valores", []) if valor is not None]
+        mediana = statistics.median(valores) if valores else None
+        mes[serie] = {
+            "quantidade": quantidade,
+            "minimo": grupo.get(f"{serie}_minimo"),
+            "maximo": grupo.get(f"{serie}_maximo"),
+            "media": grupo.get(f"{serie}_media"),
+            "mediana": mediana,
+            # $stdDevSamp retorna null para um único valor; os scripts usavam 0
+            "desvio_padrao": grupo.get(f"{serie}_desvio_padrao") or 0 if quantidade else None,
+        }
+    return mes
+
+
+def combinar(meses: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Estatísticas do período inteiro a partir das mensais.
+
+    Mínimo, máximo, média e desvio padrão são combinados exatamente; a
+    mediana não pode ser combinada e fica de fora.
+    """
+    geral = {"abates": sum([mes["abates"] for mes in meses])}
+    for serie in SERIES:
+        partes = [mes[serie] for mes in meses if mes[serie]["quantidade"]]
+        quantidade = sum([parte["quantidade"] for parte in partes])
+        if not quantidade:
+            geral[serie] = {"quantidade": 0, "minimo": None, "maximo": None, "media": None, "desvio_padrao": None}
+            continue
+        media = sum([parte["media"] * parte["quantidade"] for parte in partes]) / quantidade
+        # Soma dos quadrados dos desvios de cada mês mais a parcela entre meses
+        quadrados = sum([
+            (parte["desvio_padrao"] or 0) ** 2 * (parte["quantidade"] - 1)
+            + parte["quantidade"] * (parte["media"] - media) ** 2
+            for parte in partes
+        ])
+        geral[serie] = {
+            "quantidade": quantidade,
+            "minimo": min([parte["minimo"] for parte in partes]),
+            "maximo": max([parte["maximo"] for parte in partes]),
+            "media": media,
+            "desvio_padrao": math.sqrt(quadrados / (quantidade - 1)) if quantidade > 1 else 0,
+        }
+    return geral
+
+
+def arredondar(estatisticas: Dict[str, Any]) -> Dict[str, Any]:
+    """Arredondar os valores em R$ para a resposta"""
+    return {
+        campo: round(valor, 4) if isinstance(valor, float) else valor
+        for campo, valor in estatisticas.items()
+    }
+
+
+def proximo_mes(mes: datetime) -> datetime:
+    return datetime(mes.year + mes.month // 12, mes.month % 12 + 1, 1)
@@ -0,0 +1,113 @@
+"""
+Esboços de quantis das métricas dos abates (histogramas logarítmicos).
+
+Cada valor é contado num balde de índice ``ceil(log_γ |x|)``, com
+``γ = (1 + ALFA) / (1 - ALFA)``, separado por sinal (``p`` para positivos,
+``n`` para negativos, ``z`` para zeros). Qualquer quantil estimado a partir
+dos baldes tem erro relativo de no máximo ``ALFA`` (esboço do tipo DDSketch).
+
+Ao contrário de t-digest ou KLL, os baldes são contagens: dois esboços se
+juntam somando os baldes e um abate alterado ou excluído é retirado com
+``$inc`` negativo, como nos consolidados. A consulta percorre os baldes
+(algumas centenas no máximo), independente da quantidade de abates.
+"""
+
+import math
+from typing import Any, Dict, Iterable, List, Optional
+
+ALFA = 0.01
+GAMA = (1 + ALFA) / (1 - ALFA)
+_LOG_GAMA = math.log(GAMA)
+
+# Valores menores que isto (em módulo) são contados como zero
+MINIMO = 1e-6
+
+METRICAS = ("rendimento_final", "aves_hora", "custo_kg", "lucro_frango")
+
+
+def indice(valor: float) -> int:
+    return math.ceil(math.log(valor) / _LOG_GAMA)
+
+
+def valor_do_indice(posicao: int) -> float:
+    """Estimativa do balde (meio do intervalo ``(γ^(i-1), γ^i]`` em erro relativo)"""
+    return 2 * GAMA ** posicao / (GAMA + 1)
+
+
+def _valido(valor: Any) -> bool:
+    return isinstance(valor, (int, float)) and not math.isnan(valor) and not math.isinf(valor)
+
+
+def _chave(valor: float):
+    """Chave ordenável do balde: ``(-1, -i)`` negativos, ``(0, 0)`` zero, ``(1, i)`` positivos"""
+    if abs(valor) < MINIMO:
+        return (0, 0)
+    ordem = 1 if valor > 0 else -1
+    return (ordem, ordem * indice(abs(valor)))
+
+
+def contribuicao(metricas: Dict[str, Any]) -> Dict[str, int]:
+    """Baldes, por caminho do campo, que os valores das métricas de um abate incrementam"""
+    valores = {}
+    for metrica in METRICAS:
+        valor = metricas.get(metrica)
+        if not _valido(valor):
+            continue
+        ordem, posicao = _chave(valor)
+        if ordem == 0:
+            valores[f"{metrica}.z"] = 1
+        else:
+            valores[f"{metrica}.{'p' if ordem > 0 else 'n'}.{ordem * posicao}"] = 1
+    return valores
+
+
+def juntar(esbocos: Iterable[Dict[str, Any]]) -> Dict[str, int]:
+    """Somar os esboços gravados de uma métrica em ``{chave do balde: contagem}``"""
+    baldes = {}
+    for esboco in esbocos:
+        if not esboco:
+            continue
+        for sinal, ordem in (("n", -1), ("p", 1)):
+            for posicao, contagem in (esboco.get(sinal) or {}).items():
+                chave = (ordem, ordem * int(posicao))
+                baldes[chave] = baldes.get(chave, 0) + contagem
+        if esboco.get("z"):
+            baldes[(0, 0)] = baldes.get((0, 0), 0) + esboco["z"]
+    return {chave: contagem for chave, contagem in baldes.items() if contagem > 0}
+
+
+def _valor(chave) -> float:
+    ordem, posicao = chave
+    return ordem * valor_do_indice(ordem * posicao) if ordem else 0.0
+
+
+def total(baldes: Dict[Any, int]) -> int:
+    return sum(baldes.values())
+
+
+def quantis(baldes: Dict[Any, int], fracoes: List[float]) -> List[Optional[float]]:
+    """Valores estimados dos quantis (frações entre 0 e 1), None sem dados"""
+    quantidade = total(baldes)
+    if not quantidade:
+        return [None for _ in fracoes]
+    ordenados = sorted(baldes.items())
+    resultado = []
+    for fracao in fracoes:
+        posicao_alvo = fracao * (quantidade - 1)
+        acumulado = 0
+        for chave, contagem in ordenados:
+            acumulado += contagem
+            if acumulado > posicao_alvo:
+                resultado.append(_valor(chave))
+                break
+    return resultado
+
+
+def percentil(baldes: Dict[Any, int], valor: float) -> Optional[float]:
+    """Percentil (0-100) de um valor: abates abaixo mais metade dos empatados no balde"""
+    quantidade = total(baldes)
+    if not quantidade or not _valido(valor):
+        return None
+    chave = _chave(valor)
+    abaixo = sum([contagem for outra, contagem in baldes.items() if outra < chave])
+    return (abaixo + baldes.get(chave, 0) / 2) / quantidade * 100
@@ -0,0 +1,164 @@
+"""
+Relatório consolidado dos abates (tela de Relatórios).
+
+As regras são as de ``dadosConsolidados`` em ``Relatorios.vue``: totais,
+médias aritméticas por abate, médias ponderadas por aves ou por peso vivo,
+grupos de despesas e mapa de produtos. O cálculo parte de somas, que podem
+vir tanto de uma agregação sobre ``abates_completos`` quanto da soma dos
+documentos consolidados por dia/mês (ver ``consolidados``).
+"""
+
+import math
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+# Grupos de despesas exibidos no relatório
+GRUPOS_DESPESAS = {
+    "recursos_humanos": ("funcionarios", "horas_extras", "diaristas"),
+    "utilidades": ("agua", "energia"),
+    "materiais": ("embalagem", "materiais_limpeza", "gelo"),
+    "operacionais": ("refeicao", "amonia", "epi", "manutencao"),
+}
+
+_FIM_DO_DIA = timedelta(microseconds=1)
+
+Intervalo = Tuple[Optional[datetime], Optional[datetime]]
+
+
+def _validar(valor: float, minimo: Optional[float] = None, maximo: Optional[float] = None) -> float:
+    """Equivalente a ``validarValor`` do frontend"""
+    if not isinstance(valor, (int, float)) or math.isnan(valor) or math.isinf(valor):
+        return 0
+    if minimo is not None and valor < minimo:
+        return minimo
+    if maximo is not None and valor > maximo:
+        return maximo
+    return valor
+
+
+def dividir_periodo(
+    data_inicio: Optional[datetime],
+    data_fim: Optional[datetime]
+) -> Optional[Tuple[List[Intervalo], Optional[Intervalo]]]:
+    """Dividir o período em intervalos de consolidados diários e um intervalo de mensais.
+
+    Retorna ``(intervalos_diarios, intervalo_mensal)``, com limites
+    ``[inicio, fim)`` (None = sem limite) e ``intervalo_mensal`` None quando
+    não há mês inteiro no período. Retorna None se o período não cobre dias
+    inteiros e só pode ser atendido a partir dos abates.
+    """
+    if data_inicio is not None and data_inicio != datetime(data_inicio.year, data_inicio.month, data_inicio.day):
+        return None
+    fim = None
+    if data_fim is not None:
+        fim = data_fim + _FIM_DO_DIA
+        if fim != datetime(fim.year, fim.month, fim.day):
+            return None
+
+    # Primeiro mês inteiro dentro do período e início do mês em que o período termina
+    primeiro_mes = data_inicio
+    if data_inicio is not None and data_inicio.day != 1:
+        primeiro_mes = datetime(data_inicio.year + data_inicio.month // 12, data_inicio.month % 12 + 1, 1)
+    ultimo_mes = datetime(fim.year, fim.month, 1) if fim is not None else None
+
+    if primeiro_mes is not None and ultimo_mes is not None and primeiro_mes >= ultimo_mes:
+        return [(data_inicio, fim)], None
+
+    diarios = []
+    if data_inicio is not None and data_inicio < primeiro_mes:
+        diarios.append((data_inicio, primeiro_mes))
+    if fim is not None and ultimo_mes < fim:
+        diarios.append((ultimo_mes, fim))
+    return diarios, (primeiro_mes, ultimo_mes)
+
+
+def formatar(somas: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Montar o relatório a partir das somas; None quando não há abates"""
+    num_abates = somas.get("abates", 0)
+    if num_abates <= 0:
+        return None
+
+    despesas = somas.get("despesas", {})
+    metricas = somas.get("metricas", {})
+    ponderadas = somas.get("ponderadas", {})
+    total_aves = somas.get("quantidade_aves", 0)
+    peso_vivo = somas.get("peso_vivo_kg", 0)
+    peso_processado = somas.get("peso_inteiro_abatido", 0)
+
+    produtos = []
+    for chave, produto in somas.get("produtos", {}).items():
+        if produto.get("quantidade", 0) <= 0:
+            continue
+        peso = produto.get("peso_kg", 0)
+        produtos.append({
+            "nome": chave,
+            "tipo": produto.get("tipo"),
+            "quantidade": peso,
+            "preco_unitario": produto.get("valor_total", 0) / peso if peso > 0 else 0,
+            "total": produto.get("valor_total", 0)
+        })
+    receita_total = sum([produto["total"] for produto in produtos])
+
+    despesas_fixas = {
+        grupo: sum([despesas.get(campo, 0) for campo in campos])
+        for grupo, campos in GRUPOS_DESPESAS.items()
+    }
+    despesas_fixas["compra_frango_vivo"] = somas.get("valor_aves", 0)
+    custo_total = sum(despesas_fixas.values())
+
+    indicadores = {
+        "tempo_total_horas": somas.get("horas_reais", 0),
+        "perdas_kg": metricas.get("peso_total_perdas", 0),
+        "energia_kwh": 0,
+        "rendimento_final": 0,
+        "custo_kg": 0,
+        "lucro_kg": 0,
+        # Médias aritméticas por abate
+        "aves_hora": _validar(metricas.get("aves_hora", 0) / num_abates, 0),
+        "kg_hora": _validar(metricas.get("kg_hora", 0) / num_abates, 0),
+        "eficiencia_operacional": _validar(metricas.get("eficiencia_operacional", 0) / num_abates, 0, 100),
+        "percentual_perda_total": _validar(metricas.get("percentual_perda_total", 0) / num_abates, 0, 100),
+        "eficiencia_aproveitamento": _validar(metricas.get("eficiencia_aproveitamento", 0) / num_abates, 0, 100),
+        # Médias ponderadas
+        "media_valor_kg": 0,
+        "custo_ave": 0,
+        "custo_abate_kg": 0,
+        "custo_frango": 0,
+        "lucro_frango": 0,
+        "lucro_total": 0,
+        "score_performance": _validar(metricas.get("score_performance", 0) / num_abates, 0, 100),
+        "diversificacao_produtos": _validar(metricas.get("diversificacao_produtos", 0) / num_abates, 0, 100),
+        "peso_medio_geral": 0
+    }
+
+    if peso_vivo > 0:
+        indicadores["rendimento_final"] = _validar((peso_processado / peso_vivo) * 100, 0, 100)
+        indicadores["custo_kg"] = _validar(custo_total / peso_vivo, 0)
+        indicadores["lucro_kg"] = _validar((receita_total - custo_total) / peso_vivo)
+        indicadores["media_valor_kg"] = _validar(ponderadas.get("media_valor_kg", 0) / peso_vivo, 0)
+        indicadores["custo_abate_kg"] = _validar(ponderadas.get("custo_abate_kg", 0) / peso_vivo, 0)
+        indicadores["peso_medio_geral"] = _validar(ponderadas.get("peso_medio_geral", 0) / peso_vivo, 0)
+
+    if total_aves > 0:
+        indicadores["custo_ave"] = _validar(ponderadas.get("custo_ave", 0) / total_aves, 0)
+        indicadores["custo_frango"] = _validar(ponderadas.get("custo_frango", 0) / total_aves, 0)
+        indicadores["lucro_frango"] = _validar(ponderadas.get("lucro_frango", 0) / total_aves)
+        indicadores["lucro_total"] = _validar(ponderadas.get("lucro_total", 0) / total_aves)
+
+    return {
+        "total_abates": num_abates,
+        "totalAves": total_aves,
+        "pesoTotalVivo": peso_vivo,
+        "pesoTotalProcessado": peso_processado,
+        "receitaTotal": receita_total,
+        "custoTotal": custo_total,
+        "produtos": sorted(produtos, key=lambda produto: -produto["total"]),
+        "despesasFixas": despesas_fixas,
+        "indicadores": indicadores,
+        "totais": {
+            "receita_bruta": metricas.get("receita_bruta", 0),
+            "custos_totais": metricas.get("custos_totais", 0),
+            "lucro_liquido": metricas.get("lucro_liquido", 0),
+            "valor_perdas": metricas.get("valor_perdas", 0)
+        }
+    }
@@ -0,0 +1,61 @@
+import asyncio
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import UpdateOne
+
+from ..core.config import settings
+from . import busca, versoes_colecoes
+
+# Documentos gravados sem passar pelos CRUDs (importações diretas no banco)
+SEM_CHAVES = {busca.CAMPO: {"$exists": False}}
+
+
+async def preencher_lote(db: AsyncIOMotorDatabase, colecao: str, limite: int) -> int:
+    """Gravar as chaves de busca de até ``limite`` documentos que não as têm"""
+    campos = busca.CAMPOS[colecao]
+    projecao = {campo: 1 for campo in campos}
+    documentos = await db[colecao].find(SEM_CHAVES, projecao).limit(limite).to_list(length=limite)
+    if not documentos:
+        return 0
+    # O filtro repete a ausência das chaves para não sobrescrever uma escrita concorrente
+    operacoes = [
+        UpdateOne({"_id": documento["_id"], **SEM_CHAVES}, {"$set": {busca.CAMPO: busca.chaves(documento, campos)}})
+        for documento in documentos
+    ]
+    resultado = await db[colecao].bulk_write(operacoes, ordered=False)
+    if resultado.modified_count:
+        await versoes_colecoes.incrementar(db, colecao)
+    return len(documentos)
+
+
+async def varrer_chaves_busca(
+    db: AsyncIOMotorDatabase,
+    tamanho_lote: int = settings.BUSCA_VARREDURA_LOTE,
+    intervalo_segundos: float = settings.BUSCA_VARREDURA_INTERVALO
+) -> int:
+    """Preenche, em segundo plano, as chaves de busca que faltam.
+
+    Documentos sem o subdocumento ``busca`` não aparecem nos filtros por
+    unidade, tipo de ave e tipo de produto; a varredura avisa quando os
+    encontra e os atualiza em lotes pequenos, com uma pausa entre eles.
+    Retorna o total de documentos atualizados.
+    """
+    total = 0
+    try:
+        for colecao in busca.CAMPOS:
+            if not await db[colecao].count_documents(SEM_CHAVES, limit=1):
+                continue
+            print(f"AVISO: {colecao} tem documentos sem chaves de busca; eles ficam fora dos filtros até a varredura terminar")
+            while True:
+                processados = await preencher_lote(db, colecao, tamanho_lote)
+                if not processados:
+                    break
+                total += processados
+                await asyncio.sleep(intervalo_segundos)
+        if total:
+            print(f"INFO: Varredura de chaves de busca concluída: {total} documentos atualizados")
+    except asyncio.CancelledError:
+        print(f"INFO: Varredura de chaves de busca interrompida após {total} documentos")
+        raise
+    except Exception as e:
+        print(f"ERROR: Falha na varredura de chaves de busca: {str(e)}")
+    return total
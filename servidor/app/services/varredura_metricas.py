@@ -0,0 +1,35 @@
+import asyncio
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from ..core.config import settings
+from ..crud.abate_completo import get_abate_completo_crud
+
+
+async def varrer_metricas_desatualizadas(
+    db: AsyncIOMotorDatabase,
+    tamanho_lote: int = settings.METRICAS_VARREDURA_LOTE,
+    intervalo_segundos: float = settings.METRICAS_VARREDURA_INTERVALO
+) -> int:
+    """Atualiza, em segundo plano, os abates com métricas de versão antiga.
+
+    Processa lotes pequenos com uma pausa entre eles para não disputar o banco
+    com as requisições; termina quando não há mais documentos desatualizados.
+    Retorna o total de documentos atualizados.
+    """
+    crud = get_abate_completo_crud(db)
+    total = 0
+    try:
+        while True:
+            processados = await crud.atualizar_lote_desatualizado(limite=tamanho_lote)
+            if not processados:
+                break
+            total += processados
+            await asyncio.sleep(intervalo_segundos)
+        if total:
+            print(f"INFO: Varredura de métricas concluída: {total} abates atualizados")
+    except asyncio.CancelledError:
+        print(f"INFO: Varredura de métricas interrompida após {total} abates")
+        raise
+    except Exception as e:
+        print(f"ERROR: Falha na varredura de métricas: {str(e)}")
+    return total
@@ -0,0 +1,40 @@
+"""
+Contador de alterações por coleção.
+
+Cada escrita feita pelos CRUDs incrementa o contador da coleção alterada
+(``versoes_colecoes``, um documento por coleção), depois da gravação ou na
+mesma transação. As respostas de listagens, contagens e agregações derivam o
+ETag desses contadores (ver ``core.condicional``): se nenhum contador mudou,
+a resposta guardada pelo cliente continua válida.
+
+Gravações feitas por fora dos CRUDs (scripts de migração e recálculo) não
+incrementam os contadores; os ETags também mudam a cada dia e com a versão
+das métricas, o que limita quanto uma resposta antiga pode ser reaproveitada.
+"""
+
+from typing import Dict, Iterable
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ReturnDocument
+
+COLECAO = "versoes_colecoes"
+
+
+async def incrementar(db: AsyncIOMotorDatabase, colecao: str) -> int:
+    """Registrar uma alteração em ``colecao``; retorna o novo valor do contador"""
+    documento = await db[COLECAO].find_one_and_update(
+        {"_id": colecao},
+        {"$inc": {"versao": 1}},
+        upsert=True,
+        return_document=ReturnDocument.AFTER
+    )
+    return documento["versao"]
+
+
+async def consultar(db: AsyncIOMotorDatabase, colecoes: Iterable[str]) -> Dict[str, int]:
+    """Contadores das coleções numa só consulta (0 para as nunca alteradas)"""
+    colecoes = list(colecoes)
+    versoes = {colecao: 0 for colecao in colecoes}
+    async for documento in db[COLECAO].find({"_id": {"$in": colecoes}}):
+        versoes[documento["_id"]] = documento["versao"]
+    return versoes
@@ -0,0 +1,100 @@
+"""
+Campos selecionados (``fields=``) e visões nomeadas das listagens de abates.
+
+Tabelas e gráficos costumam usar menos de dez dos ~60 campos de um abate.
+O parâmetro ``fields`` aceita nomes de campos (``data_abate``,
+``despesas_fixas.agua``) e nomes de visões (``summary``, ``financeiro``,
+``operacional``), misturados; a seleção vira uma projeção do MongoDB, de modo
+que só os campos pedidos são lidos, validados e serializados.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional
+
+from ..models.abate_completo import AbateCompleto
+
+# Sempre presentes: identificação e chave da paginação por cursor
+CAMPOS_FIXOS = ("id", "data_abate")
+
+VISOES = {
+    "summary": (
+        "unidade", "tipo_ave", "quantidade_aves", "peso_total_kg",
+        "receita_bruta", "lucro_liquido", "rendimento_final",
+    ),
+    "financeiro": (
+        "unidade", "valor_kg_vivo", "valor_total", "preco_venda_kg", "receita_bruta",
+        "custos_totais", "lucro_liquido", "custo_kg", "lucro_kg", "lucro_frango",
+    ),
+    "operacional": (
+        "unidade", "quantidade_aves", "peso_total_kg", "peso_medio_ave", "horarios",
+        "aves_hora", "kg_hora", "eficiencia_operacional", "percentual_perda_total",
+    ),
+}
+
+CAMPOS = tuple(AbateCompleto.model_fields)
+
+# Campos com subdocumentos que aceitam seleção de subcampos
+_SUBDOCUMENTOS = ("horarios", "despesas_fixas", "produtos")
+
+
+def resolver(fields: Optional[str]) -> Optional[List[str]]:
+    """Campos pedidos (visões expandidas), ou None para o documento completo.
+
+    Levanta ValueError para campos ou visões desconhecidos.
+    """
+    if not fields:
+        return None
+    campos = list(CAMPOS_FIXOS)
+    desconhecidos = []
+    for item in (parte.strip() for parte in fields.split(",")):
+        if not item:
+            continue
+        selecionados = VISOES.get(item, (item,))
+        for campo in selecionados:
+            raiz, _, resto = campo.partition(".")
+            if raiz not in CAMPOS or (resto and raiz not in _SUBDOCUMENTOS):
+                desconhecidos.append(campo)
+            elif campo not in campos:
+                campos.append(campo)
+    if desconhecidos:
+        raise ValueError(
+            f"Campos inválidos: {', '.join(desconhecidos)}. Use campos do abate ou as visões {', '.join(VISOES)}"
+        )
+    # O campo inteiro já inclui os subcampos (o MongoDB recusa os dois na projeção)
+    return [campo for campo in campos if campo.partition(".")[0] == campo or campo.partition(".")[0] not in campos]
+
+
+def projecao(campos: Iterable[str]) -> Dict[str, int]:
+    """Projeção do MongoDB (com a versão das métricas, para detectar documentos antigos)"""
+    resultado = {campo: 1 for campo in campos if campo != "id"}
+    resultado["metricas_versao"] = 1
+    return resultado
+
+
+def recortar(documento: Dict[str, Any], campos: Iterable[str]) -> Dict[str, Any]:
+    """Item da resposta com os campos pedidos (``_id`` como ``id``; ausentes como None).
+
+    Subcampos mantêm a forma do documento: ``despesas_fixas.agua`` vira
+    ``{"despesas_fixas": {"agua": ...}}`` e ``produtos.nome`` uma lista de
+    ``{"nome": ...}``, como na projeção do MongoDB.
+    """
+    subcampos = {}
+    for campo in campos:
+        raiz, _, resto = campo.partition(".")
+        if raiz not in subcampos or not resto:
+            subcampos[raiz] = None if not resto else []
+        if resto and subcampos[raiz] is not None:
+            subcampos[raiz].append(resto)
+
+    item = {}
+    for raiz, selecionados in subcampos.items():
+        if raiz == "id":
+            item["id"] = str(documento["_id"])
+            continue
+        valor = documento.get(raiz)
+        if selecionados is None:
+            item[raiz] = valor
+        elif isinstance(valor, list):
+            item[raiz] = [{sub: (elemento or {}).get(sub) for sub in selecionados} for elemento in valor]
+        else:
+            item[raiz] = {sub: (valor or {}).get(sub) for sub in selecionados}
+    return item
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark offline da serialização das listagens de abates.
+
+Compara, sobre documentos como os que o Motor devolve (gerados a partir de
+bd/local/abatedouro.abates_completos.json), os dois caminhos de GET /abates-completos/:
+
+  - validado: AbateCompleto(**doc) por documento, cópia para o dicionário da
+              resposta e jsonable_encoder + JSONResponse, como o FastAPI faz
+  - rapido:   leitura_rapida.documento + orjson (caminho atual)
+
+Para cada caminho são registrados a mediana do tempo por página e o pico de
+memória alocada durante a serialização. Antes da medição os dois JSON são
+conferidos (mesmas chaves e valores):
+
+    python benchmark_leitura.py
+    python benchmark_leitura.py --tamanhos 100 1000 --repeticoes 50
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+import orjson
+from bson import ObjectId
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.models.abate_completo import AbateCompleto
+from app.services import busca, leitura_rapida
+from app.services.metrics_calculator import MetricsCalculator
+from benchmark_metricas import DIRETORIO_RESULTADOS, carregar_registros, commit_atual, gerar_abates
+
+TAMANHOS_PADRAO = [1000]
+CAMINHOS = ('validado', 'rapido')
+
+
+def gerar_documentos(registros, quantidade, semente):
+    """Documentos completos, com métricas, chaves de busca e ``_id``, como gravados pelo CRUD"""
+    abates = gerar_abates(registros, quantidade, semente)
+    documentos = []
+    for abate, metricas in zip(abates, MetricsCalculator.calcular_metricas_lote(abates)):
+        documento = {campo: valor for campo, valor in abate.items() if campo in AbateCompleto.model_fields}
+        documento.update(metricas)
+        documento['_id'] = ObjectId()
+        documento['metricas_versao'] = MetricsCalculator.VERSAO
+        documento['created_at'] = datetime(2025, 1, 1, 8, 30)
+        documento[busca.CAMPO] = busca.chaves(documento, busca.CAMPOS['abates_completos'])
+        documentos.append(documento)
+    return documentos
+
+
+def _item_validado(abate):
+    item = {'id': str(abate.id)}
+    for campo in leitura_rapida.CAMPOS_LISTAGEM:
+        valor = getattr(abate, campo)
+        if campo == 'produtos':
+            valor = [produto.model_dump() for produto in valor]
+        elif campo in ('horarios', 'despesas_fixas'):
+            valor = valor.model_dump()
+        item[campo] = valor
+    return item
+
+
+def executar(caminho, documentos):
+    """JSON (bytes) da página pelo caminho indicado"""
+    if caminho == 'validado':
+        abates = [AbateCompleto(**documento) for documento in documentos]
+        itens = [_item_validado(abate) for abate in abates]
+        return JSONResponse(content=jsonable_encoder(itens)).body
+    if caminho == 'rapido':
+        return leitura_rapida.serializar(leitura_rapida.documento(documento) for documento in documentos)
+    raise ValueError(f"Caminho desconhecido: {caminho}")
+
+
+def medir(caminho, documentos, repeticoes):
+    """Retorna (mediana em segundos, pico de memória em bytes)"""
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        executar(caminho, documentos)
+        tempos.append(time.perf_counter() - inicio)
+
+    # Memória numa execução à parte: o tracemalloc distorce o tempo
+    gc.collect()
+    tracemalloc.start()
+    resultado = executar(caminho, documentos)
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del resultado
+    return statistics.median(tempos), pico
+
+
+def verificar_equivalencia(documentos):
+    """Os dois caminhos devem produzir o mesmo JSON (a menos de 1 vs 1.0)"""
+    return json.loads(executar('validado', documentos)) == orjson.loads(executar('rapido', documentos))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark offline da serialização das listagens de abates")
+    parser.add_argument('--tamanhos', type=int, nargs='+', default=TAMANHOS_PADRAO,
+                        help="Abates por página (padrão: 1000)")
+    parser.add_argument('--repeticoes', type=int, default=20, help="Execuções medidas por caminho")
+    parser.add_argument('--semente', type=int, default=42, help="Semente da geração sintética")
+    parser.add_argument('--saida', help="Arquivo JSON de resultados (padrão: resultados_benchmark/leitura-<commit>.json)")
+    args = parser.parse_args()
+
+    registros = carregar_registros()
+    print(f"Carregados {len(registros)} registros modelo")
+
+    resultados = []
+    for tamanho in args.tamanhos:
+        documentos = gerar_documentos(registros, tamanho, args.semente)
+        equivalente = verificar_equivalencia(documentos)
+        tamanho_json = len(executar('rapido', documentos))
+        print(f"\n📊 {tamanho:,} abates ({tamanho_json / 1024:,.0f} KB de JSON)".replace(',', '.'))
+        if not equivalente:
+            print("  ❌ Os caminhos produzem JSON diferentes!")
+
+        por_caminho = {}
+        for caminho in CAMINHOS:
+            segundos, pico = medir(caminho, documentos, args.repeticoes)
+            por_caminho[caminho] = segundos
+            resultado = {
+                'tamanho': tamanho,
+                'caminho': caminho,
+                'mediana_ms': round(segundos * 1000, 3),
+                'microssegundos_por_abate': round(segundos / tamanho * 1e6, 3),
+                'pico_memoria_mb': round(pico / 1024 / 1024, 2),
+                'equivalente': equivalente,
+            }
+            resultados.append(resultado)
+            print(
+                f"  {caminho:<9} {resultado['mediana_ms']:>9.2f} ms  "
+                f"{resultado['microssegundos_por_abate']:>8.2f} µs/abate  "
+                f"pico {resultado['pico_memoria_mb']:>7.2f} MB"
+            )
+        if por_caminho['rapido'] > 0:
+            print(f"  rápido/validado: {por_caminho['validado'] / por_caminho['rapido']:.1f}x mais rápido")
+
+    commit = commit_atual()
+    saida = {
+        'commit': commit,
+        'data': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'orjson': orjson.__version__,
+        'semente': args.semente,
+        'repeticoes': args.repeticoes,
+        'resultados': resultados,
+    }
+    arquivo_saida = args.saida or os.path.join(DIRETORIO_RESULTADOS, f"leitura-{commit}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(arquivo_saida)), exist_ok=True)
+    with open(arquivo_saida, 'w', encoding='utf-8') as arquivo:
+        json.dump(saida, arquivo, indent=2, ensure_ascii=False)
+    print(f"\nResultados gravados em {arquivo_saida}")
+
+    return 0 if all(r['equivalente'] for r in resultados) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark offline do cálculo de métricas dos abates.
+
+Carrega os registros de bd/local/abatedouro.abates_completos.json, confere as
+métricas contra os valores de referência (golden) e mede, sobre bases
+sintéticas de 10 mil, 100 mil e 1 milhão de abates geradas a partir deles:
+
+  - escalar:   MetricsCalculator.calcular_metricas_completas, um abate por vez
+  - grafo:     metricas_definicoes.calcular, todas as métricas
+  - parcial:   calcular_metricas_parciais das métricas afetadas por uma
+               edição de ``produtos`` (caminho do update incremental)
+  - lote:      MetricsCalculator.calcular_metricas_lote
+  - vetorizado: apenas calcular_metricas_vetorizado sobre colunas já extraídas
+
+Para cada método são registrados tempo, registros por segundo e pico de
+memória. O resultado é gravado em JSON para comparação entre commits:
+
+    python benchmark_metricas.py
+    python benchmark_metricas.py --tamanhos 10000 --comparar resultados_benchmark/metricas-abc1234.json
+    python benchmark_metricas.py --atualizar-golden   # após mudar uma fórmula (e a VERSAO)
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+import numpy as np
+from bson import json_util
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.services import metricas_definicoes
+from app.services.metrics_calculator import MetricsCalculator
+
+DIRETORIO = os.path.dirname(os.path.abspath(__file__))
+ARQUIVO_REGISTROS = os.path.join(DIRETORIO, '..', 'bd', 'local', 'abatedouro.abates_completos.json')
+ARQUIVO_GOLDEN = os.path.join(DIRETORIO, '..', 'bd', 'local', 'abatedouro.metricas_golden.json')
+DIRETORIO_RESULTADOS = os.path.join(DIRETORIO, 'resultados_benchmark')
+
+TAMANHOS_PADRAO = [10_000, 100_000, 1_000_000]
+# Os abates sintéticos são gerados e medidos em blocos para limitar a memória
+TAMANHO_BLOCO = 50_000
+METODOS = ('escalar', 'grafo', 'parcial', 'lote', 'vetorizado')
+# Edição medida pelo método parcial: a que afeta mais métricas num update
+METRICAS_PARCIAIS = MetricsCalculator.metricas_afetadas(['produtos'])
+
+
+def carregar_registros():
+    with open(ARQUIVO_REGISTROS, encoding='utf-8') as arquivo:
+        return json_util.loads(arquivo.read())
+
+
+def gerar_abates(modelos, quantidade, semente):
+    """Gera abates sintéticos variando aves, pesos, preços, despesas e horários dos modelos"""
+    rnd = random.Random(semente)
+    abates = []
+    for i in range(quantidade):
+        modelo = modelos[i % len(modelos)]
+        fator = rnd.uniform(0.7, 1.3)
+        abate = dict(modelo)
+        abate['quantidade_aves'] = max(1, int(modelo['quantidade_aves'] * fator))
+        abate['peso_total_kg'] = round(modelo['peso_total_kg'] * fator * rnd.uniform(0.95, 1.05), 2)
+        abate['valor_kg_vivo'] = round(modelo['valor_kg_vivo'] * rnd.uniform(0.85, 1.15), 2)
+        abate['horarios'] = {**modelo['horarios'], 'horas_trabalhadas': round(rnd.uniform(6, 14), 2)}
+        abate['data_abate'] = modelo['data_abate'] + timedelta(days=i % 365)
+        produtos = []
+        for produto in modelo['produtos']:
+            peso_kg = round(produto['peso_kg'] * fator * rnd.uniform(0.9, 1.1), 2)
+            produtos.append({**produto, 'peso_kg': peso_kg, 'valor_total': peso_kg * produto['preco_kg']})
+        abate['produtos'] = produtos
+        abate['despesas_fixas'] = {
+            despesa: round(valor * rnd.uniform(0.8, 1.2), 2)
+            for despesa, valor in modelo['despesas_fixas'].items()
+        }
+        abates.append(abate)
+    return abates
+
+
+def executar_metodo(metodo, abates):
+    """Executa um método sobre os abates e retorna as métricas (ou colunas) calculadas"""
+    if metodo == 'escalar':
+        return [MetricsCalculator.calcular_metricas_completas(abate) for abate in abates]
+    if metodo == 'grafo':
+        return [metricas_definicoes.calcular(abate) for abate in abates]
+    if metodo == 'parcial':
+        return [MetricsCalculator.calcular_metricas_parciais(abate, METRICAS_PARCIAIS) for abate in abates]
+    if metodo == 'lote':
+        return MetricsCalculator.calcular_metricas_lote(abates)
+    if metodo == 'vetorizado':
+        colunas = MetricsCalculator.extrair_colunas(abates)
+        inicio = time.perf_counter()
+        MetricsCalculator.calcular_metricas_vetorizado(colunas)
+        return time.perf_counter() - inicio
+    raise ValueError(f"Método desconhecido: {metodo}")
+
+
+def medir(metodo, abates, medir_memoria=True):
+    """Retorna (segundos, pico de memória em bytes) de uma execução"""
+    inicio = time.perf_counter()
+    resultado = executar_metodo(metodo, abates)
+    segundos = time.perf_counter() - inicio
+    if metodo == 'vetorizado':
+        segundos = resultado
+    del resultado
+    if not medir_memoria:
+        return segundos, 0
+
+    # A memória é medida numa segunda execução: o tracemalloc distorce o tempo
+    tracemalloc.start()
+    resultado = executar_metodo(metodo, abates)
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del resultado
+    return segundos, pico
+
+
+def verificar_golden(registros):
+    """Confere as métricas dos registros locais contra os valores de referência"""
+    with open(ARQUIVO_GOLDEN, encoding='utf-8') as arquivo:
+        golden = json.load(arquivo)
+
+    divergencias = []
+    for registro in registros:
+        chave = str(registro['_id'])
+        esperado = golden['metricas'].get(chave)
+        if esperado is None:
+            divergencias.append(f"{chave}: sem valores de referência")
+            continue
+        calculados = {
+            'escalar': MetricsCalculator.calcular_metricas_completas(registro),
+            'grafo': metricas_definicoes.calcular(registro),
+            'lote': MetricsCalculator.calcular_metricas_lote([registro])[0],
+        }
+        for metodo, metricas in calculados.items():
+            if metricas != esperado:
+                diferentes = [nome for nome in esperado if metricas.get(nome) != esperado[nome]]
+                divergencias.append(f"{chave} ({metodo}): {', '.join(diferentes)}")
+    return divergencias
+
+
+def atualizar_golden(registros):
+    golden = {
+        'versao_metricas': MetricsCalculator.VERSAO,
+        'metricas': {
+            str(registro['_id']): MetricsCalculator.calcular_metricas_completas(registro)
+            for registro in registros
+        }
+    }
+    with open(ARQUIVO_GOLDEN, 'w', encoding='utf-8') as arquivo:
+        json.dump(golden, arquivo, indent=2, ensure_ascii=False)
+        arquivo.write('\n')
+    print(f"Valores de referência gravados em {ARQUIVO_GOLDEN}")
+
+
+def verificar_consistencia(abates):
+    """Os caminhos em lote, por grafo e parcial devem reproduzir exatamente o escalar"""
+    escalar = executar_metodo('escalar', abates)
+    parciais = [{nome: metricas[nome] for nome in METRICAS_PARCIAIS} for metricas in escalar]
+    return (
+        escalar == executar_metodo('lote', abates)
+        and escalar == executar_metodo('grafo', abates)
+        and parciais == executar_metodo('parcial', abates)
+    )
+
+
+def commit_atual():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=DIRETORIO, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'desconhecido'
+
+
+def executar_benchmark(registros, tamanhos, metodos, semente):
+    resultados = []
+    for tamanho in tamanhos:
+        print(f"\n📊 {tamanho:,} abates".replace(',', '.'))
+        totais = {metodo: {'segundos': 0.0, 'pico_memoria_bytes': 0} for metodo in metodos}
+        consistente = True
+
+        for indice_bloco, inicio in enumerate(range(0, tamanho, TAMANHO_BLOCO)):
+            quantidade = min(TAMANHO_BLOCO, tamanho - inicio)
+            abates = gerar_abates(registros, quantidade, semente + indice_bloco)
+            if indice_bloco == 0:
+                consistente = verificar_consistencia(abates[:2000])
+            for metodo in metodos:
+                # Todos os blocos têm o mesmo tamanho: o pico de memória é medido só no primeiro
+                segundos, pico = medir(metodo, abates, medir_memoria=indice_bloco == 0)
+                totais[metodo]['segundos'] += segundos
+                totais[metodo]['pico_memoria_bytes'] = max(totais[metodo]['pico_memoria_bytes'], pico)
+            del abates
+
+        for metodo in metodos:
+            segundos = totais[metodo]['segundos']
+            resultado = {
+                'tamanho': tamanho,
+                'metodo': metodo,
+                'segundos': round(segundos, 4),
+                'registros_por_segundo': round(tamanho / segundos, 1) if segundos > 0 else None,
+                'microssegundos_por_registro': round(segundos / tamanho * 1e6, 3),
+                'pico_memoria_mb': round(totais[metodo]['pico_memoria_bytes'] / 1024 / 1024, 2),
+                'consistente_com_escalar': consistente,
+            }
+            resultados.append(resultado)
+            print(
+                f"  {metodo:<11} {resultado['segundos']:>9.3f}s  "
+                f"{resultado['microssegundos_por_registro']:>9.3f} µs/abate  "
+                f"pico {resultado['pico_memoria_mb']:>8.2f} MB"
+            )
+        if not consistente:
+            print("  ❌ Resultados divergentes entre os métodos!")
+    return resultados
+
+
+def comparar_resultados(atual, arquivo_anterior, tolerancia):
+    """Compara com um resultado anterior; retorna a lista de regressões acima da tolerância"""
+    with open(arquivo_anterior, encoding='utf-8') as arquivo:
+        anterior = json.load(arquivo)
+
+    referencia = {(r['tamanho'], r['metodo']): r for r in anterior['resultados']}
+    regressoes = []
+    print(f"\n🔍 Comparação com {anterior.get('commit')} ({arquivo_anterior}):")
+    for resultado in atual['resultados']:
+        chave = (resultado['tamanho'], resultado['metodo'])
+        if chave not in referencia:
+            continue
+        antes = referencia[chave]['microssegundos_por_registro']
+        depois = resultado['microssegundos_por_registro']
+        variacao = (depois - antes) / antes if antes else 0.0
+        marcador = '⚠' if variacao > tolerancia else ' '
+        print(f"  {marcador} {chave[0]:>9} {chave[1]:<11} {antes:>9.3f} → {depois:>9.3f} µs/abate ({variacao:+.1%})")
+        if variacao > tolerancia:
+            regressoes.append(chave)
+    return regressoes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark offline do cálculo de métricas")
+    parser.add_argument('--tamanhos', type=int, nargs='+', default=TAMANHOS_PADRAO,
+                        help="Quantidades de abates sintéticos (padrão: 10000 100000 1000000)")
+    parser.add_argument('--metodos', nargs='+', choices=METODOS, default=list(METODOS))
+    parser.add_argument('--semente', type=int, default=42, help="Semente da geração sintética")
+    parser.add_argument('--saida', help="Arquivo JSON de resultados (padrão: resultados_benchmark/metricas-<commit>.json)")
+    parser.add_argument('--comparar', help="Resultado anterior para comparação")
+    parser.add_argument('--tolerancia', type=float, default=0.2,
+                        help="Piora relativa aceita por método na comparação (padrão: 0.2)")
+    parser.add_argument('--atualizar-golden', action='store_true',
+                        help="Regrava os valores de referência a partir do cálculo atual")
+    args = parser.parse_args()
+
+    registros = carregar_registros()
+    print(f"Carregados {len(registros)} registros de {ARQUIVO_REGISTROS}")
+
+    if args.atualizar_golden:
+        atualizar_golden(registros)
+        return 0
+
+    divergencias = verificar_golden(registros)
+    if divergencias:
+        print("❌ Métricas divergentes dos valores de referência:")
+        for divergencia in divergencias:
+            print(f"  - {divergencia}")
+        return 1
+    print("✓ Métricas conferem com os valores de referência")
+
+    commit = commit_atual()
+    resultados = executar_benchmark(registros, args.tamanhos, args.metodos, args.semente)
+    saida = {
+        'commit': commit,
+        'data': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'versao_metricas': MetricsCalculator.VERSAO,
+        'semente': args.semente,
+        'tamanho_bloco': TAMANHO_BLOCO,
+        'resultados': resultados,
+    }
+
+    arquivo_saida = args.saida or os.path.join(DIRETORIO_RESULTADOS, f"metricas-{commit}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(arquivo_saida)), exist_ok=True)
+    with open(arquivo_saida, 'w', encoding='utf-8') as arquivo:
+        json.dump(saida, arquivo, indent=2, ensure_ascii=False)
+    print(f"\nResultados gravados em {arquivo_saida}")
+
+    if not all(r['consistente_com_escalar'] for r in resultados):
+        return 1
+    if args.comparar:
+        regressoes = comparar_resultados(saida, args.comparar, args.tolerancia)
+        if regressoes:
+            print(f"❌ {len(regressoes)} regressão(ões) acima de {args.tolerancia:.0%}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
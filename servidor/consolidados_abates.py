@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Reconstrução e verificação dos consolidados (diários, semanais, mensais e anuais)
+e dos esboços de quantis mensais dos abates.
+
+Uso:
+    python consolidados_abates.py reconstruir   # recalcula a partir de abates_completos
+    python consolidados_abates.py verificar     # compara os gravados com os recalculados
+
+A reconstrução grava numa coleção temporária e a renomeia sobre a atual, de
+modo que as leituras nunca veem um consolidado pela metade. A verificação
+retorna código de saída 1 quando encontra divergências.
+
+Enquanto a reconstrução roda, a API continua aplicando deltas ($inc) nas
+coleções atuais, que a troca descartaria. Por isso o contador de alterações
+de abates_completos (versoes_colecoes) é lido antes da leitura dos abates e
+de novo logo antes da troca: se mudou, as temporárias são descartadas e a
+reconstrução recomeça (até TENTATIVAS vezes). Só escritas feitas pela API
+incrementam o contador, e as que caírem entre a última conferência e a troca
+ainda podem se perder: para garantia total, pare as escritas durante a
+reconstrução e rode ``verificar`` em seguida.
+"""
+
+import argparse
+import sys
+from datetime import datetime
+
+import pymongo
+
+from app.core.config import settings
+from app.services import consolidados, versoes_colecoes
+from app.services.metrics_calculator import MetricsCalculator
+
+MONGODB_URI = settings.MONGODB_URI or 'mongodb://localhost:27017/'
+MONGODB_DBNAME = settings.MONGODB_DBNAME
+
+# Campos dos abates usados pelos consolidados (entradas das métricas incluídas)
+PROJECAO = {
+    'data_abate': 1, 'unidade': 1, 'tipo_ave': 1, 'quantidade_aves': 1,
+    'peso_total_kg': 1, 'valor_kg_vivo': 1, 'valor_total': 1, 'peso_inteiro_abatido': 1,
+    'horarios': 1, 'despesas_fixas': 1, 'produtos': 1,
+}
+TAMANHO_LOTE = 1000
+TENTATIVAS = 3
+
+
+def calcular(db):
+    cursor = db['abates_completos'].find({}, PROJECAO)
+    return consolidados.consolidar(cursor)
+
+
+def versao_abates(db):
+    documento = db[versoes_colecoes.COLECAO].find_one({'_id': 'abates_completos'})
+    return documento['versao'] if documento else 0
+
+
+def gravar_temporarias(db, esperados):
+    for colecao, documentos in esperados.items():
+        temporaria = db[f'{colecao}_reconstrucao']
+        temporaria.drop()
+        temporaria.create_index(
+            [('periodo', pymongo.ASCENDING), ('unidade', pymongo.ASCENDING), ('tipo_ave', pymongo.ASCENDING)],
+            unique=True
+        )
+        for posicao in range(0, len(documentos), TAMANHO_LOTE):
+            temporaria.insert_many(documentos[posicao:posicao + TAMANHO_LOTE])
+
+
+def trocar(db, esperados):
+    for colecao, documentos in esperados.items():
+        temporaria = db[f'{colecao}_reconstrucao']
+        if documentos:
+            temporaria.rename(colecao, dropTarget=True)
+        else:
+            temporaria.drop()
+            db[colecao].delete_many({})
+        print(f"  {colecao}: {len(documentos)} documentos")
+
+
+def reconstruir(db):
+    inicio = datetime.now()
+    for tentativa in range(1, TENTATIVAS + 1):
+        versao = versao_abates(db)
+        esperados = calcular(db)
+        gravar_temporarias(db, esperados)
+        if versao_abates(db) == versao:
+            trocar(db, esperados)
+            break
+        for colecao in esperados:
+            db[f'{colecao}_reconstrucao'].drop()
+        print(f"AVISO: abates alterados durante a reconstrução (tentativa {tentativa}/{TENTATIVAS})")
+    else:
+        print("ERROR: os abates continuaram mudando; pare as escritas e reconstrua de novo")
+        return False
+
+    db[consolidados.COLECAO_META].replace_one(
+        {'_id': consolidados.ID_META},
+        {'versao': MetricsCalculator.VERSAO, 'reconstruido_em': datetime.utcnow()},
+        upsert=True
+    )
+    print(f"Tempo total: {(datetime.now() - inicio).total_seconds():.2f}s")
+    return True
+
+
+def verificar(db, tolerancia):
+    esperados = calcular(db)
+    divergencias = []
+    meta = db[consolidados.COLECAO_META].find_one({'_id': consolidados.ID_META})
+    if not meta or meta.get('versao') != MetricsCalculator.VERSAO:
+        versao = meta.get('versao') if meta else None
+        divergencias.append(f"versão das métricas {versao}, esperada {MetricsCalculator.VERSAO}")
+    for colecao, documentos in esperados.items():
+        atuais = list(db[colecao].find({}))
+        encontradas = consolidados.comparar(documentos, atuais, tolerancia)
+        print(f"  {colecao}: {len(atuais)} gravados, {len(documentos)} esperados, {len(encontradas)} divergências")
+        divergencias += [f"{colecao} {divergencia}" for divergencia in encontradas]
+
+    for divergencia in divergencias[:50]:
+        print(f"    ❌ {divergencia}")
+    if len(divergencias) > 50:
+        print(f"    ... e mais {len(divergencias) - 50}")
+    if divergencias:
+        print("Use 'python consolidados_abates.py reconstruir' para corrigir")
+    else:
+        print("✅ Consolidados consistentes com abates_completos")
+    return not divergencias
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('comando', choices=['reconstruir', 'verificar'])
+    parser.add_argument('--tolerancia', type=float, default=consolidados.TOLERANCIA,
+                        help='Diferença relativa aceita na verificação')
+    args = parser.parse_args()
+
+    client = pymongo.MongoClient(MONGODB_URI)
+    try:
+        db = client[MONGODB_DBNAME]
+        print(f"Conectado ao banco: {MONGODB_DBNAME}")
+        if args.comando == 'reconstruir':
+            ok = reconstruir(db)
+        else:
+            ok = verificar(db, args.tolerancia)
+    finally:
+        client.close()
+    return ok
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
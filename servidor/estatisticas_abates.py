@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Reconstrução e verificação das estatísticas por unidade usadas na detecção
+de anomalias (média e variância de Welford de cada métrica).
+
+Uso:
+    python estatisticas_abates.py reconstruir   # recalcula a partir de abates_completos
+    python estatisticas_abates.py verificar     # compara as gravadas com as recalculadas
+
+A reconstrução percorre os abates uma única vez, em cursor, e grava numa
+coleção temporária renomeada sobre a atual. Só entram abates com as métricas
+da versão atual, como nas escritas; rode depois de ``recalcular_metricas.py``
+quando a versão das métricas mudar.
+"""
+
+import argparse
+import math
+import sys
+from datetime import datetime
+
+import pymongo
+
+from app.core.config import settings
+from app.services import anomalias
+from app.services.metrics_calculator import MetricsCalculator
+
+MONGODB_URI = settings.MONGODB_URI or 'mongodb://localhost:27017/'
+MONGODB_DBNAME = settings.MONGODB_DBNAME
+
+TAMANHO_LOTE = 1000
+TOLERANCIA = 1e-6
+
+
+def calcular(db):
+    cursor = db['abates_completos'].find(
+        {'metricas_versao': MetricsCalculator.VERSAO}, anomalias.PROJECAO
+    ).batch_size(TAMANHO_LOTE)
+    return anomalias.acumular(cursor)
+
+
+def reconstruir(db):
+    inicio = datetime.now()
+    por_unidade = calcular(db)
+    documentos = [
+        {'unidade': unidade, 'versao': MetricsCalculator.VERSAO, 'metricas': anomalias.documento(estados)}
+        for unidade, estados in por_unidade.items()
+    ]
+    temporaria = db[f'{anomalias.COLECAO}_reconstrucao']
+    temporaria.drop()
+    temporaria.create_index([('unidade', pymongo.ASCENDING), ('versao', pymongo.ASCENDING)], unique=True)
+    if documentos:
+        temporaria.insert_many(documentos)
+        temporaria.rename(anomalias.COLECAO, dropTarget=True)
+    else:
+        temporaria.drop()
+        db[anomalias.COLECAO].delete_many({})
+    amostras = sum(estados.get('rendimento_final', {}).get('n', 0) for estados in por_unidade.values())
+    print(f"  {anomalias.COLECAO}: {len(documentos)} unidades, {amostras} abates")
+    print(f"Tempo total: {(datetime.now() - inicio).total_seconds():.2f}s")
+    return True
+
+
+def _diferente(esperado, atual, tolerancia):
+    return abs(esperado - atual) > tolerancia * max(1.0, abs(esperado))
+
+
+def verificar(db, tolerancia):
+    esperados = calcular(db)
+    divergencias = []
+    gravados = {
+        documento.get('unidade'): anomalias.estados(documento)
+        for documento in db[anomalias.COLECAO].find({'versao': MetricsCalculator.VERSAO})
+    }
+    for unidade in set(esperados) | set(gravados):
+        esperado_unidade = esperados.get(unidade, {})
+        gravado_unidade = gravados.get(unidade, {})
+        for metrica in set(esperado_unidade) | set(gravado_unidade):
+            esperado = esperado_unidade.get(metrica) or {'n': 0, 'media': 0.0, 'm2': 0.0}
+            atual = gravado_unidade.get(metrica) or {'n': 0, 'media': 0.0, 'm2': 0.0}
+            if esperado['n'] != atual.get('n', 0) or _diferente(esperado['media'], atual.get('media', 0), tolerancia):
+                divergencias.append(f"{unidade} {metrica}: n/média {atual.get('n')}/{atual.get('media')}, "
+                                    f"esperado {esperado['n']}/{esperado['media']}")
+            elif _diferente(math.sqrt(esperado['m2']), math.sqrt(max(atual.get('m2', 0), 0)), tolerancia):
+                divergencias.append(f"{unidade} {metrica}: m2 {atual.get('m2')}, esperado {esperado['m2']}")
+    print(f"  {anomalias.COLECAO}: {len(gravados)} unidades gravadas, {len(esperados)} esperadas, "
+          f"{len(divergencias)} divergências")
+
+    for divergencia in divergencias[:50]:
+        print(f"    ❌ {divergencia}")
+    if len(divergencias) > 50:
+        print(f"    ... e mais {len(divergencias) - 50}")
+    if divergencias:
+        print("Use 'python estatisticas_abates.py reconstruir' para corrigir")
+    else:
+        print("✅ Estatísticas consistentes com abates_completos")
+    return not divergencias
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('comando', choices=['reconstruir', 'verificar'])
+    parser.add_argument('--tolerancia', type=float, default=TOLERANCIA,
+                        help='Diferença relativa aceita na verificação')
+    args = parser.parse_args()
+
+    client = pymongo.MongoClient(MONGODB_URI)
+    try:
+        db = client[MONGODB_DBNAME]
+        print(f"Conectado ao banco: {MONGODB_DBNAME}")
+        if args.comando == 'reconstruir':
+            ok = reconstruir(db)
+        else:
+            ok = verificar(db, args.tolerancia)
+    finally:
+        client.close()
+    return ok
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
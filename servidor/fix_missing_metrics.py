@@ -2,6 +2,8 @@ import asyncio
 import sys
 import os
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
 from datetime import datetime
 
 # Adicionar o diretório do projeto ao path
@@ -38,34 +40,34 @@ async def fix_missing_metrics():
         client.close()
         return
     
-    calculator = MetricsCalculator()
     updated_count = 0
     error_count = 0
     
-    for i, doc in enumerate(docs_to_fix, 1):
-        try:
-            print(f"Processando registro {i}/{total_docs} - Data: {doc.get('data_abate')}")
-            
-            # Calcular métricas
-            metricas = calculator.calcular_metricas_completas(doc)
-            
-            # Atualizar o documento
-            metricas['updated_at'] = datetime.utcnow()
-            
-            result = await collection.update_one(
-                {"_id": doc["_id"]},
-                {"$set": metricas}
-            )
-            
-            if result.modified_count > 0:
-                updated_count += 1
-                print(f"  ✓ Atualizado com sucesso")
-            else:
-                print(f"  ⚠ Nenhuma modificação necessária")
-                
-        except Exception as e:
-            error_count += 1
-            print(f"  ✗ Erro ao processar: {str(e)}")
+    # Calcular as métricas de todos os registros de uma vez (modo em lote)
+    todas_metricas, erros_calculo = MetricsCalculator.calcular_metricas_lote_isolado(docs_to_fix)
+    error_count = len(erros_calculo)
+    for doc_id, erro in erros_calculo:
+        print(f"  ✗ Erro ao processar registro {doc_id}: {erro}")
+    agora = datetime.utcnow()
+    
+    operacoes = [
+        UpdateOne(
+            {"_id": doc["_id"]},
+            {"$set": {**metricas, "updated_at": agora, "metricas_versao": MetricsCalculator.VERSAO}}
+        )
+        for doc, metricas in zip(docs_to_fix, todas_metricas)
+        if metricas is not None
+    ]
+    
+    try:
+        if operacoes:
+            result = await collection.bulk_write(operacoes, ordered=False)
+            updated_count = result.modified_count
+    except BulkWriteError as e:
+        updated_count = e.details.get("nModified", 0)
+        error_count += len(e.details.get("writeErrors", []))
+        for erro in e.details.get("writeErrors", []):
+            print(f"  ✗ Erro ao processar registro {erro.get('index')}: {erro.get('errmsg')}")
     
     print(f"\n" + "="*60)
     print(f"Correção concluída!")
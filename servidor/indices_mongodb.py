@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Índices do MongoDB declarados em ``app/core/indices.py``.
+
+Uso:
+    python indices_mongodb.py verificar   # relata índices faltando, divergentes e não declarados
+    python indices_mongodb.py garantir    # cria os índices declarados que faltam
+    python indices_mongodb.py uso         # estatísticas de uso ($indexStats) de cada índice
+
+As estatísticas de ``uso`` são contadas desde a última reinicialização do
+servidor (ou criação do índice) e por membro do replica set. Um índice
+declarado sem acessos é candidato a revisão, não a remoção automática.
+"""
+
+import argparse
+import sys
+
+import pymongo
+
+from app.core.config import settings
+from app.core.indices import INDICES, chaves, comparar, por_colecao
+
+MONGODB_URI = settings.MONGODB_URI or 'mongodb://localhost:27017/'
+MONGODB_DBNAME = settings.MONGODB_DBNAME
+
+
+def verificar(db):
+    deriva = 0
+    for colecao, declarados in sorted(por_colecao().items()):
+        relatorio = comparar(declarados, list(db[colecao].list_indexes()))
+        if not any(relatorio.values()):
+            print(f"  ✅ {colecao}: {len(declarados)} índices declarados")
+            continue
+        for nome in relatorio['faltando']:
+            print(f"  ❌ {colecao}: faltando {nome}")
+        for nome in relatorio['divergentes']:
+            print(f"  ❌ {colecao}: opções divergentes em {nome}")
+        for nome in relatorio['extras']:
+            print(f"  ⚠️  {colecao}: não declarado {nome}")
+        deriva += len(relatorio['faltando']) + len(relatorio['divergentes'])
+    if deriva:
+        print("Use 'python indices_mongodb.py garantir' para criar os faltando")
+    return not deriva
+
+
+def garantir(db):
+    ok = True
+    for indice in INDICES:
+        try:
+            nome = db[indice.colecao].create_index(list(indice.chaves), unique=indice.unico)
+            print(f"  {indice.colecao}: {nome}")
+        except pymongo.errors.PyMongoError as e:
+            print(f"  ❌ {indice.colecao}: {indice.nome}: {e}")
+            ok = False
+    return ok
+
+
+def uso(db):
+    declarados = {(indice.colecao, indice.chaves) for indice in INDICES}
+    colecoes = sorted(set(db.list_collection_names()) | set(por_colecao()))
+    for colecao in colecoes:
+        if colecao.startswith('system.'):
+            continue
+        estatisticas = list(db[colecao].aggregate([{'$indexStats': {}}]))
+        if not estatisticas:
+            continue
+        print(f"\n{colecao}")
+        for estatistica in sorted(estatisticas, key=lambda e: -e['accesses']['ops']):
+            situacao = 'declarado' if (colecao, chaves(estatistica)) in declarados else 'não declarado'
+            if estatistica['name'] == '_id_':
+                situacao = 'padrão'
+            desde = estatistica['accesses']['since'].strftime('%Y-%m-%d %H:%M')
+            print(f"  {estatistica['name']:<45} {estatistica['accesses']['ops']:>10} acessos desde {desde}  ({situacao})")
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('comando', choices=['verificar', 'garantir', 'uso'])
+    args = parser.parse_args()
+
+    client = pymongo.MongoClient(MONGODB_URI)
+    try:
+        db = client[MONGODB_DBNAME]
+        print(f"Conectado ao banco: {MONGODB_DBNAME}")
+        ok = {'verificar': verificar, 'garantir': garantir, 'uso': uso}[args.comando](db)
+    finally:
+        client.close()
+    return ok
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
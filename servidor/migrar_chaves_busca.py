@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Migração: gravar as chaves normalizadas de busca (subdocumento ``busca``) nos
+documentos existentes.
+
+Os filtros por unidade, tipo de ave, tipo de produto e unidade de origem
+comparam essas chaves em vez de usar ``$regex`` sem âncora; documentos sem
+chave não aparecem nos filtros. Os CRUDs gravam as chaves nas escritas e a
+API, ao iniciar, preenche em segundo plano as que faltam (``varredura_busca``);
+esta migração também corrige chaves gravadas com outra normalização e cobre
+os consolidados.
+
+Uso:
+    python migrar_chaves_busca.py             # grava as chaves que faltam ou mudaram
+    python migrar_chaves_busca.py --verificar # só conta os documentos desatualizados
+"""
+
+import argparse
+import sys
+from datetime import datetime
+
+import pymongo
+from pymongo import UpdateOne
+
+from app.core.config import settings
+from app.services import busca, consolidados
+
+MONGODB_URI = settings.MONGODB_URI or 'mongodb://localhost:27017/'
+MONGODB_DBNAME = settings.MONGODB_DBNAME
+TAMANHO_LOTE = 1000
+
+# Coleções e campos com chave de busca (consolidados usam unidade e tipo_ave)
+COLECOES = {
+    **busca.CAMPOS,
+    **{colecao: ('unidade', 'tipo_ave') for colecao in consolidados.GRANULARIDADES},
+}
+
+
+def migrar_colecao(db, colecao, campos, verificar):
+    projecao = {campo: 1 for campo in campos}
+    projecao[busca.CAMPO] = 1
+    desatualizados = 0
+    operacoes = []
+    for documento in db[colecao].find({}, projecao).batch_size(TAMANHO_LOTE):
+        chaves = busca.chaves(documento, campos)
+        if documento.get(busca.CAMPO) == chaves:
+            continue
+        desatualizados += 1
+        if verificar:
+            continue
+        operacoes.append(UpdateOne({'_id': documento['_id']}, {'$set': {busca.CAMPO: chaves}}))
+        if len(operacoes) >= TAMANHO_LOTE:
+            db[colecao].bulk_write(operacoes, ordered=False)
+            operacoes = []
+    if operacoes:
+        db[colecao].bulk_write(operacoes, ordered=False)
+    return desatualizados
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--verificar', action='store_true', help='Apenas contar, sem gravar')
+    args = parser.parse_args()
+
+    client = pymongo.MongoClient(MONGODB_URI)
+    try:
+        db = client[MONGODB_DBNAME]
+        print(f"Conectado ao banco: {MONGODB_DBNAME}")
+        inicio = datetime.now()
+        total = 0
+        for colecao, campos in COLECOES.items():
+            desatualizados = migrar_colecao(db, colecao, campos, args.verificar)
+            acao = 'sem chave atualizada' if args.verificar else 'atualizados'
+            print(f"  {colecao}: {desatualizados} documentos {acao}")
+            total += desatualizados
+        print(f"Tempo total: {(datetime.now() - inicio).total_seconds():.2f}s")
+    finally:
+        client.close()
+    return not (args.verificar and total)
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -5,6 +5,7 @@ Script para recalcular métricas dos abates existentes com a correção do custo
 """
 
 import pymongo
+from pymongo import UpdateOne
 from datetime import datetime
 from app.services.metrics_calculator import MetricsCalculator
 import os
@@ -32,40 +33,44 @@ def main():
         abates = list(collection.find({}))
         print(f"Encontrados {len(abates)} abates para recalcular")
         
+        # Recalcular métricas de todos os abates em lote
+        todas_metricas, erros_calculo = MetricsCalculator.calcular_metricas_lote_isolado(abates)
+        for abate_id, erro in erros_calculo:
+            print(f"❌ Erro ao recalcular abate {abate_id}: {erro}")
+        agora = datetime.utcnow()
+        
+        operacoes = [
+            UpdateOne(
+                {'_id': abate['_id']},
+                {'$set': {
+                    **metricas_novas,
+                    'updated_at': agora,
+                    'metricas_versao': MetricsCalculator.VERSAO
+                }}
+            )
+            for abate, metricas_novas in zip(abates, todas_metricas)
+            if metricas_novas is not None
+        ]
+        
         contador_atualizados = 0
+        if operacoes:
+            resultado = collection.bulk_write(operacoes, ordered=False)
+            contador_atualizados = resultado.modified_count
         
-        for abate in abates:
-            try:
-                # Converter ObjectId para string se necessário
-                abate_id = abate['_id']
-                
-                # Recalcular métricas
-                metricas_novas = MetricsCalculator.calcular_metricas_completas(abate)
-                
-                # Atualizar no banco
-                resultado = collection.update_one(
-                    {'_id': abate_id},
-                    {'$set': {
-                        **metricas_novas,
-                        'updated_at': datetime.utcnow()
-                    }}
-                )
-                
-                if resultado.modified_count > 0:
-                    contador_atualizados += 1
-                    data_abate = abate.get('data_abate', 'N/A')
-                    if isinstance(data_abate, datetime):
-                        data_str = data_abate.strftime('%d/%m/%Y')
-                    else:
-                        data_str = str(data_abate)
-                    
-                    print(f"Atualizado abate de {data_str} - Lucro: R$ {metricas_novas.get('lucro_liquido', 0):.2f}")
-                    
-            except Exception as e:
-                print(f"Erro ao processar abate {abate.get('_id', 'N/A')}: {e}")
+        for abate, metricas_novas in zip(abates, todas_metricas):
+            if metricas_novas is None:
                 continue
+            data_abate = abate.get('data_abate', 'N/A')
+            if isinstance(data_abate, datetime):
+                data_str = data_abate.strftime('%d/%m/%Y')
+            else:
+                data_str = str(data_abate)
+            
+            print(f"Recalculado abate de {data_str} - Lucro: R$ {metricas_novas.get('lucro_liquido', 0):.2f}")
         
         print(f"\n✅ {contador_atualizados} abates atualizados com sucesso!")
+        if erros_calculo:
+            print(f"⚠️ {len(erros_calculo)} abates com erro não foram atualizados")
         
         # Verificar alguns dados de janeiro e fevereiro
         print("\n📊 Verificando dados de janeiro e fevereiro:")
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Script para recalcular as métricas de todos os abates dentro do MongoDB.
+
+As fórmulas do MetricsCalculator são compiladas para um pipeline de agregação
+e aplicadas com um único update_many, sem trazer os documentos pela rede.
+"""
+
+import pymongo
+from datetime import datetime
+from app.services.metrics_calculator import MetricsCalculator
+
+# Configuração do MongoDB LOCAL
+MONGODB_URI = 'mongodb://localhost:27017/'
+MONGODB_DBNAME = 'abatedouro'
+
+def main():
+    """Função principal"""
+    try:
+        client = pymongo.MongoClient(MONGODB_URI)
+        db = client[MONGODB_DBNAME]
+        collection = db['abates_completos']
+        
+        print(f"Conectado ao banco: {MONGODB_DBNAME}")
+        print("Recalculando métricas no servidor...")
+        
+        pipeline = MetricsCalculator.pipeline_metricas()
+        pipeline.append({'$set': {'updated_at': '$$NOW', 'metricas_versao': MetricsCalculator.VERSAO}})
+        
+        inicio = datetime.now()
+        resultado = collection.update_many({}, pipeline)
+        duracao = (datetime.now() - inicio).total_seconds()
+        
+        print(f"Documentos encontrados: {resultado.matched_count}")
+        print(f"Documentos atualizados: {resultado.modified_count}")
+        print(f"Tempo total: {duracao:.2f}s")
+        
+        client.close()
+        
+    except Exception as e:
+        print(f"❌ Erro: {e}")
+        return False
+    
+    return True
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,8 @@ import asyncio
 import sys
 import os
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
 from datetime import datetime
 
 # Adicionar o diretório app ao path
@@ -33,34 +35,32 @@ async def recalculate_all_metrics():
     registros_atualizados = 0
     erros = 0
     
-    calculator = MetricsCalculator()
+    # Calcular as métricas de todos os registros de uma vez (modo em lote)
+    print("Calculando métricas em lote...")
+    todas_metricas, erros_calculo = MetricsCalculator.calcular_metricas_lote_isolado(registros)
+    erros = len(erros_calculo)
+    for registro_id, erro in erros_calculo:
+        print(f"  ✗ Erro ao processar registro {registro_id}: {erro}")
+    agora = datetime.utcnow()
     
-    for i, registro in enumerate(registros, 1):
-        try:
-            data_abate = registro.get('data_abate', 'N/A')
-            print(f"Processando registro {i}/{total_registros} - Data: {data_abate}")
-            
-            # Calcular novas métricas
-            novas_metricas = calculator.calcular_metricas_completas(registro)
-            
-            # Atualizar o registro
-            resultado = await collection.update_one(
-                {"_id": registro["_id"]},
-                {"$set": {
-                    **novas_metricas,
-                    "updated_at": datetime.utcnow()
-                }}
-            )
-            
-            if resultado.modified_count > 0:
-                registros_atualizados += 1
-                print("  ✓ Atualizado com sucesso")
-            else:
-                print("  ⚠ Nenhuma alteração necessária")
-                
-        except Exception as e:
-            erros += 1
-            print(f"  ✗ Erro ao processar registro: {str(e)}")
+    operacoes = [
+        UpdateOne(
+            {"_id": registro["_id"]},
+            {"$set": {**novas_metricas, "updated_at": agora, "metricas_versao": MetricsCalculator.VERSAO}}
+        )
+        for registro, novas_metricas in zip(registros, todas_metricas)
+        if novas_metricas is not None
+    ]
+    
+    try:
+        if operacoes:
+            resultado = await collection.bulk_write(operacoes, ordered=False)
+            registros_atualizados = resultado.modified_count
+    except BulkWriteError as e:
+        registros_atualizados = e.details.get("nModified", 0)
+        erros += len(e.details.get("writeErrors", []))
+        for erro in e.details.get("writeErrors", []):
+            print(f"  ✗ Erro ao processar registro {erro.get('index')}: {erro.get('errmsg')}")
     
     print("\n" + "="*60)
     print("Recálculo concluído!")
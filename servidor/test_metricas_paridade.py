@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Teste de paridade entre os backends de cálculo de métricas.
+
+Todos os caminhos (individual, parcial, lote/NumPy e agregação no MongoDB)
+são gerados a partir de ``metricas_definicoes``; este teste garante que
+continuam chegando aos mesmos valores, com comparação exata, sobre:
+
+- os registros de bd/local/abatedouro.abates_completos.json, contra os
+  valores de referência de bd/local/abatedouro.metricas_golden.json;
+- abates sintéticos gerados a partir deles (os mesmos do benchmark), mais
+  casos de borda (sem produtos, sem aves, sem horas, sem despesas).
+"""
+
+import json
+import os
+import sys
+
+import numpy as np
+import pymongo
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.services import metricas_definicoes
+from app.services.metrics_calculator import MetricsCalculator
+from benchmark_metricas import ARQUIVO_GOLDEN, carregar_registros, gerar_abates
+
+MONGODB_URI = os.getenv('MONGODB_TEST_URI', 'mongodb://localhost:27017/')
+MONGODB_DBNAME = 'abatedouro_teste_paridade'
+
+QUANTIDADE_SINTETICOS = 2000
+SEMENTE = 20240601
+
+
+def casos_de_borda(modelo):
+    return [
+        {**modelo, 'produtos': []},
+        {**modelo, 'quantidade_aves': 0},
+        {**modelo, 'peso_total_kg': 0},
+        {**modelo, 'horarios': {}},
+        {**modelo, 'despesas_fixas': {}},
+        {'quantidade_aves': 10},
+        {},
+    ]
+
+
+def abates_de_teste():
+    registros = carregar_registros()
+    return registros + gerar_abates(registros, QUANTIDADE_SINTETICOS, SEMENTE) + casos_de_borda(registros[0])
+
+
+def test_golden():
+    """Métricas dos registros locais idênticas aos valores de referência, em todos os caminhos"""
+    with open(ARQUIVO_GOLDEN, encoding='utf-8') as arquivo:
+        golden = json.load(arquivo)['metricas']
+
+    registros = carregar_registros()
+    lote = MetricsCalculator.calcular_metricas_lote(registros)
+    for registro, metricas_lote in zip(registros, lote):
+        esperado = golden[str(registro['_id'])]
+        assert MetricsCalculator.calcular_metricas_completas(registro) == esperado
+        assert metricas_lote == esperado
+
+
+def test_paridade_python():
+    """Individual x lote (NumPy) x parcial, idênticos sobre os abates sintéticos"""
+    abates = abates_de_teste()
+    individuais = [MetricsCalculator.calcular_metricas_completas(abate) for abate in abates]
+
+    assert MetricsCalculator.calcular_metricas_lote(abates) == individuais
+
+    for campos in (['produtos'], ['quantidade_aves'], ['horarios'], ['despesas_fixas', 'valor_kg_vivo']):
+        nomes = MetricsCalculator.metricas_afetadas(campos)
+        for abate, metricas in zip(abates, individuais):
+            parciais = MetricsCalculator.calcular_metricas_parciais(abate, nomes)
+            assert parciais == {nome: metricas[nome] for nome in nomes}
+
+
+def empate_no_centavo(valor):
+    """O valor sem arredondamento cai (a menos de erro de ponto flutuante) em x,xx5"""
+    escalado = abs(valor) * 100
+    return abs(escalado - int(escalado) - 0.5) <= 1e-6
+
+
+def comparar(abate, obtido, origem):
+    """Comparação exata; só um empate no centavo pode divergir em 0,01 (arredondamento do MongoDB)"""
+    esperado = MetricsCalculator.calcular_metricas_completas(abate)
+    colunas = MetricsCalculator.extrair_colunas([abate])
+    brutos = metricas_definicoes.funcao_vetorizada()(colunas)
+
+    divergencias = []
+    for nome, valor in esperado.items():
+        valor_obtido = obtido.get(nome)
+        if valor_obtido == valor:
+            continue
+        if (
+            isinstance(valor, float)
+            and isinstance(valor_obtido, (int, float))
+            and abs(valor_obtido - valor) <= 0.01 + 1e-9
+            and empate_no_centavo(float(np.asarray(brutos[nome])[0]))
+        ):
+            continue
+        divergencias.append(f"{origem}: {nome} esperado={valor} obtido={valor_obtido}")
+    return divergencias
+
+
+def test_paridade_mongodb():
+    """Definições compiladas para agregação x cálculo em Python"""
+    client = pymongo.MongoClient(MONGODB_URI, serverSelectionTimeoutMS=2000)
+    try:
+        client.admin.command('ping')
+    except pymongo.errors.PyMongoError:
+        import pytest
+        pytest.skip(f"MongoDB indisponível em {MONGODB_URI}")
+
+    collection = client[MONGODB_DBNAME]['abates_completos']
+    try:
+        collection.drop()
+        collection.insert_many([{**abate, '_id': i} for i, abate in enumerate(abates_de_teste())])
+        originais = {documento['_id']: documento for documento in collection.find({})}
+
+        divergencias = []
+
+        # Pipeline em estágios (o mesmo usado no update_many)
+        for documento in collection.aggregate(MetricsCalculator.pipeline_metricas()):
+            divergencias += comparar(originais[documento['_id']], documento, f"pipeline {documento['_id']}")
+            assert metricas_definicoes.CAMPO_TEMPORARIO not in documento
+
+        # Expressões autocontidas (usadas em agregações analíticas)
+        projecao = {
+            nome: metricas_definicoes.expressao_mongo(nome, arredondar=True)
+            for nome in metricas_definicoes.METRICAS
+        }
+        for documento in collection.aggregate([{'$project': projecao}]):
+            divergencias += comparar(originais[documento['_id']], documento, f"inline {documento['_id']}")
+
+        # update_many com pipeline grava os mesmos valores
+        collection.update_many({}, MetricsCalculator.pipeline_metricas())
+        for documento in collection.find({}):
+            divergencias += comparar(originais[documento['_id']], documento, f"update_many {documento['_id']}")
+
+        assert not divergencias, "\n".join(divergencias[:50])
+    finally:
+        collection.drop()
+        client.close()
+
+
+if __name__ == "__main__":
+    test_golden()
+    print("✓ Valores de referência OK")
+    test_paridade_python()
+    print("✓ Paridade Python OK")
+    test_paridade_mongodb()
+    print("✓ Paridade MongoDB OK")
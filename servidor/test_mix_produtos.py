@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Teste da ordenação do mix de produtos (AbateCompletoCRUD.mix_produtos).
+
+Ordenar pelo próprio agrupamento (``ordenar_por=nome`` com
+``agrupamento=nome``) ordena pelo _id do grupo e precisa respeitar a direção
+pedida; os demais campos desempatam pelo _id em ordem crescente.
+"""
+
+import os
+import sys
+
+import pymongo
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.crud.abate_completo import AbateCompletoCRUD
+
+MONGODB_URI = os.getenv('MONGODB_TEST_URI', 'mongodb://localhost:27017/')
+MONGODB_DBNAME = 'abatedouro_teste_mix_produtos'
+
+ABATES = [
+    {'produtos': [
+        {'nome': 'Asa', 'tipo': 'corte', 'peso_kg': 10.0, 'valor_total': 100.0},
+        {'nome': 'Coxa', 'tipo': 'corte', 'peso_kg': 20.0, 'valor_total': 100.0},
+    ]},
+    {'produtos': [
+        {'nome': 'Peito', 'tipo': 'corte', 'peso_kg': 30.0, 'valor_total': 300.0},
+        {'nome': 'Frango inteiro', 'tipo': 'inteiro', 'peso_kg': 50.0, 'valor_total': 400.0},
+    ]},
+]
+
+
+def ordenacao(pipeline):
+    return pipeline[-1]['$facet']['itens'][0]['$sort']
+
+
+def test_ordenacao_pelo_agrupamento():
+    for ordem in (1, -1):
+        pipeline = AbateCompletoCRUD._pipeline_mix_produtos({}, 'nome', 'nome', ordem, 0, 10)
+        assert ordenacao(pipeline) == {'_id': ordem}
+
+    pipeline = AbateCompletoCRUD._pipeline_mix_produtos({}, 'nome', 'valor_total', -1, 0, 10)
+    assert list(ordenacao(pipeline).items()) == [('valor_total', -1), ('_id', 1)]
+
+
+def test_mix_produtos_mongodb():
+    client = pymongo.MongoClient(MONGODB_URI, serverSelectionTimeoutMS=2000)
+    try:
+        client.admin.command('ping')
+    except pymongo.errors.PyMongoError:
+        import pytest
+        pytest.skip(f"MongoDB indisponível em {MONGODB_URI}")
+
+    collection = client[MONGODB_DBNAME]['abates_completos']
+    try:
+        collection.drop()
+        collection.insert_many([dict(abate) for abate in ABATES])
+
+        def nomes(ordenar_por, ordem):
+            pipeline = AbateCompletoCRUD._pipeline_mix_produtos({}, 'nome', ordenar_por, ordem, 0, 10)
+            return [item['_id'] for item in collection.aggregate(pipeline).next()['itens']]
+
+        assert nomes('nome', -1) == ['Peito', 'Frango inteiro', 'Coxa', 'Asa']
+        assert nomes('nome', 1) == ['Asa', 'Coxa', 'Frango inteiro', 'Peito']
+        # Empate em valor_total (Asa e Coxa): desempate crescente pelo nome
+        assert nomes('valor_total', -1) == ['Frango inteiro', 'Peito', 'Asa', 'Coxa']
+    finally:
+        collection.drop()
+        client.close()
+
+
+if __name__ == "__main__":
+    test_ordenacao_pelo_agrupamento()
+    print("✓ Ordenação do pipeline OK")
+    test_mix_produtos_mongodb()
+    print("✓ Mix de produtos no MongoDB OK")